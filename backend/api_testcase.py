@@ -0,0 +1,160 @@
+import os
+import tempfile
+import unittest
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from starlette.testclient import TestClient
+
+from src.api import create_app
+from src.asgi.app import create_asgi_app
+from src.auth import auth
+from src.auth.jwks import JWKSKeyStore
+from src.auth.stub import LocalIssuer, LocalJWKSServer
+from src.database.models import db, unit_of_work
+
+
+class LocalApiTestCase(unittest.TestCase):
+    """Base class for api tests running offline
+
+    The app runs on a temporary SQLite database and verifies tokens minted
+    by a local issuer, so neither Auth0 nor PostgreSQL are needed. The SQL
+    instrumentation runs in raise mode, so a request with N+1 queries fails
+    the test. seedData runs in a unit of work and commits once.
+    """
+
+    @classmethod
+    def setUpClass(self):
+        self.issuer = LocalIssuer()
+        self.jwks_server = LocalJWKSServer(self.issuer).start()
+        self.default_store = auth.jwks_store
+        auth.jwks_store = JWKSKeyStore(self.jwks_server.url,
+                                       loader=auth.verify_backend.load_key)
+        self.tokens = {role: self.issuer.mint(role)
+                       for role in ('assistant', 'director', 'producer',
+                                    'operator')}
+
+        fd, self.database_file = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.database_path = 'sqlite:///' + self.database_file
+        self.app = self.create_app()
+        self.app.config.update(TESTING=True, SQL_INSTRUMENTATION='raise')
+        self.client = self.app.test_client
+        self.engine = db.get_engine(self.app)
+        db.create_all()
+
+        with unit_of_work():
+            self.seedData(self)
+
+    @classmethod
+    def tearDownClass(self):
+        db.session.remove()
+        db.drop_all()
+        db.get_engine(self.app).dispose()
+        os.remove(self.database_file)
+        self.jwks_server.stop()
+        auth.jwks_store = self.default_store
+
+    @classmethod
+    def create_app(self):
+        return create_app(self.database_path)
+
+    def seedData(self):
+        pass
+
+    def getUserTokenHeaders(self, role='assistant'):
+        return {'authorization': "Bearer " + self.tokens[role]}
+
+    @contextmanager
+    def count_queries(self, engine=None):
+        """Collects the statements run on engine (the app's by default)"""
+        engine = engine or self.engine
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'before_cursor_execute',
+                         before_cursor_execute)
+
+    @contextmanager
+    def count_commits(self, engine=None):
+        """Collects the commits run on engine (the app's by default)"""
+        engine = engine or self.engine
+        commits = []
+
+        def commit(conn):
+            commits.append(conn)
+
+        event.listen(engine, 'commit', commit)
+        try:
+            yield commits
+        finally:
+            event.remove(engine, 'commit', commit)
+
+
+class AsgiResponse:
+    """The parts of a flask test response the api tests read"""
+
+    def __init__(self, response):
+        self.status_code = response.status_code
+        self.headers = response.headers
+        self.data = response.content
+        self.mimetype = response.headers.get('content-type', '') \
+            .split(';')[0]
+        self.is_streamed = 'content-length' not in response.headers
+
+
+class AsgiClient:
+    """Flask test client interface over a starlette TestClient"""
+
+    def __init__(self, client):
+        self._client = client
+
+    def test_client(self):
+        return self
+
+    def open(self, path, method='GET', headers=None, json=None):
+        return AsgiResponse(self._client.request(method, path,
+                                                 headers=headers, json=json))
+
+    def get(self, path, **kwargs):
+        return self.open(path, 'GET', **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.open(path, 'POST', **kwargs)
+
+    def put(self, path, **kwargs):
+        return self.open(path, 'PUT', **kwargs)
+
+    def patch(self, path, **kwargs):
+        return self.open(path, 'PATCH', **kwargs)
+
+    def delete(self, path, **kwargs):
+        return self.open(path, 'DELETE', **kwargs)
+
+
+class AsgiApiTestCase(LocalApiTestCase):
+    """Base class running api tests against the asgi app
+
+    The flask app still creates and seeds the database, requests go to the
+    asgi app on the same database through aiosqlite. Mixed with a test
+    case of the wsgi app, it runs the same tests over asgi.
+    """
+
+    @classmethod
+    def setUpClass(self):
+        super().setUpClass()
+        self.asgi_app = create_asgi_app(self.database_path)
+        self.transport = TestClient(self.asgi_app).__enter__()
+        self.client = AsgiClient(self.transport).test_client
+        self.engine = self.asgi_app.state.engine.sync_engine
+
+    @classmethod
+    def tearDownClass(self):
+        self.transport.__exit__(None, None, None)
+        super().tearDownClass()
@@ -0,0 +1,164 @@
+'''
+WSGI / ASGI load benchmark
+seeds --rows actors (SQLite by default, or the migrated database of
+--database), then serves the api with the same number of worker processes
+from gunicorn (sync workers, run:app) and from uvicorn (asgi:app) and
+reports the throughput and latency of --concurrency clients reading lists,
+details and searches for --duration seconds each
+
+    python -m benchmarks.bench_asgi [--workers 1] [--concurrency 1,16,64]
+'''
+import argparse
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from src.api import create_app
+from src.auth.stub import LocalIssuer, LocalJWKSServer
+from src.database.bulk import insert_rows
+from src.database.models import db, Actor
+
+
+SEED_BATCH_SIZE = 50000
+SERVERS = {
+    'wsgi': ['gunicorn', '--workers', '{workers}', '--bind',
+             '127.0.0.1:{port}', '--log-level', 'warning', 'run:app'],
+    'asgi': ['uvicorn', '--workers', '{workers}', '--port', '{port}',
+             '--log-level', 'warning', 'asgi:app'],
+}
+
+
+def seed(rows):
+    for start in range(0, rows, SEED_BATCH_SIZE):
+        insert_rows(Actor, [
+            {'name': f'Actor {i}', 'age': 20 + i % 60, 'gender': 'female'}
+            for i in range(start, min(start + SEED_BATCH_SIZE, rows))])
+        db.session.commit()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(kind, workers, env):
+    port = free_port()
+    command = [arg.format(workers=workers, port=port)
+               for arg in SERVERS[kind]]
+    command[0] = os.path.join(os.path.dirname(sys.executable), command[0])
+    process = subprocess.Popen(command, env=env)
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(url + '/actors', timeout=1)
+        except urllib.error.HTTPError:
+            return process, url
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f'{kind} server did not start')
+
+
+def paths(rng, rows):
+    while True:
+        yield rng.choice((
+            '/actors?limit=20',
+            f'/actors?limit=20&after={rng.randrange(rows)}',
+            f'/actors/{rng.randrange(1, rows + 1)}',
+            f'/actors/search?q=Actor {rng.randrange(rows)}&limit=10',
+        ))
+
+
+def load(url, headers, rows, concurrency, duration):
+    timings, errors = [], []
+    deadline = time.monotonic() + duration
+
+    def client(seed):
+        for path in paths(random.Random(seed), rows):
+            if time.monotonic() >= deadline:
+                return
+            request = urllib.request.Request(
+                url + path.replace(' ', '%20'), headers=headers)
+            started = time.perf_counter()
+            try:
+                urllib.request.urlopen(request, timeout=30).read()
+            except OSError as e:
+                errors.append(e)
+                continue
+            timings.append((time.perf_counter() - started) * 1000)
+
+    threads = [threading.Thread(target=client, args=(i,))
+               for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return timings, errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--concurrency', default='1,16,64')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--database',
+                        help='migrated database url, a temporary SQLite '
+                             'database is seeded by default')
+    args = parser.parse_args(argv)
+
+    path = None
+    if args.database:
+        database_path = args.database
+    else:
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        database_path = 'sqlite:///' + path
+
+    issuer = LocalIssuer()
+    jwks_server = LocalJWKSServer(issuer).start()
+    headers = {'Authorization': 'Bearer ' + issuer.mint('assistant')}
+    env = dict(os.environ, DATABASE_PATH=database_path,
+               AUTH0_JWKS_URL=jwks_server.url)
+    try:
+        create_app(database_path)
+        if not args.database:
+            db.create_all()
+            seed(args.rows)
+        rows = db.session.query(Actor).count()
+        db.session.remove()
+
+        print(f'{"server":<8}{"clients":>8}{"req/s":>10}{"p50 ms":>10}'
+              f'{"p95 ms":>10}{"errors":>8}')
+        for kind in SERVERS:
+            process, url = start_server(kind, args.workers, env)
+            try:
+                for concurrency in map(int, args.concurrency.split(',')):
+                    timings, errors = load(url, headers, rows, concurrency,
+                                           args.duration)
+                    quantiles = statistics.quantiles(timings, n=100)
+                    print(f'{kind:<8}{concurrency:>8}'
+                          f'{len(timings) / args.duration:>10.0f}'
+                          f'{quantiles[49]:>10.1f}{quantiles[94]:>10.1f}'
+                          f'{len(errors):>8}')
+            finally:
+                process.terminate()
+                process.wait()
+    finally:
+        jwks_server.stop()
+        if path:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+'''
+Export memory benchmark
+seeds a SQLite database with --rows actors, then measures in fresh
+processes the peak RSS of streaming GET /actors/export against building the
+whole table in memory like the unpaginated list endpoint used to
+
+    python -m benchmarks.bench_export_rss [--rows 1000000] [--format csv]
+'''
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.api import create_app
+from src.auth import auth
+from src.auth.jwks import JWKSKeyStore
+from src.auth.stub import LocalIssuer, LocalJWKSServer
+from src.database.bulk import insert_rows
+from src.database.models import db, Actor
+
+
+SEED_BATCH_SIZE = 50000
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def seed(database_path, rows):
+    create_app(database_path)
+    db.create_all()
+    for start in range(0, rows, SEED_BATCH_SIZE):
+        insert_rows(Actor, [
+            {'name': f'Actor {i}', 'age': 20 + i % 60, 'gender': 'female'}
+            for i in range(start, min(start + SEED_BATCH_SIZE, rows))])
+        db.session.commit()
+
+
+def measure(database_path, mode, fmt):
+    app = create_app(database_path)
+    issuer = LocalIssuer()
+    server = LocalJWKSServer(issuer).start()
+    auth.jwks_store = JWKSKeyStore(server.url,
+                                   loader=auth.verify_backend.load_key)
+    headers = {'Authorization': 'Bearer ' + issuer.mint('assistant')}
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+
+    size = 0
+    if mode == 'export':
+        res = app.test_client().get(f'/actors/export?format={fmt}',
+                                    headers=headers, buffered=False)
+        for chunk in res.response:
+            size += len(chunk)
+        res.close()
+    else:
+        with app.app_context():
+            body = json.dumps([actor.short() for actor in
+                               Actor.query.order_by(Actor.id).all()])
+            size = len(body)
+
+    server.stop()
+    return {
+        'mode': mode,
+        'bytes': size,
+        'seconds': round(time.perf_counter() - started, 2),
+        'baseline_rss_mb': round(baseline, 1),
+        'peak_rss_mb': round(peak_rss_mb(), 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--format', default='ndjson',
+                        choices=['ndjson', 'csv'])
+    parser.add_argument('--measure', choices=['export', 'list'],
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--database', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        print(json.dumps(measure(args.database, args.measure, args.format)))
+        return
+
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    database_path = 'sqlite:///' + path
+    try:
+        seed(database_path, args.rows)
+        print(f'{"mode":<8}{"rows":>10}{"MB sent":>10}{"seconds":>10}'
+              f'{"peak RSS MB":>14}{"growth MB":>12}')
+        for mode in ('export', 'list'):
+            output = subprocess.check_output([
+                sys.executable, '-m', 'benchmarks.bench_export_rss',
+                '--measure', mode, '--format', args.format,
+                '--database', database_path])
+            result = json.loads(output.splitlines()[-1])
+            print(f'{mode:<8}{args.rows:>10}'
+                  f'{result["bytes"] / 2 ** 20:>10.1f}'
+                  f'{result["seconds"]:>10.2f}'
+                  f'{result["peak_rss_mb"]:>14.1f}'
+                  f'{result["peak_rss_mb"] - result["baseline_rss_mb"]:>12.1f}')
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+'''
+JSON encoding benchmark
+times the encoding of a list response of --rows movies (the movie.short()
+dicts, dates included) with flask.jsonify and with every installed json
+provider, in both date formats (flask.jsonify always sends http dates)
+
+    python -m benchmarks.bench_json [--rows 10000] [--repeat 50]
+'''
+import argparse
+import statistics
+import time
+from datetime import date, timedelta
+
+from flask import Flask, jsonify as flask_jsonify
+
+from src.serialization import JSON_DATE_FORMAT, available_providers, \
+    get_provider
+
+
+def payload(rows):
+    start = date(1950, 1, 1)
+    return {
+        'success': True,
+        'data': [{'id': i, 'title': f'Movie {i}',
+                  'releaseDate': start + timedelta(days=i % 25000)}
+                 for i in range(1, rows + 1)],
+        'next': None,
+    }
+
+
+def measure(encode, data, repeat):
+    size = len(encode(data))
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        encode(data)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args(argv)
+
+    data = payload(args.rows)
+    app = Flask(__name__)
+
+    def encode_with_flask(data):
+        return flask_jsonify(data).get_data()
+
+    encoders = [('flask.jsonify (http dates)', encode_with_flask)]
+    for name in available_providers():
+        for date_format in ('http', 'iso'):
+            encoders.append((f'{name} ({date_format} dates)',
+                             get_provider(name, date_format).dumps))
+
+    print(f'{args.rows} rows, JSON_DATE_FORMAT={JSON_DATE_FORMAT} '
+          'is the date format the api sends')
+    print(f'{"encoder":<28}{"median ms":>12}{"KB":>10}{"speedup":>10}')
+    baseline = None
+    with app.app_context():
+        for name, encode in encoders:
+            median, size = measure(encode, data, args.repeat)
+            baseline = baseline or median
+            print(f'{name:<28}{median:>12.2f}{size / 1024:>10.0f}'
+                  f'{baseline / median:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
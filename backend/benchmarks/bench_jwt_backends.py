@@ -0,0 +1,60 @@
+'''
+JWT verification micro-benchmark
+reports verifications per second of verify_decode_jwt for every installed
+backend, against the previous per-call jwk dict path of python-jose
+
+    python -m benchmarks.bench_jwt_backends [--iterations 2000]
+'''
+import argparse
+import time
+
+from jose import jwt
+
+from src.auth import auth
+from src.auth.auth import TokenCache, set_verify_backend, verify_decode_jwt
+from src.auth.backends import available_backends
+from src.auth.jwks import JWKSKeyStore
+from src.auth.stub import LocalIssuer, LocalJWKSServer
+
+
+def measure(verify, token, iterations):
+    verify(token)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        verify(token)
+    return iterations / (time.perf_counter() - started)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    issuer = LocalIssuer()
+    server = LocalJWKSServer(issuer).start()
+    auth.jwks_store = JWKSKeyStore(server.url)
+    auth.token_cache = TokenCache(0)
+    token = issuer.mint('producer')
+    jwk = issuer.jwks()['keys'][0]
+
+    def verify_with_jwk_dict(token):
+        return jwt.decode(token, jwk, algorithms=auth.ALGORITHMS,
+                          audience=auth.API_AUDIENCE,
+                          issuer='https://' + auth.AUTH0_DOMAIN + '/')
+
+    results = [('jose (jwk dict per call)',
+                measure(verify_with_jwk_dict, token, args.iterations))]
+    for name in available_backends():
+        set_verify_backend(name)
+        results.append((name, measure(verify_decode_jwt, token,
+                                      args.iterations)))
+    server.stop()
+
+    print(f'{"backend":<28}{"verifications/s":>18}')
+    for name, rate in results:
+        print(f'{name:<28}{rate:>18.0f}')
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+'''
+List serialization benchmark
+seeds a SQLite database with --rows actors, then compares building the
+list response data from full ORM instances (Actor.query ... short()) and
+from Core row tuples (select_fields ... _asdict()) as the list and export
+routes now do: median latency, and peak memory traced by tracemalloc
+
+    python -m benchmarks.bench_list_rows [--rows 100000] [--repeat 5]
+'''
+import argparse
+import gc
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from src.api import create_app
+from src.database.bulk import insert_rows
+from src.database.models import db, Actor
+from src.fields import select_fields
+from src.pagination import paginate
+
+
+SEED_BATCH_SIZE = 50000
+
+
+def seed(rows):
+    for start in range(0, rows, SEED_BATCH_SIZE):
+        insert_rows(Actor, [
+            {'name': f'Actor {i}', 'age': 20 + i % 60, 'gender': 'female'}
+            for i in range(start, min(start + SEED_BATCH_SIZE, rows))])
+        db.session.commit()
+
+
+def orm_rows(rows):
+    actors = Actor.query.order_by(Actor.id).limit(rows + 1).all()
+    return [actor.short() for actor in actors[:rows]]
+
+
+def core_rows(rows):
+    actors, _ = paginate(select_fields(Actor), Actor.id, rows)
+    return [actor._asdict() for actor in actors]
+
+
+def measure(build, rows, repeat):
+    timings = []
+    for _ in range(repeat):
+        db.session.remove()
+        gc.collect()
+        started = time.perf_counter()
+        build(rows)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    db.session.remove()
+    gc.collect()
+    tracemalloc.start()
+    build(rows)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return statistics.median(timings), peak / 2 ** 20
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        app = create_app('sqlite:///' + path)
+        with app.app_context():
+            db.create_all()
+            seed(args.rows)
+            print(f'{"path":<8}{"median ms":>12}{"peak MB":>10}')
+            for name, build in (('orm', orm_rows), ('core', core_rows)):
+                median, peak = measure(build, args.rows, args.repeat)
+                print(f'{name:<8}{median:>12.1f}{peak:>10.1f}')
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+'''
+Search latency benchmark
+seeds --rows actors with random names (SQLite by default, or the database
+of --database with its migrations applied), then reports the p50 / p95 /
+p99 latency of search_page for prefix, fuzzy (typo) and substring queries
+
+    python -m benchmarks.bench_search [--rows 1000000] [--queries 500]
+'''
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from src.api import create_app
+from src.database.bulk import insert_rows
+from src.database.models import db, Actor
+from src.search import search_page
+
+
+SEED_BATCH_SIZE = 50000
+SYLLABLES = [c + v + end for c in 'bcdfghjklmnprstvwz' for v in 'aeiouy'
+             for end in ('', 'l', 'n', 'r', 's', 't')]
+
+
+def random_word(rng):
+    return ''.join(rng.choice(SYLLABLES)
+                   for _ in range(rng.randint(2, 3))).capitalize()
+
+
+def random_names(rng, rows):
+    names = set()
+    while len(names) < rows:
+        names.add(f'{random_word(rng)} {random_word(rng)}')
+    return list(names)
+
+
+def seed(names):
+    for start in range(0, len(names), SEED_BATCH_SIZE):
+        insert_rows(Actor, [
+            {'name': name, 'age': 30, 'gender': 'female'}
+            for name in names[start:start + SEED_BATCH_SIZE]])
+        db.session.commit()
+
+
+def typo(rng, word):
+    i = rng.randrange(len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def queries(rng, names, count):
+    sample = rng.sample(names, count)
+    return {
+        'prefix': [name[:rng.randint(3, 6)] for name in sample],
+        'fuzzy': [typo(rng, name.split()[1]) for name in sample],
+        'substring': [name.split()[1][1:] for name in sample],
+    }
+
+
+def percentile(timings, p):
+    return statistics.quantiles(timings, n=100)[p - 1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--database',
+                        help='migrated database url, a temporary SQLite '
+                             'database is seeded by default')
+    args = parser.parse_args(argv)
+
+    rng = random.Random(42)
+    path = None
+    if args.database:
+        database_path = args.database
+    else:
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        database_path = 'sqlite:///' + path
+
+    try:
+        app = create_app(database_path)
+        if path:
+            db.create_all()
+        names = random_names(rng, args.rows)
+        started = time.perf_counter()
+        seed(names)
+        print(f'seeded {args.rows} actors in '
+              f'{time.perf_counter() - started:.1f}s')
+
+        print(f'{"query":<12}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}'
+              f'{"rows/query":>12}')
+        for kind, terms in queries(rng, names, args.queries).items():
+            timings, found = [], 0
+            for q in terms:
+                with app.test_request_context('/actors/search', query_string={
+                        'q': q, 'limit': args.limit}):
+                    started = time.perf_counter()
+                    rows, _ = search_page(Actor)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    found += len(rows)
+                db.session.remove()
+            print(f'{kind:<12}{percentile(timings, 50):>10.2f}'
+                  f'{percentile(timings, 95):>10.2f}'
+                  f'{percentile(timings, 99):>10.2f}'
+                  f'{found / len(terms):>12.1f}')
+    finally:
+        if path:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
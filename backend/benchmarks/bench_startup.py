@@ -0,0 +1,96 @@
+'''
+Startup benchmark
+times, in --runs fresh processes per mode, the import of src.api and
+create_app on a new SQLite database:
+    full: the app of the flask cli (migrations and commands set up)
+    fast: FAST_BOOT, the app of the gunicorn workers
+    create_all: full plus db.create_all(), what startup used to do
+and exits with status 1 when the median of fast boot exceeds --max-ms, so
+CI catches startup regressions
+
+    python -m benchmarks.bench_startup [--runs 10] [--max-ms 1500]
+'''
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+
+MODES = {
+    'full': {'FAST_BOOT': 'false'},
+    'fast': {'FAST_BOOT': 'true'},
+    'create_all': {'FAST_BOOT': 'false'},
+}
+
+
+def measure(database_path, mode):
+    import time
+    started = time.perf_counter()
+    from src.api import create_app
+    imported = time.perf_counter()
+    app = create_app(database_path)
+    if mode == 'create_all':
+        from src.database.models import db
+        with app.app_context():
+            db.create_all()
+    created = time.perf_counter()
+    return {
+        'import_ms': (imported - started) * 1000,
+        'create_ms': (created - imported) * 1000,
+        'modules': len(sys.modules),
+    }
+
+
+def run(mode):
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    try:
+        output = subprocess.check_output(
+            [sys.executable, '-m', 'benchmarks.bench_startup',
+             '--measure', mode, '--database', 'sqlite:///' + path],
+            env=dict(os.environ, **MODES[mode]))
+    finally:
+        os.remove(path)
+    return json.loads(output.splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--max-ms', type=float,
+                        help='fail when the median startup of fast boot is '
+                             'slower')
+    parser.add_argument('--measure', choices=list(MODES),
+                        help=argparse.SUPPRESS)
+    parser.add_argument('--database', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.measure:
+        # the measured process must not import src before measure does
+        print(json.dumps(measure(args.database, args.measure)))
+        return 0
+
+    print(f'{"mode":<12}{"import ms":>12}{"create ms":>12}{"total ms":>12}'
+          f'{"modules":>10}')
+    medians = {}
+    for mode in MODES:
+        results = [run(mode) for _ in range(args.runs)]
+        import_ms = statistics.median(r['import_ms'] for r in results)
+        create_ms = statistics.median(r['create_ms'] for r in results)
+        medians[mode] = statistics.median(
+            r['import_ms'] + r['create_ms'] for r in results)
+        print(f'{mode:<12}{import_ms:>12.1f}{create_ms:>12.1f}'
+              f'{medians[mode]:>12.1f}{results[-1]["modules"]:>10}')
+
+    if args.max_ms is not None and medians['fast'] > args.max_ms:
+        print(f'fast boot took {medians["fast"]:.1f} ms, over the '
+              f'{args.max_ms:.0f} ms budget', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
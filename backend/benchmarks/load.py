@@ -0,0 +1,411 @@
+'''
+Load harness
+seeds --rows actors and --rows / 10 movies (SQLite by default, or the
+migrated database of --database), serves create_app from gunicorn (or
+asgi:app from uvicorn with --server asgi) with tokens minted for each role
+by a local JWKS server, then drives --concurrency clients through a mix of
+actor and movie reads and writes for --duration seconds
+
+reports the throughput, p50 / p95 / p99 latency and error rate of each
+operation, --output saves the report (with the commit) as json and
+--compare prints the change against a saved report
+
+    python -m benchmarks.load [--workers 2] [--concurrency 16]
+        [--duration 30] [--mix list_actors=20,create_actor=5,...]
+        [--output load.json] [--compare baseline.json]
+'''
+import argparse
+import json
+import os
+import random
+import subprocess
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from datetime import date, datetime, timezone
+
+from src.api import create_app
+from src.auth.stub import LocalIssuer, LocalJWKSServer
+from src.database.bulk import insert_rows
+from src.database.models import db, Actor, Movie
+
+from .bench_asgi import SERVERS, start_server
+
+
+SEED_BATCH_SIZE = 50000
+
+
+'''
+operations
+each operation returns the (method, path, json body) of its next request
+from the Workload and a random.Random
+'''
+def list_rows(table):
+    def request(workload, rng):
+        after = rng.randrange(workload.rows[table])
+        return 'GET', f'/{table}?limit=20&after={after}', None
+    return request
+
+
+def retrieve_row(table):
+    def request(workload, rng):
+        id = rng.randrange(workload.rows[table]) + 1
+        return 'GET', f'/{table}/{id}', None
+    return request
+
+
+def search_rows(table, prefix):
+    def request(workload, rng):
+        q = f'{prefix}%20{rng.randrange(workload.rows[table])}'
+        return 'GET', f'/{table}/search?q={q}&limit=10', None
+    return request
+
+
+def new_row(table, rng):
+    if table == 'actors':
+        return {'name': f'Load Actor {uuid.uuid4().hex}',
+                'age': rng.randint(18, 90), 'gender': 'female'}
+    return {'title': f'Load Movie {uuid.uuid4().hex}',
+            'releaseDate': random_date(rng)}
+
+
+def random_date(rng):
+    return date.fromordinal(
+        date(1950, 1, 1).toordinal() + rng.randrange(365 * 70)).isoformat()
+
+
+def create_row(table):
+    def request(workload, rng):
+        return 'POST', f'/{table}', new_row(table, rng)
+    return request
+
+
+def update_row(table):
+    def request(workload, rng):
+        id = rng.randrange(workload.rows[table]) + 1
+        body = {'age': rng.randint(18, 90)} if table == 'actors' \
+            else {'releaseDate': random_date(rng)}
+        return 'PATCH', f'/{table}/{id}', body
+    return request
+
+
+def delete_row(table):
+    # only the rows created by the run are deleted, the seeded rows stay
+    def request(workload, rng):
+        id = workload.take_created(table)
+        if id is None:
+            return None
+        return 'DELETE', f'/{table}/{id}', None
+    return request
+
+
+'''
+OPERATIONS
+    name -> (role of the token sent, default weight, request)
+'''
+OPERATIONS = {
+    'list_actors': ('assistant', 15, list_rows('actors')),
+    'get_actor': ('assistant', 15, retrieve_row('actors')),
+    'search_actors': ('assistant', 10, search_rows('actors', 'Actor')),
+    'list_movies': ('assistant', 10, list_rows('movies')),
+    'get_movie': ('assistant', 10, retrieve_row('movies')),
+    'search_movies': ('assistant', 5, search_rows('movies', 'Movie')),
+    'create_actor': ('director', 8, create_row('actors')),
+    'update_actor': ('director', 8, update_row('actors')),
+    'delete_actor': ('director', 5, delete_row('actors')),
+    'create_movie': ('producer', 5, create_row('movies')),
+    'update_movie': ('director', 5, update_row('movies')),
+    'delete_movie': ('producer', 4, delete_row('movies')),
+}
+
+
+def parse_mix(value=None):
+    if not value:
+        return {name: weight for name, (_, weight, _) in OPERATIONS.items()}
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in OPERATIONS:
+            raise ValueError(f'Unknown operation: {name}')
+        mix[name] = float(weight or 1)
+    return mix
+
+
+'''
+Workload
+the rows the operations read and write
+    rows: table -> number of seeded rows (ids 1 to rows)
+    the ids of the rows created by the run are kept for the deletes
+'''
+class Workload:
+    def __init__(self, rows, mix):
+        self.rows = rows
+        self.mix = mix
+        self._names = list(mix)
+        self._weights = [mix[name] for name in self._names]
+        self._created = {table: [] for table in rows}
+        self._lock = threading.Lock()
+
+    def take_created(self, table):
+        with self._lock:
+            return self._created[table].pop() if self._created[table] \
+                else None
+
+    def add_created(self, table, id):
+        with self._lock:
+            self._created[table].append(id)
+
+    '''
+    next_request(rng)
+        the (operation, method, path, body) of a request drawn from the mix
+        a delete without created row to delete becomes a create
+    '''
+    def next_request(self, rng):
+        name = rng.choices(self._names, self._weights)[0]
+        request = OPERATIONS[name][2](self, rng)
+        if request is None:
+            name = name.replace('delete_', 'create_')
+            request = OPERATIONS[name][2](self, rng)
+        return (name,) + request
+
+    def record(self, name, method, path, status, body):
+        if name.startswith('create_') and status == 200:
+            self.add_created(path.strip('/'),
+                             json.loads(body)['data'][0]['id'])
+
+
+def send(url, token, method, path, body):
+    data = None if body is None else json.dumps(body).encode('utf-8')
+    request = urllib.request.Request(
+        url + path, data=data, method=method,
+        headers={'Authorization': 'Bearer ' + token,
+                 'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+    except OSError:
+        return 0, b''
+
+
+'''
+run(url, tokens, workload, concurrency, duration, seed=0, warmup=0)
+    drives concurrency clients for warmup + duration seconds, the requests
+    of the first warmup seconds are not counted
+    returns operation -> {'timings': [ms, ...], 'errors': {status: count}}
+    a status of 0 is a connection error or a timeout
+'''
+def run(url, tokens, workload, concurrency, duration, seed=0, warmup=0):
+    results = {name: {'timings': [], 'errors': {}} for name in workload.mix}
+    lock = threading.Lock()
+    started = time.monotonic() + warmup
+    deadline = started + duration
+
+    def client(index):
+        rng = random.Random(seed * 1000 + index)
+        while time.monotonic() < deadline:
+            name, method, path, body = workload.next_request(rng)
+            token = tokens[OPERATIONS[name][0]]
+            sent = time.perf_counter()
+            status, data = send(url, token, method, path, body)
+            elapsed = (time.perf_counter() - sent) * 1000
+            workload.record(name, method, path, status, data)
+            if time.monotonic() < started:
+                continue
+            with lock:
+                result = results.setdefault(name,
+                                            {'timings': [], 'errors': {}})
+                if 200 <= status < 400:
+                    result['timings'].append(elapsed)
+                else:
+                    result['errors'][status] = \
+                        result['errors'].get(status, 0) + 1
+
+    threads = [threading.Thread(target=client, args=(i,))
+               for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q / 100))]
+
+
+def summarize(result, duration):
+    timings = result['timings']
+    errors = sum(result['errors'].values())
+    requests = len(timings) + errors
+    return {
+        'requests': requests,
+        'rps': requests / duration,
+        'p50': percentile(timings, 50),
+        'p95': percentile(timings, 95),
+        'p99': percentile(timings, 99),
+        'errorRate': errors / requests if requests else 0.0,
+        'errors': {str(status): count
+                   for status, count in sorted(result['errors'].items())},
+    }
+
+
+'''
+report(results, duration, config)
+    the summaries of each operation and of all of them, with the commit and
+    the settings of the run
+'''
+def report(results, duration, config):
+    total = {'timings': [], 'errors': {}}
+    for result in results.values():
+        total['timings'].extend(result['timings'])
+        for status, count in result['errors'].items():
+            total['errors'][status] = total['errors'].get(status, 0) + count
+    return {
+        'commit': git_commit(),
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'config': config,
+        'total': summarize(total, duration),
+        'operations': {name: summarize(result, duration)
+                       for name, result in sorted(results.items())},
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def format_ms(value):
+    return f'{value:.1f}' if value is not None else '-'
+
+
+def print_report(data, baseline=None):
+    rows = [('total', data['total'])] + list(data['operations'].items())
+    print(f'{"operation":<16}{"requests":>10}{"req/s":>10}{"p50 ms":>10}'
+          f'{"p95 ms":>10}{"p99 ms":>10}{"errors":>9}')
+    for name, row in rows:
+        print(f'{name:<16}{row["requests"]:>10}{row["rps"]:>10.1f}'
+              f'{format_ms(row["p50"]):>10}{format_ms(row["p95"]):>10}'
+              f'{format_ms(row["p99"]):>10}{row["errorRate"]:>9.2%}')
+    if baseline is None:
+        return
+
+    print(f'\nagainst {baseline.get("commit") or "baseline"}:')
+    print(f'{"operation":<16}{"req/s":>10}{"p95 ms":>10}{"errors":>9}')
+    for name, row in rows:
+        base = baseline['total'] if name == 'total' \
+            else baseline['operations'].get(name)
+        if base is None:
+            continue
+        print(f'{name:<16}{change(row["rps"], base["rps"]):>10}'
+              f'{change(row["p95"], base["p95"]):>10}'
+              f'{row["errorRate"] - base["errorRate"]:>+9.2%}')
+
+
+def change(value, base):
+    if value is None or not base:
+        return '-'
+    return f'{(value - base) / base:+.1%}'
+
+
+def seed(actors, movies):
+    for model, rows, values in (
+            (Actor, actors, lambda i: {'name': f'Actor {i}',
+                                       'age': 20 + i % 60,
+                                       'gender': 'female'}),
+            (Movie, movies, lambda i: {'title': f'Movie {i}',
+                                       'release_date': date(2000, 1, 1)})):
+        for start in range(0, rows, SEED_BATCH_SIZE):
+            insert_rows(model, [values(i) for i in range(
+                start, min(start + SEED_BATCH_SIZE, rows))])
+            db.session.commit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--server', choices=list(SERVERS), default='wsgi')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--warmup', type=float, default=2)
+    parser.add_argument('--mix', help='operation=weight,... (default: '
+                        + ','.join(f'{name}={weight}' for name, (_, weight, _)
+                                   in OPERATIONS.items()) + ')')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database',
+                        help='migrated database url, a temporary SQLite '
+                             'database is seeded by default')
+    parser.add_argument('--output', help='save the report as json')
+    parser.add_argument('--compare', help='report saved by a previous run')
+    args = parser.parse_args(argv)
+    mix = parse_mix(args.mix)
+
+    path = None
+    if args.database:
+        database_path = args.database
+    else:
+        fd, path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        database_path = 'sqlite:///' + path
+
+    issuer = LocalIssuer()
+    jwks_server = LocalJWKSServer(issuer).start()
+    tokens = {role: issuer.mint(role)
+              for role in {role for role, _, _ in OPERATIONS.values()}}
+    env = dict(os.environ, DATABASE_PATH=database_path,
+               AUTH0_JWKS_URL=jwks_server.url)
+    try:
+        create_app(database_path)
+        if not args.database:
+            db.create_all()
+            seed(args.rows, max(args.rows // 10, 1))
+        rows = {'actors': db.session.query(Actor).count(),
+                'movies': db.session.query(Movie).count()}
+        db.session.remove()
+
+        process, url = start_server(args.server, args.workers, env)
+        try:
+            results = run(url, tokens, Workload(rows, mix), args.concurrency,
+                          args.duration, args.seed, args.warmup)
+        finally:
+            process.terminate()
+            process.wait()
+    finally:
+        jwks_server.stop()
+        if path:
+            os.remove(path)
+
+    data = report(results, args.duration, {
+        'server': args.server,
+        'workers': args.workers,
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'rows': rows,
+        'mix': mix,
+        'database': 'sqlite' if path else database_path.split(':')[0],
+    })
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(data, baseline)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
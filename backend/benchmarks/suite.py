@@ -0,0 +1,320 @@
+'''
+Hot path benchmark suite
+times the hot paths of a request on a temporary SQLite database:
+    auth_*: get_token_auth_header + verify_decode_jwt + check_permissions,
+        with the verified token cached and with the signature checked
+    actor_short_* / movie_long_*: Actor.short() and Movie.long() (3 actors
+        each) over 1, 1k and 100k rows
+    list_*: the queries of the list routes (first and deep pages, exact
+        count) on 100k actors and 10k movies
+    startup_*: import and create_app in a fresh process, full and fast boot
+
+each case is run --repeat times, the best run (time per call) is compared
+--save writes the results as a json baseline, --baseline compares a run to
+one and exits with status 1 when a case is slower than its baseline by
+more than --max-regression percent (--threshold name=percent per case)
+a case over its threshold is measured again (--confirm times at most) and
+the faster measurement is kept, so a noisy run alone does not fail the gate
+
+    python -m benchmarks.suite [--filter auth] [--save baseline.json]
+    python -m benchmarks.suite --baseline baseline.json --max-regression 20
+'''
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timezone
+
+from src.api import create_app
+from src.auth import auth
+from src.auth.jwks import JWKSKeyStore
+from src.auth.stub import LocalIssuer, LocalJWKSServer
+from src.database.bulk import insert_rows
+from src.database.models import db, Actor, Movie
+from src.fields import select_fields
+from src.pagination import count_rows, paginate
+
+from . import bench_startup
+from .load import git_commit
+
+
+SIZES = {'1': 1, '1k': 1000, '100k': 100000}
+ACTOR_ROWS = 100000
+MOVIE_ROWS = 10000
+SEED_BATCH_SIZE = 50000
+
+
+'''
+Case
+a benchmark, fn() runs the measured code number times per run (or once
+when number is None: as many times as fit in MIN_RUN_SECONDS)
+a case with sample set returns its own duration in seconds instead of
+being timed (startup cases timed inside their process)
+'''
+class Case:
+    def __init__(self, name, fn, number=None, sample=False):
+        self.name = name
+        self.fn = fn
+        self.number = number
+        self.sample = sample
+
+
+MIN_RUN_SECONDS = 0.2
+
+
+def autorange(fn):
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - started >= MIN_RUN_SECONDS:
+            return number
+        number *= 10
+
+
+def measure(case, repeat):
+    if case.sample:
+        runs = [case.fn() for _ in range(repeat)]
+        number = 1
+    else:
+        number = case.number or autorange(case.fn)
+        runs = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for _ in range(number):
+                case.fn()
+            runs.append((time.perf_counter() - started) / number)
+    return {
+        'best': min(runs),
+        'median': statistics.median(runs),
+        'number': number,
+        'repeat': repeat,
+    }
+
+
+def auth_cases(app, issuer):
+    headers = {'Authorization': 'Bearer ' + issuer.mint('director')}
+
+    def check():
+        with app.test_request_context(headers=headers):
+            token = auth.get_token_auth_header()
+            payload = auth.verify_decode_jwt(token)
+            auth.check_permissions('patch:actors', payload)
+
+    def check_uncached():
+        auth.token_cache.invalidate()
+        check()
+
+    return [Case('auth_cached', check), Case('auth_verify', check_uncached)]
+
+
+def actor(id):
+    actor = Actor(f'Actor {id}', 20 + id % 60, 'female')
+    actor.id = id
+    return actor
+
+
+def movie(id, cast):
+    movie = Movie(f'Movie {id}', date(2000, 1, 1))
+    movie.id = id
+    movie.actors = list(cast)
+    return movie
+
+
+def serialization_cases():
+    cast = [actor(i) for i in range(3)]
+    cases = []
+    for label, size in SIZES.items():
+        actors = [actor(i) for i in range(size)]
+        movies = [movie(i, cast) for i in range(size)]
+        cases.append(Case(f'actor_short_{label}',
+                          lambda actors=actors: [a.short() for a in actors]))
+        cases.append(Case(f'movie_long_{label}',
+                          lambda movies=movies: [m.long() for m in movies]))
+    return cases
+
+
+def seed():
+    for model, rows, values in (
+            (Actor, ACTOR_ROWS, lambda i: {'name': f'Actor {i}',
+                                           'age': 20 + i % 60,
+                                           'gender': 'female'}),
+            (Movie, MOVIE_ROWS, lambda i: {'title': f'Movie {i}',
+                                           'release_date': date(2000, 1, 1)})):
+        for start in range(0, rows, SEED_BATCH_SIZE):
+            insert_rows(model, [values(i) for i in range(
+                start, min(start + SEED_BATCH_SIZE, rows))])
+            db.session.commit()
+
+
+def list_cases():
+    def page(model, after=None):
+        def run():
+            paginate(select_fields(model), model.id, 20, after)
+            db.session.remove()
+        return run
+
+    def count():
+        count_rows(db.session, Actor, 'exact')
+        db.session.remove()
+
+    return [
+        Case('list_actors', page(Actor)),
+        Case('list_actors_deep', page(Actor, ACTOR_ROWS - 100)),
+        Case('list_movies', page(Movie)),
+        Case('list_actors_count', count),
+    ]
+
+
+def startup_cases():
+    def startup(mode):
+        def run():
+            result = bench_startup.run(mode)
+            return (result['import_ms'] + result['create_ms']) / 1000
+        return run
+
+    return [Case('startup_full', startup('full'), sample=True),
+            Case('startup_fast', startup('fast'), sample=True)]
+
+
+def format_seconds(value):
+    if value is None:
+        return '-'
+    if value >= 1:
+        return f'{value:.2f} s'
+    if value >= 1e-3:
+        return f'{value * 1e3:.2f} ms'
+    return f'{value * 1e6:.1f} us'
+
+
+'''
+compare(results, baseline, max_regression, thresholds)
+    the cases slower than their baseline by more than their threshold
+    (thresholds: name -> percent, max_regression for the other cases)
+    returns name -> change in percent of the best run
+'''
+def compare(results, baseline, max_regression, thresholds=None):
+    thresholds = thresholds or {}
+    changes, regressions = {}, {}
+    for name, result in results.items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        changes[name] = (result['best'] - base['best']) / base['best'] * 100
+        if changes[name] > thresholds.get(name, max_regression):
+            regressions[name] = changes[name]
+    return changes, regressions
+
+
+def parse_thresholds(values):
+    thresholds = {}
+    for value in values or []:
+        name, _, percent = value.partition('=')
+        thresholds[name] = float(percent)
+    return thresholds
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--filter', help='run the cases whose name contains '
+                                         'this text')
+    parser.add_argument('--save', help='write the results as a json baseline')
+    parser.add_argument('--baseline', help='json baseline to compare with')
+    parser.add_argument('--max-regression', type=float, default=20,
+                        help='percent a case may be slower than its baseline')
+    parser.add_argument('--threshold', action='append', metavar='NAME=PCT',
+                        help='max regression of one case')
+    parser.add_argument('--confirm', type=int, default=2,
+                        help='times a regressed case is measured again')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    thresholds = parse_thresholds(args.threshold)
+    changes, regressions = {}, {}
+
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    issuer = LocalIssuer()
+    jwks_server = LocalJWKSServer(issuer).start()
+    default_store = auth.jwks_store
+    auth.jwks_store = JWKSKeyStore(jwks_server.url,
+                                   loader=auth.verify_backend.load_key)
+    results = {}
+    try:
+        app = create_app('sqlite:///' + path, {'FAST_BOOT': True})
+        with app.app_context():
+            cases = auth_cases(app, issuer) + serialization_cases() + \
+                list_cases() + startup_cases()
+            cases = [case for case in cases
+                     if not args.filter or args.filter in case.name]
+            if any(case.name.startswith('list_') for case in cases):
+                db.create_all()
+                seed()
+            for case in cases:
+                results[case.name] = measure(case, args.repeat)
+                print(f'{case.name:<24}'
+                      f'{format_seconds(results[case.name]["best"]):>12}',
+                      file=sys.stderr)
+            if baseline:
+                changes, regressions = compare(results, baseline,
+                                               args.max_regression,
+                                               thresholds)
+            for _ in range(args.confirm):
+                if not regressions:
+                    break
+                for case in cases:
+                    if case.name not in regressions:
+                        continue
+                    rerun = measure(case, args.repeat)
+                    print(f'{case.name:<24}{format_seconds(rerun["best"]):>12}'
+                          '  (confirm)', file=sys.stderr)
+                    results[case.name] = min(results[case.name], rerun,
+                                             key=lambda r: r['best'])
+                changes, regressions = compare(results, baseline,
+                                               args.max_regression,
+                                               thresholds)
+            db.session.remove()
+    finally:
+        auth.jwks_store = default_store
+        jwks_server.stop()
+        os.remove(path)
+
+    data = {
+        'commit': git_commit(),
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(data, f, indent=2)
+
+    print(f'{"case":<24}{"best":>12}{"median":>12}{"baseline":>12}'
+          f'{"change":>10}')
+    for name, result in results.items():
+        base = baseline['results'].get(name) if baseline else None
+        change = f'{changes[name]:+.1f}%' if name in changes else '-'
+        print(f'{name:<24}{format_seconds(result["best"]):>12}'
+              f'{format_seconds(result["median"]):>12}'
+              f'{format_seconds(base and base["best"]):>12}{change:>10}'
+              + ('  REGRESSION' if name in regressions else ''))
+
+    if regressions:
+        print(f'{len(regressions)} case(s) regressed beyond the threshold',
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,41 @@
 import os
+import shutil
+import tempfile
 from dotenv import load_dotenv
 
 for env_file in ('.env', '.flaskenv'):
     env = os.path.join(os.getcwd(), env_file)
     if os.path.exists(env):
-        load_dotenv(env)
\ No newline at end of file
+        load_dotenv(env)
+
+# the workers only serve requests: no migrations nor cli commands to set up
+os.environ.setdefault('FAST_BOOT', 'true')
+# each worker writes its metrics to this directory, GET /metrics adds them up
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(
+    tempfile.gettempdir(), f'casting-metrics-{os.getpid()}'))
+
+# imported once the directory is set, and not from the signal handler
+# calling child_exit
+from prometheus_client import multiprocess  # noqa: E402
+
+
+def on_starting(server):
+    # drop the samples of a previous server started with the same directory
+    shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'])
+
+
+def on_exit(server):
+    shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+
+
+def post_worker_init(worker):
+    # open the pool connections before the worker accepts requests
+    from src.database.models import db
+    from src.database.pool import warm_pool
+
+    warm_pool(db.get_engine(worker.wsgi))
+
+
+def child_exit(server, worker):
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,52 @@
+"""create actors and movies
+
+Revision ID: 3f2a9c1d7b42
+Revises: 
+Create Date: 2024-07-01 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f2a9c1d7b42'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # databases created by db.create_all() before the migrations already
+    # have the tables, the revision adopts them as they are
+    existing = sa.inspect(op.get_bind()).get_table_names()
+    if 'actors' not in existing:
+        create_actors()
+    if 'movies' not in existing:
+        create_movies()
+
+
+def create_actors():
+    op.create_table('actors',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=180), nullable=False),
+    sa.Column('age', sa.Integer(), nullable=False),
+    sa.Column('gender', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+
+
+def create_movies():
+    op.create_table('movies',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=180), nullable=True),
+    sa.Column('release_date', sa.Date(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('title')
+    )
+
+
+def downgrade():
+    op.drop_table('movies')
+    op.drop_table('actors')
@@ -0,0 +1,32 @@
+"""add castings
+
+Revision ID: 8b6d0e4a2c17
+Revises: 3f2a9c1d7b42
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b6d0e4a2c17'
+down_revision = '3f2a9c1d7b42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('castings',
+    sa.Column('actor_id', sa.Integer(), nullable=False),
+    sa.Column('movie_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['actor_id'], ['actors.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['movie_id'], ['movies.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('actor_id', 'movie_id')
+    )
+    op.create_index(op.f('ix_castings_movie_id'), 'castings', ['movie_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_castings_movie_id'), table_name='castings')
+    op.drop_table('castings')
@@ -0,0 +1,32 @@
+"""add table versions
+
+Revision ID: c4e1b7a95d08
+Revises: 8b6d0e4a2c17
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e1b7a95d08'
+down_revision = '8b6d0e4a2c17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    table_versions = op.create_table('table_versions',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(table_versions, [
+        {'name': 'actors', 'version': 0},
+        {'name': 'movies', 'version': 0},
+    ])
+
+
+def downgrade():
+    op.drop_table('table_versions')
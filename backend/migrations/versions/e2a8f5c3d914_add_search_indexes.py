@@ -0,0 +1,70 @@
+"""add search indexes
+
+Revision ID: e2a8f5c3d914
+Revises: c4e1b7a95d08
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a8f5c3d914'
+down_revision = 'c4e1b7a95d08'
+branch_labels = None
+depends_on = None
+
+# a snapshot of the search index of src/search.py at this revision, a
+# change to the index goes in a new revision
+SEARCH_COLUMNS = [('actors', 'name'), ('movies', 'title')]
+
+
+def sqlite_search_ddl(table, column):
+    fts = f'{table}_search'
+    return [
+        f"CREATE INDEX ix_{table}_{column}_lower ON {table} (lower({column}))",
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({column}, "
+        f"content='{table}', content_rowid='id', tokenize='trigram')",
+        f"CREATE VIRTUAL TABLE {fts}_vocab USING fts5vocab({fts}, 'row')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} "
+        f"BEGIN INSERT INTO {fts}(rowid, {column}) "
+        f"VALUES (new.id, new.{column}); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} "
+        f"BEGIN INSERT INTO {fts}({fts}, rowid, {column}) "
+        f"VALUES ('delete', old.id, old.{column}); END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {column} ON {table} "
+        f"BEGIN INSERT INTO {fts}({fts}, rowid, {column}) "
+        f"VALUES ('delete', old.id, old.{column}); "
+        f"INSERT INTO {fts}(rowid, {column}) "
+        f"VALUES (new.id, new.{column}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for table, column in SEARCH_COLUMNS:
+            op.create_index(f'ix_{table}_{column}_trgm', table, [column],
+                            postgresql_using='gin',
+                            postgresql_ops={column: 'gin_trgm_ops'})
+    elif dialect == 'sqlite':
+        for table, column in SEARCH_COLUMNS:
+            for statement in sqlite_search_ddl(table, column):
+                op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        for table, column in SEARCH_COLUMNS:
+            op.drop_index(f'ix_{table}_{column}_trgm', table_name=table)
+    elif dialect == 'sqlite':
+        for table, column in SEARCH_COLUMNS:
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f'DROP TRIGGER {table}_search_{suffix}')
+            op.execute(f'DROP TABLE {table}_search_vocab')
+            op.execute(f'DROP TABLE {table}_search')
+            op.drop_index(f'ix_{table}_{column}_lower', table_name=table)
@@ -1,16 +1,50 @@
 import os
-from flask import Flask, request, jsonify, abort
+from flask import Flask, request, abort
 from sqlalchemy import exc
 import json
 from flask_cors import CORS
 from werkzeug.exceptions import HTTPException
 import traceback
 
-from .database.models import setup_db, Actor, Movie
+from .database.models import setup_db, setup_migrations, db, Actor, Movie
+from .database.bulk import BULK_MAX_ITEMS, BulkValidationError, \
+    bulk_create, validate_actor, validate_movie
+from .database.cli import register_commands
+from .database.instrumentation import init_sql_instrumentation
+from .database.pool import pool_stats
 from .auth.auth import AuthError, requires_auth
-
+from .batch import BATCH_MAX_OPERATIONS, BatchValidationError, \
+    run_batch, validate_operations
+from .pagination import count_rows, get_page_args, paginate
+from .export import export_response
+from .conditional import conditional
+from .search import search_page
+from .fields import detail_options, get_fields, select_fields, \
+    serialize_detail
+from .cache import cached, get_cache, init_cache, invalidate
+from .compression import init_compression
+from .metrics import init_metrics
+from .serialization import init_json, jsonify
+
+# skip the migrations and the cli commands, for the app of the web workers
+FAST_BOOT = os.environ.get('FAST_BOOT', 'false').lower() == 'true'
+
+
+'''
+create_app(db_uri="", test_config=None)
+    the flask app of the api on the database db_uri (DATABASE_PATH by
+    default), test_config overrides its config
+    no table is created, run flask bootstrap-db (or flask db upgrade) first
+    with FAST_BOOT the flask db and data commands are not registered, so
+    flask_migrate / alembic are never imported
+'''
 def create_app(db_uri="", test_config=None):
     app = Flask(__name__)
+    app.config['FAST_BOOT'] = FAST_BOOT
+    if test_config:
+        app.config.update(test_config)
+    init_json(app)
+    init_compression(app)
     if db_uri:
         setup_db(app, db_uri)
     else:
@@ -18,7 +52,13 @@ def create_app(db_uri="", test_config=None):
     
     configure_cors(app)
     define_routes(app)
+    init_cache(app)
+    init_metrics(app)
+    init_sql_instrumentation(app)
     error_handling(app)
+    if not app.config['FAST_BOOT']:
+        setup_migrations(app)
+        register_commands(app)
     return app
 
 
@@ -45,9 +85,50 @@ def configure_cors(app):
         return response
 
 # ROUTES
+def bulk_create_response(model):
+    items = request.get_json()
+    if not isinstance(items, list) or not items \
+            or len(items) > BULK_MAX_ITEMS:
+        abort(422)
+    atomic = request.args.get('atomic', 'false').lower() == 'true'
+
+    try:
+        created, errors = bulk_create(model, items, atomic)
+    except BulkValidationError as e:
+        return jsonify({
+            'success': False,
+            'error': 422,
+            'message': 'unprocessable',
+            'errors': e.errors,
+        }), 422
+
+    return jsonify({
+        'success': True,
+        'data': created,
+        'errors': errors,
+    })
+
+
+'''
+actor_tags(actor) / movie_tags(movie)
+    cache tags of the responses showing the row: the list of its table, its
+    detail and the details of the rows it is cast with
+'''
+def actor_tags(actor):
+    return ['actors', f'actor:{actor.id}'] + \
+        [f'movie:{movie.id}' for movie in actor.movies]
+
+
+def movie_tags(movie):
+    return ['movies', f'movie:{movie.id}'] + \
+        [f'actor:{actor.id}' for actor in movie.actors]
+
+
 def define_routes(app):
     define_actor_routes(app)
     define_movie_routes(app)
+    define_batch_routes(app)
+    define_internal_routes(app)
 
 def define_actor_routes(app):
     '''
@@ -55,6 +136,13 @@ def define_actor_routes(app):
         GET /actors
             it should be a public endpoint
             it should contain only the actor.short() data representation
+            ?fields= restricts the rows to the listed actor.short() fields (and id)
+            it should return at most ?limit= rows (capped at MAX_PAGE_SIZE)
+                ordered by id, starting after the ?after= cursor
+            it should include the cursor of the next page in "next"
+            ?count=exact|estimate adds the row count in "total"
+            it should answer 304 when If-None-Match holds the current ETag
+            it should be served from the response cache when one is configured
         returns status code 200 and json {"success": True, "actors": actors} where actors is the list of actors
             or appropriate status code indicating reason for failure
     '''
@@ -62,13 +150,88 @@ def define_actor_routes(app):
 
     @app.route('/actors', methods=['GET'])
     @requires_auth('get:actors')
+    @cached('actors')
+    @conditional('actors')
     def retrieve_actors(payload):
         try:
-            actors = Actor.query.order_by(Actor.id).all()
+            limit, after, count = get_page_args()
+            fields = get_fields(Actor)
+            actors, next_cursor = paginate(
+                select_fields(Actor, fields), Actor.id, limit, after)
+
+            result = {
+                'success': True,
+                'data': [actor._asdict() for actor in actors],
+                'next': next_cursor,
+            }
+            if count:
+                result['total'], result['totalIsEstimate'] = count_rows(
+                    db.session, Actor, count)
+            return jsonify(result)
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            traceback.print_exc()
+            print(f"An error occurred: {e}")
+            abort(422)
+
+
+    '''
+    @DONE implement endpoint
+        GET /actors/export
+            it should require the 'get:actors' permission
+            it should stream every actor.short() row ordered by id
+            ?format=ndjson (default) or ?format=csv
+            ?fields= restricts the rows to the listed actor.short() fields (and id)
+        returns status code 200 and the streamed rows
+            or appropriate status code indicating reason for failure
+    '''
+
+
+    @app.route('/actors/export', methods=['GET'])
+    @requires_auth('get:actors')
+    def export_actors(payload):
+        try:
+            fields = get_fields(Actor)
+            return export_response(
+                select_fields(Actor, fields).order_by(Actor.id), 'actors')
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            traceback.print_exc()
+            print(f"An error occurred: {e}")
+            abort(422)
+
+
+    '''
+    @DONE implement endpoint
+        GET /actors/search?q=
+            it should require the 'get:actors' permission
+            it should contain only the actor.short() data representation
+            ?fields= restricts the rows to the listed actor.short() fields (and id)
+            it should return the actors whose name starts with or resembles q,
+                best matches first
+            it should return at most ?limit= rows and the cursor of the next
+                page in "next"
+            it should respond with a 400 error if q is missing
+        returns status code 200 and json {"success": True, "data": actors, "next": cursor} where actors is the ranked list of actors
+            or appropriate status code indicating reason for failure
+    '''
+
+
+    @app.route('/actors/search', methods=['GET'])
+    @requires_auth('get:actors')
+    @cached('actors')
+    @conditional('actors')
+    def search_actors(payload):
+        try:
+            fields = get_fields(Actor)
+            actors, next_cursor = search_page(Actor, fields)
 
             return jsonify({
                 'success': True,
-                'data': [actor.short() for actor in actors],
+                'data': [actor._asdict() for actor in actors],
+                'next': next_cursor,
             })
         except HTTPException as e:
             raise e
@@ -83,6 +246,9 @@ def define_actor_routes(app):
         GET /actors-detail
             it should require the 'get:actors-detail' permission
             it should contain the actor.long() data representation
+            ?fields= restricts it to the listed actor.long() fields (and id)
+            it should answer 304 when If-None-Match holds the current ETag
+            it should be served from the response cache when one is configured
         returns status code 200 and json {"success": True, "actors": actors} where actors is the list of actors
             or appropriate status code indicating reason for failure
     '''
@@ -90,13 +256,18 @@ def define_actor_routes(app):
 
     @app.route('/actors/<int:id>', methods=['GET'])
     @requires_auth('get:actors-detail')
+    @cached('actor:{id}')
+    @conditional('actors', 'movies')
     def retrieve_actors_detail(payload, id):
         try:
-            actor = Actor.query.get_or_404(id)
+            fields = get_fields(Actor, detail=True)
+            actor = Actor.query \
+                .options(*detail_options(Actor, fields)) \
+                .get_or_404(id)
 
             return jsonify({
                 'success': True,
-                'data': actor.long(),
+                'data': serialize_detail(actor, fields),
             })
         except HTTPException as e:
             raise e
@@ -121,22 +292,16 @@ def define_actor_routes(app):
     @requires_auth('post:actors')
     def create_new_row_in_actor(payload):
         try:
-            body = request.get_json()
-
-            new_name = body.get('name', None)
-            new_age = body.get('age', None)
-            new_gender = body.get('gender', None)
-
-            if new_name is None or new_age is None or new_gender is None:
+            try:
+                # the validation of the bulk and asgi routes
+                actor = Actor(**validate_actor(request.get_json()))
+            except ValueError:
                 abort(422)
 
-            actor = Actor(
-                name=new_name,
-                age=new_age,
-                gender=new_gender
-            )
-
             actor.insert()
+            # the id, when a unit_of_work defers the insert
+            db.session.flush()
+            invalidate('actors')
 
             return jsonify({
                 'success': True,
@@ -150,6 +315,34 @@ def define_actor_routes(app):
             abort(422)
 
 
+    '''
+    @DONE implement endpoint
+        POST /actors/bulk
+            it should create many rows in the actors table with a single commit
+            it should require the 'post:actors' permission
+            it should accept a json array of POST /actors bodies (at most BULK_MAX_ITEMS)
+            it should skip invalid items and report them in "errors"
+            ?atomic=true rejects the whole batch if any item is invalid
+        returns status code 200 and json {"success": True, "data": created, "errors": errors} where created lists the index and id of every created row
+            or status code 422 and json {"success": False, "errors": errors} for a rejected atomic batch
+    '''
+
+
+    @app.route('/actors/bulk', methods=['POST'])
+    @requires_auth('post:actors')
+    def create_rows_in_actor(payload):
+        try:
+            response = bulk_create_response(Actor)
+            invalidate('actors')
+            return response
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            traceback.print_exc()
+            print(f"An error occurred: {e}")
+            abort(422)
+
+
     '''
     @DONE implement endpoint
         PATCH /actors/<id>
@@ -168,20 +361,15 @@ def define_actor_routes(app):
     def update_actor(payload, id):
         try:
             actor = Actor.query.get_or_404(id)
-            body = request.get_json()
-
-            new_name = body.get('name', None)
-            new_age = body.get('age', None)
-            new_gender = body.get('gender', None)
-
-            if new_name:
-                actor.name = new_name
-            if new_age:
-                actor.age = new_age
-            if new_age:
-                actor.gender = new_gender
+            try:
+                values = validate_actor(request.get_json(), partial=True)
+            except ValueError:
+                abort(422)
 
+            for column, value in values.items():
+                setattr(actor, column, value)
             actor.update()
+            invalidate(*actor_tags(actor))
 
             return jsonify({
                 'success': True,
@@ -212,8 +400,10 @@ def define_actor_routes(app):
     def delete_actor(payload, id):
         try:
             actor = Actor.query.get_or_404(id)
+            tags = actor_tags(actor)
 
             actor.delete()
+            invalidate(*tags)
 
             return jsonify({
                 'success': True,
@@ -233,6 +423,13 @@ def define_movie_routes(app):
         GET /movies
             it should be a public endpoint
             it should contain only the movie.short() data representation
+            ?fields= restricts the rows to the listed movie.short() fields (and id)
+            it should return at most ?limit= rows (capped at MAX_PAGE_SIZE)
+                ordered by id, starting after the ?after= cursor
+            it should include the cursor of the next page in "next"
+            ?count=exact|estimate adds the row count in "total"
+            it should answer 304 when If-None-Match holds the current ETag
+            it should be served from the response cache when one is configured
         returns status code 200 and json {"success": True, "movies": movies} where movies is the list of movies
             or appropriate status code indicating reason for failure
     '''
@@ -240,13 +437,88 @@ def define_movie_routes(app):
 
     @app.route('/movies', methods=['GET'])
     @requires_auth('get:movies')
+    @cached('movies')
+    @conditional('movies')
     def retrieve_movies(payload):
         try:
-            movies = Movie.query.order_by(Movie.id).all()
+            limit, after, count = get_page_args()
+            fields = get_fields(Movie)
+            movies, next_cursor = paginate(
+                select_fields(Movie, fields), Movie.id, limit, after)
+
+            result = {
+                'success': True,
+                'data': [movie._asdict() for movie in movies],
+                'next': next_cursor,
+            }
+            if count:
+                result['total'], result['totalIsEstimate'] = count_rows(
+                    db.session, Movie, count)
+            return jsonify(result)
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            traceback.print_exc()
+            print(f"An error occurred: {e}")
+            abort(422)
+
+
+    '''
+    @DONE implement endpoint
+        GET /movies/export
+            it should require the 'get:movies' permission
+            it should stream every movie.short() row ordered by id
+            ?format=ndjson (default) or ?format=csv
+            ?fields= restricts the rows to the listed movie.short() fields (and id)
+        returns status code 200 and the streamed rows
+            or appropriate status code indicating reason for failure
+    '''
+
+
+    @app.route('/movies/export', methods=['GET'])
+    @requires_auth('get:movies')
+    def export_movies(payload):
+        try:
+            fields = get_fields(Movie)
+            return export_response(
+                select_fields(Movie, fields).order_by(Movie.id), 'movies')
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            traceback.print_exc()
+            print(f"An error occurred: {e}")
+            abort(422)
+
+
+    '''
+    @DONE implement endpoint
+        GET /movies/search?q=
+            it should require the 'get:movies' permission
+            it should contain only the movie.short() data representation
+            ?fields= restricts the rows to the listed movie.short() fields (and id)
+            it should return the movies whose title starts with or resembles q,
+                best matches first
+            it should return at most ?limit= rows and the cursor of the next
+                page in "next"
+            it should respond with a 400 error if q is missing
+        returns status code 200 and json {"success": True, "data": movies, "next": cursor} where movies is the ranked list of movies
+            or appropriate status code indicating reason for failure
+    '''
+
+
+    @app.route('/movies/search', methods=['GET'])
+    @requires_auth('get:movies')
+    @cached('movies')
+    @conditional('movies')
+    def search_movies(payload):
+        try:
+            fields = get_fields(Movie)
+            movies, next_cursor = search_page(Movie, fields)
 
             return jsonify({
                 'success': True,
-                'data': [movie.short() for movie in movies],
+                'data': [movie._asdict() for movie in movies],
+                'next': next_cursor,
             })
         except HTTPException as e:
             raise e
@@ -261,6 +533,9 @@ def define_movie_routes(app):
         GET /movies-detail
             it should require the 'get:movies-detail' permission
             it should contain the movie.long() data representation
+            ?fields= restricts it to the listed movie.long() fields (and id)
+            it should answer 304 when If-None-Match holds the current ETag
+            it should be served from the response cache when one is configured
         returns status code 200 and json {"success": True, "movies": movies} where movies is the list of movies
             or appropriate status code indicating reason for failure
     '''
@@ -268,13 +543,18 @@ def define_movie_routes(app):
 
     @app.route('/movies/<int:id>', methods=['GET'])
     @requires_auth('get:movies-detail')
+    @cached('movie:{id}')
+    @conditional('movies', 'actors')
     def retrieve_movies_detail(payload, id):
         try:
-            movie = Movie.query.get_or_404(id)
+            fields = get_fields(Movie, detail=True)
+            movie = Movie.query \
+                .options(*detail_options(Movie, fields)) \
+                .get_or_404(id)
 
             return jsonify({
                 'success': True,
-                'data': movie.long(),
+                'data': serialize_detail(movie, fields),
             })
         except HTTPException as e:
             raise e
@@ -299,20 +579,15 @@ def define_movie_routes(app):
     @requires_auth('post:movies')
     def create_new_row_in_movie(payload):
         try:
-            body = request.get_json()
-
-            new_title = body.get('title', None)
-            new_release_date = body.get('releaseDate', None)
-
-            if new_title is None or new_release_date is None:
+            try:
+                movie = Movie(**validate_movie(request.get_json()))
+            except ValueError:
                 abort(422)
 
-            movie = Movie(
-                title=new_title,
-                release_date=new_release_date,
-            )
-
             movie.insert()
+            # the id, when a unit_of_work defers the insert
+            db.session.flush()
+            invalidate('movies')
 
             return jsonify({
                 'success': True,
@@ -326,6 +601,34 @@ def define_movie_routes(app):
             abort(422)
 
 
+    '''
+    @DONE implement endpoint
+        POST /movies/bulk
+            it should create many rows in the movies table with a single commit
+            it should require the 'post:movies' permission
+            it should accept a json array of POST /movies bodies (at most BULK_MAX_ITEMS)
+            it should skip invalid items and report them in "errors"
+            ?atomic=true rejects the whole batch if any item is invalid
+        returns status code 200 and json {"success": True, "data": created, "errors": errors} where created lists the index and id of every created row
+            or status code 422 and json {"success": False, "errors": errors} for a rejected atomic batch
+    '''
+
+
+    @app.route('/movies/bulk', methods=['POST'])
+    @requires_auth('post:movies')
+    def create_rows_in_movie(payload):
+        try:
+            response = bulk_create_response(Movie)
+            invalidate('movies')
+            return response
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            traceback.print_exc()
+            print(f"An error occurred: {e}")
+            abort(422)
+
+
     '''
     @DONE implement endpoint
         PATCH /movies/<id>
@@ -344,17 +647,15 @@ def define_movie_routes(app):
     def update_movie(payload, id):
         try:
             movie = Movie.query.get_or_404(id)
-            body = request.get_json()
-
-            new_title = body.get('title', None)
-            new_release_date = body.get('releaseDate', None)
-
-            if new_title:
-                movie.title = new_title
-            if new_release_date:
-                movie.release_date = new_release_date
+            try:
+                values = validate_movie(request.get_json(), partial=True)
+            except ValueError:
+                abort(422)
 
+            for column, value in values.items():
+                setattr(movie, column, value)
             movie.update()
+            invalidate(*movie_tags(movie))
 
             return jsonify({
                 'success': True,
@@ -385,8 +686,10 @@ def define_movie_routes(app):
     def delete_movie(payload, id):
         try:
             movie = Movie.query.get_or_404(id)
+            tags = movie_tags(movie)
 
             movie.delete()
+            invalidate(*tags)
 
             return jsonify({
                 'success': True,
@@ -400,6 +703,168 @@ def define_movie_routes(app):
             abort(422)
 
 
+    '''
+    @DONE implement endpoint
+        PUT /movies/<id>/actors/<actor_id>
+            where <id> and <actor_id> are existing model ids
+            it should respond with a 404 error if either is not found
+            it should cast the actor in the movie, casting twice is a no-op
+            it should require the 'patch:movies' permission
+            it should contain the movie.long() data representation
+        returns status code 200 and json {"success": True, "data": movie} where movie an array containing only the updated movie
+            or appropriate status code indicating reason for failure
+    '''
+
+
+    @app.route('/movies/<int:id>/actors/<int:actor_id>', methods=['PUT'])
+    @requires_auth('patch:movies')
+    def add_movie_cast_member(payload, id, actor_id):
+        try:
+            movie = Movie.query.options(Movie.with_actors()).get_or_404(id)
+            actor = Actor.query.get_or_404(actor_id)
+
+            if actor not in movie.actors:
+                movie.actors.append(actor)
+                movie.update()
+                invalidate(f'movie:{id}', f'actor:{actor_id}')
+
+            return jsonify({
+                'success': True,
+                'data': [movie.long()],
+            })
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            traceback.print_exc()
+            print(f"An error occurred: {e}")
+            abort(422)
+
+
+    '''
+    @DONE implement endpoint
+        DELETE /movies/<id>/actors/<actor_id>
+            where <id> and <actor_id> are existing model ids
+            it should respond with a 404 error if the actor is not cast in the movie
+            it should remove the actor from the cast of the movie
+            it should require the 'patch:movies' permission
+            it should contain the movie.long() data representation
+        returns status code 200 and json {"success": True, "data": movie} where movie an array containing only the updated movie
+            or appropriate status code indicating reason for failure
+    '''
+
+
+    @app.route('/movies/<int:id>/actors/<int:actor_id>', methods=['DELETE'])
+    @requires_auth('patch:movies')
+    def remove_movie_cast_member(payload, id, actor_id):
+        try:
+            movie = Movie.query.options(Movie.with_actors()).get_or_404(id)
+            actor = next((a for a in movie.actors if a.id == actor_id), None)
+            if actor is None:
+                abort(404)
+
+            movie.actors.remove(actor)
+            movie.update()
+            invalidate(f'movie:{id}', f'actor:{actor_id}')
+
+            return jsonify({
+                'success': True,
+                'data': [movie.long()],
+            })
+        except HTTPException as e:
+            raise e
+        except Exception as e:
+            traceback.print_exc()
+            print(f"An error occurred: {e}")
+            abort(422)
+
+
+def define_batch_routes(app):
+    '''
+    @DONE implement endpoint
+        POST /batch
+            it should accept a json array of operations {"method": m, "path": p, "body": b} (at most BATCH_MAX_OPERATIONS)
+                over the other routes of the api
+            it should verify the bearer token once, each operation requires the permission of its route
+            it should run the operations in order, in a single transaction
+            it should roll back a failed operation alone and report its status
+            ?atomic=true rolls back the whole batch at the first failed operation
+        returns status code 200 and json {"success": True, "data": results} where results lists the index, status and body of every operation
+            or status code 422 and json {"success": False, "data": results} for a rolled back atomic batch
+            or status code 422 and json {"success": False, "errors": errors} for invalid operations
+    '''
+
+
+    @app.route('/batch', methods=['POST'])
+    @requires_auth(None)
+    def run_operations(payload):
+        operations = request.get_json()
+        if not isinstance(operations, list) or not operations \
+                or len(operations) > BATCH_MAX_OPERATIONS:
+            abort(422)
+        atomic = request.args.get('atomic', 'false').lower() == 'true'
+
+        try:
+            validate_operations(operations)
+        except BatchValidationError as e:
+            return jsonify({
+                'success': False,
+                'error': 422,
+                'message': 'unprocessable',
+                'errors': e.errors,
+            }), 422
+
+        results, committed = run_batch(operations, payload, atomic)
+        if not committed:
+            return jsonify({
+                'success': False,
+                'error': 422,
+                'message': 'unprocessable',
+                'data': results,
+            }), 422
+
+        return jsonify({
+            'success': True,
+            'data': results,
+        })
+
+
+def define_internal_routes(app):
+    '''
+    @DONE implement endpoint
+        GET /_internal/cache
+            it should report the stats of the response cache of the worker (permission get:internal)
+        returns status code 200 and json {"success": True, "enabled": enabled, "data": stats}, stats is null when the cache is disabled
+    '''
+
+
+    @app.route('/_internal/cache', methods=['GET'])
+    @requires_auth('get:internal')
+    def cache_stats(payload):
+        cache = get_cache()
+        return jsonify({
+            'success': True,
+            'enabled': cache is not None,
+            'data': cache.stats() if cache else None,
+        })
+
+
+    '''
+    @DONE implement endpoint
+        GET /_internal/pool
+            it should report the connection pool of the engine of the worker (permission get:internal)
+        returns status code 200 and json {"success": True, "data": stats}
+    '''
+
+
+    @app.route('/_internal/pool', methods=['GET'])
+    @requires_auth('get:internal')
+    def get_pool_stats(payload):
+        return jsonify({
+            'success': True,
+            'data': pool_stats(db.get_engine(app)),
+        })
+
+
 # Error Handling
 def error_handling(app):
     '''
@@ -433,6 +898,15 @@ def error_handling(app):
     '''
 
 
+    @app.errorhandler(400)
+    def bad_request(error):
+        return jsonify({
+            'success': False,
+            'error': 400,
+            'message': 'bad request'
+        }), 400
+
+
     @app.errorhandler(404)
     def not_found(error):
         return jsonify({
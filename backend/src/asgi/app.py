@@ -0,0 +1,118 @@
+import os
+from contextlib import asynccontextmanager
+from starlette.applications import Starlette
+from starlette.exceptions import HTTPException as StarletteHTTPException
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from werkzeug.exceptions import HTTPException
+
+from ..auth.auth import AuthError
+from ..cache import RESPONSE_CACHE, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL, \
+    RESPONSE_CACHE_URL, ResponseCache, make_backend
+from ..serialization import JSON_DATE_FORMAT, JSON_PROVIDER, get_provider
+from .database import setup_async_db, warm_async_pool
+from .routes import define_routes, jsonify
+
+
+'''
+create_asgi_app(db_uri="", test_config=None)
+    the api served over ASGI with an async database driver, run it with
+        uvicorn asgi:app
+    db_uri is the DATABASE_PATH of the wsgi app (postgresql or sqlite), its
+    async driver (asyncpg or aiosqlite) is picked by async_database_url
+    test_config overrides the JSON_* and RESPONSE_CACHE_* settings
+
+    writes invalidate the response cache (RESPONSE_CACHE=shared is shared
+    with the wsgi workers) but responses are not served from it
+'''
+def create_asgi_app(db_uri="", test_config=None):
+    config = {
+        'JSON_PROVIDER': JSON_PROVIDER,
+        'JSON_DATE_FORMAT': JSON_DATE_FORMAT,
+        'RESPONSE_CACHE': RESPONSE_CACHE,
+        'RESPONSE_CACHE_SIZE': RESPONSE_CACHE_SIZE,
+        'RESPONSE_CACHE_TTL': RESPONSE_CACHE_TTL,
+        'RESPONSE_CACHE_URL': RESPONSE_CACHE_URL,
+    }
+    if test_config:
+        config.update(test_config)
+
+    app = Starlette(
+        routes=define_routes(),
+        middleware=[cors_middleware()],
+        exception_handlers=error_handlers(),
+        lifespan=lifespan,
+    )
+    app.state.config = config
+    app.state.json = get_provider(config['JSON_PROVIDER'],
+                                  config['JSON_DATE_FORMAT'])
+    app.state.cache = None
+    if config['RESPONSE_CACHE'] != 'none':
+        app.state.cache = ResponseCache(
+            make_backend(config['RESPONSE_CACHE'],
+                         config['RESPONSE_CACHE_SIZE'],
+                         config['RESPONSE_CACHE_URL']),
+            config['RESPONSE_CACHE_TTL'])
+    setup_async_db(app, db_uri or os.environ['DATABASE_PATH'])
+    return app
+
+
+@asynccontextmanager
+async def lifespan(app):
+    await warm_async_pool(app.state.engine)
+    yield
+    await app.state.engine.dispose()
+
+
+def cors_middleware():
+    '''
+    Same CORS policy as configure_cors in api.py
+    '''
+    return Middleware(
+        CORSMiddleware,
+        allow_origins=['*'],
+        allow_headers=['Content-Type', 'Authorization', 'true'],
+        allow_methods=['GET', 'PUT', 'POST', 'DELETE', 'OPTIONS', 'PATCH'],
+    )
+
+
+# Error Handling
+'''
+ERROR_MESSAGES
+    status code -> message of the error handlers of api.py
+'''
+ERROR_MESSAGES = {
+    400: 'bad request',
+    404: 'resource not found',
+    422: 'unprocessable',
+}
+
+
+def error_handlers():
+    async def http_error(request, error):
+        return jsonify(request, {
+            'success': False,
+            'error': error.code,
+            'message': ERROR_MESSAGES.get(error.code, error.name.lower()),
+        }, error.code)
+
+    async def routing_error(request, error):
+        code = error.status_code
+        return jsonify(request, {
+            'success': False,
+            'error': code,
+            'message': ERROR_MESSAGES.get(code, error.detail.lower()),
+        }, code)
+
+    async def auth_error(request, error):
+        return jsonify(request, {
+            'success': False,
+            'error': error.error['code'],
+            'message': error.error['description'],
+        }, error.status_code)
+
+    return {
+        HTTPException: http_error,
+        StarletteHTTPException: routing_error,
+        AuthError: auth_error,
+    }
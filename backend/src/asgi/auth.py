@@ -0,0 +1,34 @@
+from functools import wraps
+from starlette.concurrency import run_in_threadpool
+
+from ..auth import auth
+
+
+'''
+@requires_auth(permission) decorator method
+    async counterpart of auth.requires_auth for the asgi endpoints
+    @INPUTS
+        permission: string permission (i.e. 'post:actors')
+
+    it should raise the AuthError auth.requires_auth raises for the same
+        request
+    a token missing from auth.token_cache is verified in the thread pool,
+        so fetching the JWKS does not block the event loop
+    return the decorator which passes the decoded payload and the request
+        to the decorated endpoint
+'''
+def requires_auth(permission=''):
+    def requires_auth_decorator(f):
+        @wraps(f)
+        async def wrapper(request):
+            token = auth.parse_auth_header(
+                request.headers.get('Authorization', None))
+            payload = auth.token_cache.get(token)
+            if payload is None:
+                payload = await run_in_threadpool(auth.verify_signed_jwt,
+                                                  token)
+            auth.check_permissions(permission, payload)
+            return await f(payload, request)
+
+        return wrapper
+    return requires_auth_decorator
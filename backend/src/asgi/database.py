@@ -0,0 +1,69 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.util import greenlet_spawn
+
+from ..database.models import VersionedSession
+from ..database.pool import engine_options, warm_pool
+
+
+'''
+ASYNC_DRIVERS
+    database backend -> async driver used by the asgi entry point
+'''
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'postgres': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+}
+
+
+'''
+async_database_url(database_path)
+    the url of database_path with the async driver of its database, the
+    DATABASE_PATH of the wsgi app can be used as is
+    it should raise a ValueError for a database without async driver
+'''
+def async_database_url(database_path):
+    url = make_url(database_path)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'No async driver for the {backend} database')
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+'''
+setup_async_db(app, database_path)
+    binds an asgi application to an async engine, with the pool settings of
+    the wsgi app (see pool.py)
+    app.state.engine is the engine, app.state.sessions the factory of the
+    sessions, which bump the table versions on flush like db.session
+'''
+def setup_async_db(app, database_path):
+    app.state.engine = create_async_engine(
+        async_database_url(database_path),
+        **engine_options(database_path, asyncio=True))
+    app.state.sessions = sessionmaker(
+        app.state.engine, class_=AsyncSession,
+        sync_session_class=VersionedSession)
+
+
+'''
+run_in_session(request, fn)
+    returns fn(session) run in a new session of the application
+    fn is plain synchronous SQLAlchemy code (the helpers of the wsgi app
+    taking a session), each query it runs awaits the async driver so the
+    event loop keeps serving the other requests meanwhile
+    the session is rolled back and closed afterwards
+'''
+async def run_in_session(request, fn):
+    async with request.app.state.sessions() as session:
+        return await session.run_sync(fn)
+
+
+'''
+warm_async_pool(engine)
+    warm_pool for an async engine, awaited when the application starts
+'''
+async def warm_async_pool(engine):
+    return await greenlet_spawn(warm_pool, engine.sync_engine)
@@ -0,0 +1,380 @@
+import traceback
+from functools import wraps
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+from werkzeug.exceptions import HTTPException, abort
+from werkzeug.http import parse_etags
+
+from ..api import actor_tags, movie_tags
+from ..auth.auth import AuthError
+from ..conditional import compute_etag
+from ..database.bulk import BULK_MAX_ITEMS, BULK_MODELS, \
+    BulkValidationError, bulk_create
+from ..database.models import Actor, Movie
+from ..database.pool import pool_stats
+from ..export import EXPORT_BATCH_SIZE, EXPORT_FORMATS, csv_header, \
+    get_export_format, write_chunk
+from ..fields import detail_options, get_fields, select_fields, \
+    serialize_detail
+from ..pagination import count_rows, get_page_args, paginate
+from ..search import get_search_args, search_rows
+from .auth import requires_auth
+from .database import run_in_session
+
+
+'''
+ASGI routes
+the actor and movie routes of api.py served by async endpoints, with the
+same permissions, query arguments, responses and error contract
+the database work of an endpoint is one synchronous function run with
+run_in_session, so the helpers of the wsgi app are shared as they are
+'''
+
+
+TAGS = {Actor: actor_tags, Movie: movie_tags}
+
+
+def jsonify(request, data, status_code=200):
+    return Response(request.app.state.json.dumps(data), status_code,
+                    media_type='application/json')
+
+
+'''
+invalidate(request, *tags)
+    drops the cached responses depending on any of tags from the response
+    cache shared with the wsgi workers, call it after the write is committed
+'''
+def invalidate(request, *tags):
+    cache = request.app.state.cache
+    if cache is not None and tags:
+        cache.invalidate(tags)
+
+
+def full_path(request):
+    query = request.scope['query_string'].decode('utf-8', 'replace')
+    return request.scope['path'] + '?' + query
+
+
+'''
+@endpoint decorator method
+    the try / except of the flask routes: HTTP errors and AuthError reach
+    the error handlers, any other exception is logged and answered 422
+'''
+def endpoint(f):
+    @wraps(f)
+    async def wrapper(*args):
+        try:
+            return await f(*args)
+        except (HTTPException, AuthError):
+            raise
+        except Exception as e:
+            traceback.print_exc()
+            print(f"An error occurred: {e}")
+            abort(422)
+
+    return wrapper
+
+
+'''
+@conditional(*tables) decorator method
+    async counterpart of conditional.conditional, the etags are the ones
+    the wsgi app sends for the same url
+    use it below @requires_auth so only authorized requests are answered
+'''
+def conditional(*tables):
+    def conditional_decorator(f):
+        @wraps(f)
+        async def wrapper(payload, request):
+            path = full_path(request)
+            etag = await run_in_session(
+                request, lambda session: compute_etag(tables, path, session))
+            if parse_etags(request.headers.get('If-None-Match')) \
+                    .contains_weak(etag):
+                response = Response(status_code=304)
+            else:
+                response = await f(payload, request)
+                if response.status_code != 200:
+                    return response
+
+            response.headers['ETag'] = f'"{etag}"'
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+
+        return wrapper
+    return conditional_decorator
+
+
+def get_or_404(session, model, id, options=()):
+    row = session.get(model, id, options=list(options))
+    if row is None:
+        abort(404)
+    return row
+
+
+'''
+model_routes(model, related)
+    the routes of api.py for the table of model
+    related is the model of the rows listed by its detail route
+'''
+def model_routes(model, related):
+    name = model.__tablename__
+
+    @requires_auth(f'get:{name}')
+    @conditional(name)
+    @endpoint
+    async def retrieve_rows(payload, request):
+        limit, after, count = get_page_args(request.query_params)
+        fields = get_fields(model, args=request.query_params)
+
+        def retrieve(session):
+            rows, next_cursor = paginate(select_fields(model, fields),
+                                         model.id, limit, after, session)
+            result = {
+                'success': True,
+                'data': [row._asdict() for row in rows],
+                'next': next_cursor,
+            }
+            if count:
+                result['total'], result['totalIsEstimate'] = count_rows(
+                    session, model, count)
+            return result
+
+        return jsonify(request, await run_in_session(request, retrieve))
+
+    @requires_auth(f'get:{name}')
+    @endpoint
+    async def export_rows(payload, request):
+        fmt = get_export_format(request.query_params)
+        fields = get_fields(model, args=request.query_params)
+        statement = select_fields(model, fields).order_by(model.id)
+        encode = request.app.state.json.dumps
+
+        async def body():
+            async with request.app.state.sessions() as session:
+                result = await session.stream(statement)
+                fields = list(result.keys())
+                if fmt == 'csv':
+                    yield csv_header(fields)
+                async for rows in result.partitions(EXPORT_BATCH_SIZE):
+                    yield write_chunk(rows, fields, fmt, encode)
+
+        return StreamingResponse(
+            body(), media_type=EXPORT_FORMATS[fmt],
+            headers={'Content-Disposition':
+                     f'attachment; filename={name}.{fmt}'})
+
+    @requires_auth(f'get:{name}')
+    @conditional(name)
+    @endpoint
+    async def search(payload, request):
+        q, limit, offset = get_search_args(request.query_params)
+        fields = get_fields(model, args=request.query_params)
+        rows, next_cursor = await run_in_session(
+            request, lambda session: search_rows(model, q, limit, offset,
+                                                 fields, session))
+
+        return jsonify(request, {
+            'success': True,
+            'data': [row._asdict() for row in rows],
+            'next': next_cursor,
+        })
+
+    @requires_auth(f'get:{name}-detail')
+    @conditional(name, related.__tablename__)
+    @endpoint
+    async def retrieve_detail(payload, request):
+        id = request.path_params['id']
+        fields = get_fields(model, detail=True, args=request.query_params)
+
+        def retrieve(session):
+            row = get_or_404(session, model, id,
+                             detail_options(model, fields))
+            return serialize_detail(row, fields)
+
+        return jsonify(request, {
+            'success': True,
+            'data': await run_in_session(request, retrieve),
+        })
+
+    @requires_auth(f'post:{name}')
+    @endpoint
+    async def create_row(payload, request):
+        body = await request.json()
+        validate = BULK_MODELS[model][0]
+        try:
+            values = validate(body)
+        except ValueError:
+            abort(422)
+
+        def create(session):
+            row = model(**values)
+            session.add(row)
+            session.commit()
+            return row.long()
+
+        data = await run_in_session(request, create)
+        invalidate(request, name)
+
+        return jsonify(request, {
+            'success': True,
+            'data': [data],
+        })
+
+    @requires_auth(f'post:{name}')
+    @endpoint
+    async def create_rows(payload, request):
+        items = await request.json()
+        if not isinstance(items, list) or not items \
+                or len(items) > BULK_MAX_ITEMS:
+            abort(422)
+        atomic = request.query_params.get('atomic', 'false').lower() \
+            == 'true'
+
+        try:
+            created, errors = await run_in_session(
+                request, lambda session: bulk_create(model, items, atomic,
+                                                     session))
+        except BulkValidationError as e:
+            return jsonify(request, {
+                'success': False,
+                'error': 422,
+                'message': 'unprocessable',
+                'errors': e.errors,
+            }, 422)
+        invalidate(request, name)
+
+        return jsonify(request, {
+            'success': True,
+            'data': created,
+            'errors': errors,
+        })
+
+    @requires_auth(f'patch:{name}')
+    @endpoint
+    async def update_row(payload, request):
+        id = request.path_params['id']
+        body = await request.json()
+        validate = BULK_MODELS[model][0]
+
+        def update(session):
+            row = get_or_404(session, model, id)
+            try:
+                values = validate(body, partial=True)
+            except ValueError:
+                abort(422)
+            for column, value in values.items():
+                setattr(row, column, value)
+            session.commit()
+            return TAGS[model](row), row.long()
+
+        tags, data = await run_in_session(request, update)
+        invalidate(request, *tags)
+
+        return jsonify(request, {
+            'success': True,
+            'data': [data],
+        })
+
+    @requires_auth(f'delete:{name}')
+    @endpoint
+    async def delete_row(payload, request):
+        id = request.path_params['id']
+
+        def delete(session):
+            row = get_or_404(session, model, id)
+            tags = TAGS[model](row)
+            session.delete(row)
+            session.commit()
+            return tags
+
+        invalidate(request, *await run_in_session(request, delete))
+
+        return jsonify(request, {
+            'success': True,
+            'deleted': id
+        })
+
+    return [
+        Route(f'/{name}', retrieve_rows, methods=['GET']),
+        Route(f'/{name}', create_row, methods=['POST']),
+        Route(f'/{name}/export', export_rows, methods=['GET']),
+        Route(f'/{name}/search', search, methods=['GET']),
+        Route(f'/{name}/bulk', create_rows, methods=['POST']),
+        Route(f'/{name}/{{id:int}}', retrieve_detail, methods=['GET']),
+        Route(f'/{name}/{{id:int}}', update_row, methods=['PATCH']),
+        Route(f'/{name}/{{id:int}}', delete_row, methods=['DELETE']),
+    ]
+
+
+'''
+casting_routes()
+    PUT and DELETE /movies/<id>/actors/<actor_id> of api.py
+'''
+def casting_routes():
+    @requires_auth('patch:movies')
+    @endpoint
+    async def add_cast_member(payload, request):
+        id, actor_id = request.path_params['id'], \
+            request.path_params['actor_id']
+
+        def add(session):
+            movie = get_or_404(session, Movie, id, [Movie.with_actors()])
+            actor = get_or_404(session, Actor, actor_id)
+            changed = actor not in movie.actors
+            if changed:
+                movie.actors.append(actor)
+                session.commit()
+            return changed, movie.long()
+
+        changed, data = await run_in_session(request, add)
+        if changed:
+            invalidate(request, f'movie:{id}', f'actor:{actor_id}')
+
+        return jsonify(request, {
+            'success': True,
+            'data': [data],
+        })
+
+    @requires_auth('patch:movies')
+    @endpoint
+    async def remove_cast_member(payload, request):
+        id, actor_id = request.path_params['id'], \
+            request.path_params['actor_id']
+
+        def remove(session):
+            movie = get_or_404(session, Movie, id, [Movie.with_actors()])
+            actor = next((a for a in movie.actors if a.id == actor_id), None)
+            if actor is None:
+                abort(404)
+            movie.actors.remove(actor)
+            session.commit()
+            return movie.long()
+
+        data = await run_in_session(request, remove)
+        invalidate(request, f'movie:{id}', f'actor:{actor_id}')
+
+        return jsonify(request, {
+            'success': True,
+            'data': [data],
+        })
+
+    path = '/movies/{id:int}/actors/{actor_id:int}'
+    return [
+        Route(path, add_cast_member, methods=['PUT']),
+        Route(path, remove_cast_member, methods=['DELETE']),
+    ]
+
+
+@requires_auth('get:internal')
+@endpoint
+async def pool_stats_route(payload, request):
+    return jsonify(request, {
+        'success': True,
+        'data': pool_stats(request.app.state.engine),
+    })
+
+
+def define_routes():
+    return model_routes(Actor, Movie) + model_routes(Movie, Actor) + \
+        casting_routes() + \
+        [Route('/_internal/pool', pool_stats_route, methods=['GET'])]
@@ -1,13 +1,54 @@
-import json
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
 from flask import request, _request_ctx_stack
 from functools import wraps
 from jose import jwt
-from urllib.request import urlopen
+
+from ..metrics import observe_auth, observe_cache
+from .backends import get_backend, split_token
+from .jwks import JWKSError, JWKSKeyStore
 
 
 AUTH0_DOMAIN = 'phuoc-uda-fsnd-capstone.us.auth0.com'
 ALGORITHMS = ['RS256']
 API_AUDIENCE = 'uda-fsnd-capstone-api'
+JWKS_URL = os.environ.get(
+    'AUTH0_JWKS_URL', f'https://{AUTH0_DOMAIN}/.well-known/jwks.json')
+JWKS_TTL = int(os.environ.get('AUTH0_JWKS_TTL', 600))
+TOKEN_CACHE_SIZE = int(os.environ.get('AUTH_TOKEN_CACHE_SIZE', 1024))
+JWT_BACKEND = os.environ.get('AUTH_JWT_BACKEND', 'auto')
+# environ key of the payload POST /batch verified, set on its operations
+AUTH_PAYLOAD_ENVIRON = 'casting.auth_payload'
+
+'''
+verify_backend
+    the crypto backend checking token signatures, see backends.py
+    AUTH_JWT_BACKEND selects it: auto (default), jose or cryptography
+'''
+verify_backend = get_backend(JWT_BACKEND)
+
+'''
+jwks_store
+    process wide cache of the Auth0 signing keys, parsed once per kid
+    point AUTH0_JWKS_URL at a local stub to verify locally minted tokens
+'''
+jwks_store = JWKSKeyStore(JWKS_URL, ttl=JWKS_TTL,
+                          loader=verify_backend.load_key)
+
+
+'''
+set_verify_backend(name)
+    switches the backend used by verify_decode_jwt
+    the cached key objects and verified tokens are dropped
+'''
+def set_verify_backend(name):
+    global verify_backend
+    verify_backend = get_backend(name)
+    jwks_store.set_loader(verify_backend.load_key)
+    token_cache.invalidate()
 
 ## AuthError Exception
 '''
@@ -20,6 +61,83 @@ class AuthError(Exception):
         self.status_code = status_code
 
 
+## Verified Token Cache
+'''
+TokenCache
+a bounded LRU of verified tokens, so repeated calls with the same bearer
+token skip the signature check and claim validation
+    @INPUTS
+        maxsize: maximum number of tokens kept, the least recently used
+            token is dropped first
+
+    entries are keyed by the sha256 of the token and expire with the token
+    hits and misses count lookups, invalidate() drops one token or all
+'''
+class TokenCache:
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(token):
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def get(self, token):
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                observe_cache('token', True)
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            observe_cache('token', False)
+            return None
+
+    def put(self, token, payload):
+        exp = payload.get('exp')
+        if self.maxsize <= 0 or not isinstance(exp, (int, float)):
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (exp, payload)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token=None):
+        with self._lock:
+            if token is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(self._key(token), None)
+
+    def stats(self):
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+        }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+'''
+token_cache
+    process wide cache used by verify_decode_jwt
+    set AUTH_TOKEN_CACHE_SIZE=0 to disable it
+'''
+token_cache = TokenCache(TOKEN_CACHE_SIZE)
+
+
 ## Auth Header
 
 '''
@@ -31,7 +149,15 @@ class AuthError(Exception):
     return the token part of the header
 '''
 def get_token_auth_header():
-    auth = request.headers.get('Authorization', None)
+    return parse_auth_header(request.headers.get('Authorization', None))
+
+
+'''
+parse_auth_header(auth)
+    returns the token of the Authorization header value auth
+    it should raise an AuthError if auth is empty or malformed
+'''
+def parse_auth_header(auth):
     if not auth:
         raise AuthError({
             'code': 'authorization_header_missing',
@@ -79,18 +205,26 @@ def check_permissions(permission, payload):
         token: a json web token (string)
 
     it should be an Auth0 token with key id (kid)
-    it should verify the token using Auth0 /.well-known/jwks.json
+    it should verify the token with verify_backend against the key object
+        cached in jwks_store
     it should decode the payload from the token
     it should validate the claims
     return the decoded payload
 
+    a token verified before and not yet expired is answered from token_cache,
+    verify_signed_jwt(token) checks a token without looking it up
+
     !!NOTE urlopen has a common certificate error described here: https://stackoverflow.com/questions/50236117/scraping-ssl-certificate-verify-failed-error-for-http-en-wikipedia-org
 '''
 def verify_decode_jwt(token):
-    jsonurl = urlopen(f'https://{AUTH0_DOMAIN}/.well-known/jwks.json')
-    jwks = json.loads(jsonurl.read())
+    payload = token_cache.get(token)
+    if payload is not None:
+        return payload
+    return verify_signed_jwt(token)
+
+
+def verify_signed_jwt(token):
     unverified_header = jwt.get_unverified_header(token)
-    rsa_key = {}
 
     if 'kid' not in unverified_header:
         raise AuthError({
@@ -98,26 +232,33 @@ def verify_decode_jwt(token):
             'description': 'Authorization malformed.'
         }, 401)
 
-    for key in jwks['keys']:
-        if key['kid'] == unverified_header['kid']:
-            rsa_key = {
-                'kty': key['kty'],
-                'kid': key['kid'],
-                'use': key['use'],
-                'n': key['n'],
-                'e': key['e']
-            }
-
-    if rsa_key:
+    try:
+        key = jwks_store.get_key(unverified_header['kid'])
+    except JWKSError:
+        raise AuthError({
+            'code': 'jwks_unavailable',
+            'description': 'Unable to fetch the signing keys.'
+        }, 503)
+
+    if key:
         try:
+            if unverified_header.get('alg') not in ALGORITHMS:
+                raise jwt.JWTError('The specified alg value is not allowed')
+            signing_input, signature = split_token(token)
+            if not verify_backend.verify(signing_input, signature, key):
+                raise jwt.JWTError('Signature verification failed.')
+
+            # the signature is checked above, jose only validates the claims
             payload = jwt.decode(
                 token,
-                rsa_key,
+                '',
                 algorithms=ALGORITHMS,
+                options={'verify_signature': False},
                 audience=API_AUDIENCE,
                 issuer='https://' + AUTH0_DOMAIN + '/'
             )
 
+            token_cache.put(token, payload)
             return payload
 
         except jwt.ExpiredSignatureError:
@@ -142,13 +283,26 @@ def verify_decode_jwt(token):
         'description': 'Unable to find the appropriate key.'
     }, 403)
 
+'''
+authenticate()
+    the payload of the token of the request, see verify_decode_jwt
+    the operations of POST /batch carry the payload of the batch in their
+    environ (AUTH_PAYLOAD_ENVIRON), their token is not verified again
+'''
+def authenticate():
+    payload = request.environ.get(AUTH_PAYLOAD_ENVIRON)
+    if payload is not None:
+        return payload
+    token = get_token_auth_header()
+    return verify_decode_jwt(token)
+
 '''
 @DONE implement @requires_auth(permission) decorator method
     @INPUTS
-        permission: string permission (i.e. 'post:drink')
+        permission: string permission (i.e. 'post:drink'), None only
+            verifies the token (routes checking permissions themselves)
 
-    it should use the get_token_auth_header method to get the token
-    it should use the verify_decode_jwt method to decode the jwt
+    it should use the authenticate method to get and decode the jwt
     it should use the check_permissions method validate claims and check the requested permission
     return the decorator which passes the decoded payload to the decorated method
 '''
@@ -156,9 +310,15 @@ def requires_auth(permission=''):
     def requires_auth_decorator(f):
         @wraps(f)
         def wrapper(*args, **kwargs):
-            token = get_token_auth_header()
-            payload = verify_decode_jwt(token)
-            check_permissions(permission, payload)
+            started = time.perf_counter()
+            try:
+                payload = authenticate()
+                if permission is not None:
+                    check_permissions(permission, payload)
+            except AuthError:
+                observe_auth(time.perf_counter() - started, 'denied')
+                raise
+            observe_auth(time.perf_counter() - started, 'ok')
             return f(payload, *args, **kwargs)
 
         return wrapper
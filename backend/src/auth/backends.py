@@ -0,0 +1,114 @@
+from jose import jwk
+from jose.utils import base64url_decode, base64_to_long
+
+
+'''
+JWT verification backends
+a backend turns a jwk into a ready to use public key object once, then checks
+RS256 signatures against it
+
+    load_key(key): returns the public key object for a jwk dict
+    verify(signing_input, signature, key): returns True if the signature of
+        signing_input (bytes) matches the loaded key
+'''
+
+
+'''
+JoseBackend
+verifies with python-jose's own RSA key class (pycryptodome)
+'''
+class JoseBackend:
+    name = 'jose'
+
+    def __init__(self, algorithm='RS256'):
+        self.algorithm = algorithm
+
+    def load_key(self, key):
+        return jwk.construct(key, self.algorithm)
+
+    def verify(self, signing_input, signature, key):
+        return key.verify(signing_input, signature)
+
+
+'''
+CryptographyBackend
+verifies with the OpenSSL bindings of the cryptography package
+requires the optional cryptography dependency
+'''
+class CryptographyBackend:
+    name = 'cryptography'
+
+    def __init__(self, algorithm='RS256'):
+        from cryptography.exceptions import InvalidSignature
+        from cryptography.hazmat.backends import default_backend
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import padding, rsa
+
+        self.algorithm = algorithm
+        self._invalid_signature = InvalidSignature
+        self._backend = default_backend()
+        self._hash = hashes.SHA256()
+        self._padding = padding.PKCS1v15()
+        self._public_numbers = rsa.RSAPublicNumbers
+
+    def load_key(self, key):
+        numbers = self._public_numbers(
+            base64_to_long(key['e']), base64_to_long(key['n']))
+        return numbers.public_key(self._backend)
+
+    def verify(self, signing_input, signature, key):
+        try:
+            key.verify(signature, signing_input, self._padding, self._hash)
+        except self._invalid_signature:
+            return False
+        return True
+
+
+BACKENDS = {
+    JoseBackend.name: JoseBackend,
+    CryptographyBackend.name: CryptographyBackend,
+}
+
+
+'''
+available_backends()
+    returns the names of the backends whose dependencies are installed
+'''
+def available_backends():
+    names = []
+    for name, backend in BACKENDS.items():
+        try:
+            backend()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+'''
+get_backend(name)
+    @INPUTS
+        name: a BACKENDS key, or 'auto' for the fastest installed backend
+
+    it should raise a ValueError for an unknown name
+    it should raise an ImportError if the backend is not installed
+'''
+def get_backend(name='auto'):
+    if name == 'auto':
+        try:
+            return CryptographyBackend()
+        except ImportError:
+            return JoseBackend()
+    if name not in BACKENDS:
+        raise ValueError(f'Unknown JWT backend: {name}')
+    return BACKENDS[name]()
+
+
+'''
+split_token(token)
+    returns (header segment + '.' + payload segment as bytes, raw signature)
+'''
+def split_token(token):
+    signing_input, _, crypto_segment = token.rpartition('.')
+    return signing_input.encode('ascii'), \
+        base64url_decode(crypto_segment.encode('ascii'))
@@ -0,0 +1,156 @@
+import json
+import logging
+import threading
+import time
+from urllib.request import urlopen
+
+
+logger = logging.getLogger(__name__)
+
+'''
+JWKSError Exception
+raised when no signing key set could ever be fetched from the JWKS url
+'''
+class JWKSError(Exception):
+    pass
+
+
+'''
+JWKSKeyStore
+an in-process cache of the identity provider's JSON Web Key Set
+
+    @INPUTS
+        url: the jwks url (i.e. https://<AUTH0_DOMAIN>/.well-known/jwks.json)
+        ttl: seconds a fetched key set is considered fresh
+        timeout: seconds to wait for the jwks url to answer
+        min_refresh_interval: minimum seconds between two fetch attempts
+            that were not triggered by the ttl (unknown kid, failed fetch)
+        loader: callable turning a jwk dict into a key object, each kid is
+            loaded once and the key object is what get_key returns
+
+    keys are fetched once and served from memory until the ttl expires,
+    after which a background thread refreshes them while the stale keys keep
+    being served. an unknown kid forces a single synchronous refresh. when a
+    fetch fails the previously fetched keys stay in use.
+'''
+class JWKSKeyStore:
+    def __init__(self, url, ttl=600, timeout=5, min_refresh_interval=30,
+                 loader=None):
+        self.url = url
+        self.ttl = ttl
+        self.timeout = timeout
+        self.min_refresh_interval = min_refresh_interval
+        self.loader = loader
+        self._keys = {}
+        self._loaded = {}
+        self._fetched_at = None
+        self._last_attempt = None
+        self._last_completed = None
+        self._refresh_lock = threading.Lock()
+
+    '''
+    fetch()
+        downloads the key set and returns it as a {kid: jwk} dict
+    '''
+
+    def fetch(self):
+        with urlopen(self.url, timeout=self.timeout) as response:
+            jwks = json.loads(response.read())
+        return {key['kid']: key for key in jwks.get('keys', []) if 'kid' in key}
+
+    '''
+    refresh()
+        fetches the key set and replaces the cached keys
+        the cached keys are kept if the fetch fails
+        returns True if the keys were replaced
+    '''
+
+    def refresh(self):
+        self._last_attempt = time.monotonic()
+        try:
+            keys = self.fetch()
+        except Exception as e:
+            logger.warning('Unable to refresh JWKS from %s: %s', self.url, e)
+            return False
+        finally:
+            self._last_completed = time.monotonic()
+
+        # keep the key objects of kids whose jwk did not change
+        self._loaded = {kid: loaded for kid, loaded in self._loaded.items()
+                        if keys.get(kid) == self._keys.get(kid)}
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+        return True
+
+    '''
+    get_key(kid)
+        returns the key object for kid (the jwk itself without a loader),
+        or None if the key set does not contain it
+        it should raise a JWKSError if no key set could be fetched at all
+    '''
+
+    def get_key(self, kid):
+        if self._fetched_at is None:
+            self._refresh_once()
+        elif self.is_stale():
+            self._refresh_in_background()
+
+        key = self._keys.get(kid)
+        if key is None and self._fetched_at is not None and self._may_retry():
+            self._refresh_once()
+            key = self._keys.get(kid)
+
+        if self._fetched_at is None:
+            raise JWKSError(f'Unable to fetch JWKS from {self.url}')
+        if key is None or self.loader is None:
+            return key
+
+        loaded = self._loaded.get(kid)
+        if loaded is None:
+            loaded = self._loaded[kid] = self.loader(key)
+        return loaded
+
+    '''
+    set_loader(loader)
+        swaps the loader and drops the key objects built by the previous one
+    '''
+
+    def set_loader(self, loader):
+        self.loader = loader
+        self._loaded = {}
+
+    def is_stale(self):
+        return self._fetched_at is None or \
+            time.monotonic() - self._fetched_at >= self.ttl
+
+    def clear(self):
+        self._keys = {}
+        self._loaded = {}
+        self._fetched_at = None
+        self._last_attempt = None
+
+    def _may_retry(self):
+        return self._last_attempt is None or \
+            time.monotonic() - self._last_attempt >= self.min_refresh_interval
+
+    def _refresh_once(self):
+        # single flight: threads that queued behind a refresh reuse its result
+        started = time.monotonic()
+        with self._refresh_lock:
+            if self._last_completed is not None and \
+                    self._last_completed >= started:
+                return
+            self.refresh()
+
+    def _refresh_in_background(self):
+        if not self._may_retry():
+            return
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        threading.Thread(target=self._background_refresh, daemon=True).start()
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        finally:
+            self._refresh_lock.release()
@@ -0,0 +1,140 @@
+import base64
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from Crypto.PublicKey import RSA
+from jose import jwt
+
+from .auth import ALGORITHMS, API_AUDIENCE, AUTH0_DOMAIN
+
+
+'''
+Local Auth0 stand-in
+mints RS256 tokens and serves the matching JWKS over http so the api can be
+exercised without the hosted tenant, set AUTH0_JWKS_URL to LocalJWKSServer.url
+'''
+
+ROLE_PERMISSIONS = {
+    'assistant': [
+        'get:actors', 'get:actors-detail',
+        'get:movies', 'get:movies-detail',
+    ],
+    'director': [
+        'get:actors', 'get:actors-detail',
+        'get:movies', 'get:movies-detail',
+        'post:actors', 'patch:actors', 'delete:actors',
+        'patch:movies',
+    ],
+    'producer': [
+        'get:actors', 'get:actors-detail',
+        'get:movies', 'get:movies-detail',
+        'post:actors', 'patch:actors', 'delete:actors',
+        'post:movies', 'patch:movies', 'delete:movies',
+    ],
+    'operator': ['get:internal'],
+}
+
+
+def _b64_uint(value):
+    data = value.to_bytes((value.bit_length() + 7) // 8, 'big')
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+'''
+LocalIssuer
+an RSA signing key with a kid, able to mint Auth0 shaped access tokens
+'''
+class LocalIssuer:
+    def __init__(self, kid='local-key-1', bits=2048):
+        self.rotate(kid, bits)
+
+    '''
+    rotate(kid)
+        replaces the signing key, tokens minted before no longer verify
+    '''
+
+    def rotate(self, kid, bits=2048):
+        self.kid = kid
+        self._key = RSA.generate(bits)
+        self._pem = self._key.exportKey('PEM').decode('ascii')
+
+    def jwks(self):
+        return {'keys': [{
+            'kty': 'RSA',
+            'kid': self.kid,
+            'use': 'sig',
+            'alg': ALGORITHMS[0],
+            'n': _b64_uint(self._key.n),
+            'e': _b64_uint(self._key.e),
+        }]}
+
+    '''
+    mint(permissions)
+        @INPUTS
+            permissions: list of permission strings, or a ROLE_PERMISSIONS key
+            expires_in: seconds until the token expires
+            claims: extra claims overriding the defaults
+
+        returns a signed RS256 token string
+    '''
+
+    def mint(self, permissions, expires_in=3600, **claims):
+        if isinstance(permissions, str):
+            permissions = ROLE_PERMISSIONS[permissions]
+        now = int(time.time())
+        payload = {
+            'iss': 'https://' + AUTH0_DOMAIN + '/',
+            'sub': 'local|' + self.kid,
+            'aud': API_AUDIENCE,
+            'iat': now,
+            'exp': now + expires_in,
+            'permissions': list(permissions),
+        }
+        payload.update(claims)
+        return jwt.encode(payload, self._pem, algorithm=ALGORITHMS[0],
+                          headers={'kid': self.kid})
+
+
+'''
+LocalJWKSServer
+serves issuer.jwks() at /.well-known/jwks.json on a background thread
+    requests counts the jwks fetches served
+'''
+class LocalJWKSServer:
+    def __init__(self, issuer, host='127.0.0.1', port=0):
+        self.issuer = issuer
+        self.requests = 0
+        store = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                store.requests += 1
+                body = json.dumps(store.issuer.jwks()).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}/.well-known/jwks.json'
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
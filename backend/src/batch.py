@@ -0,0 +1,118 @@
+import os
+import traceback
+from urllib.parse import urlsplit
+from flask import current_app
+from sqlalchemy import exc
+from werkzeug.exceptions import UnprocessableEntity
+
+from .auth.auth import AUTH_PAYLOAD_ENVIRON
+from .cache import deferred_invalidation
+from .database.instrumentation import nested_request_queries
+from .database.models import begin_transaction, unit_of_work
+
+
+BATCH_MAX_OPERATIONS = int(os.environ.get('BATCH_MAX_OPERATIONS', 100))
+BATCH_METHODS = ('GET', 'POST', 'PUT', 'PATCH', 'DELETE')
+
+'''
+BatchValidationError Exception
+carries the per operation errors of a batch, as [{'index': i, 'message': m}]
+'''
+class BatchValidationError(Exception):
+    def __init__(self, errors):
+        self.errors = errors
+
+
+'''
+validate_operation(operation)
+    an operation is {"method": m, "path": p, "body": b}, path is the path
+    (and query string) of a route of the api, body its optional json body
+    it should raise a ValueError describing the first invalid field
+'''
+def validate_operation(operation):
+    if not isinstance(operation, dict):
+        raise ValueError('operation must be an object')
+    method = operation.get('method')
+    if not isinstance(method, str) or method.upper() not in BATCH_METHODS:
+        raise ValueError('method must be one of ' + ', '.join(BATCH_METHODS))
+    path = operation.get('path')
+    if not isinstance(path, str) or not path.startswith('/'):
+        raise ValueError('path must be an absolute path')
+    if urlsplit(path).path.rstrip('/') == '/batch':
+        raise ValueError('batches cannot be nested')
+
+
+def validate_operations(operations):
+    errors = []
+    for index, operation in enumerate(operations):
+        try:
+            validate_operation(operation)
+        except ValueError as e:
+            errors.append({'index': index, 'message': str(e)})
+    if errors:
+        raise BatchValidationError(errors)
+
+
+'''
+run_operation(app, session, index, operation, payload)
+    dispatches operation to its view in a request context of its own,
+    authenticated as payload, the token is not verified again
+    the errors are answered by the error handlers of app, as for a request
+    the changes the view staged are flushed with it, a failed flush is
+    answered with a 422 like the errors of the views
+    returns {'index': index, 'status': status, 'body': body} where body is
+    the json body of the response (its text for other types)
+'''
+def run_operation(app, session, index, operation, payload):
+    parts = urlsplit(operation['path'])
+    with app.test_request_context(
+            parts.path, method=operation['method'].upper(),
+            query_string=parts.query, json=operation.get('body'),
+            environ_overrides={AUTH_PAYLOAD_ENVIRON: payload}):
+        with nested_request_queries():
+            try:
+                response = app.make_response(app.dispatch_request())
+                if response.status_code < 400:
+                    session.flush()
+            except exc.SQLAlchemyError:
+                traceback.print_exc()
+                response = app.make_response(
+                    app.handle_user_exception(UnprocessableEntity()))
+            except Exception as e:
+                response = app.make_response(app.handle_user_exception(e))
+            body = response.get_json() if response.is_json \
+                else response.get_data(as_text=True)
+    return {'index': index, 'status': response.status_code, 'body': body}
+
+
+'''
+run_batch(operations, payload, atomic=False)
+    runs the validated operations in order, in a single unit_of_work
+    each operation runs in a savepoint, an operation answering an error
+    (status 400 and above) is rolled back alone
+    with atomic the first failed operation rolls back the whole batch and
+    the operations left are not run
+    the reads of an operation see the writes of the ones before it, the
+    cache is bypassed and invalidated after the commit
+    returns the results of the operations run (see run_operation) and
+    whether the batch was committed
+'''
+def run_batch(operations, payload, atomic=False):
+    app = current_app._get_current_object()
+    results = []
+    with deferred_invalidation(), unit_of_work() as session:
+        # the reads of the operations must see the writes of the batch
+        session.info['primary'] = True
+        begin_transaction(session)
+        for index, operation in enumerate(operations):
+            savepoint = session.begin_nested()
+            result = run_operation(app, session, index, operation, payload)
+            results.append(result)
+            if result['status'] < 400:
+                savepoint.commit()
+                continue
+            savepoint.rollback()
+            if atomic:
+                session.rollback()
+                return results, False
+    return results, True
@@ -0,0 +1,373 @@
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+from urllib.parse import urlencode
+from flask import current_app, g, make_response, request
+
+from .compression import mark_encoded, negotiate
+from .metrics import observe_cache
+
+
+RESPONSE_CACHE = os.environ.get('RESPONSE_CACHE', 'none')
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 1024))
+RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 300))
+RESPONSE_CACHE_URL = os.environ.get('RESPONSE_CACHE_URL')
+# headers of the cached response replayed on a hit
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Cache-Control')
+
+
+'''
+LRUBackend
+in process store of at most maxsize entries, the least recently used entry
+is evicted first
+tag generations are kept apart from the entries, in their own lru of
+maxsize tags: a tag without a generation reads the floor, which an
+evicted generation moves past its value, so an evicted tag never reads a
+generation it had before
+'''
+class LRUBackend:
+    def __init__(self, maxsize=RESPONSE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._generations = OrderedDict()
+        self._floor = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def generations(self, tags):
+        with self._lock:
+            generations = []
+            for tag in tags:
+                if tag in self._generations:
+                    self._generations.move_to_end(tag)
+                generations.append(self._generations.get(tag, self._floor))
+            return generations
+
+    def bump(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = \
+                    self._generations.get(tag, self._floor) + 1
+                self._generations.move_to_end(tag)
+            while len(self._generations) > self.maxsize:
+                _, generation = self._generations.popitem(last=False)
+                self._floor = max(self._floor, generation + 1)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+'''
+SharedBackend
+store shared by every worker, client is a redis.Redis like object (get,
+mget, set with ex / nx, info)
+a generation is a random token rather than a counter: if the store evicts
+it, the next reader draws a new one and the entries keyed on the old one
+are never served again
+'''
+class SharedBackend:
+    def __init__(self, client, prefix='response-cache:'):
+        self.client = client
+        self.prefix = prefix
+
+    @property
+    def evictions(self):
+        return self.client.info('stats').get('evicted_keys', 0)
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+    def generations(self, tags):
+        keys = [self.prefix + 'tag:' + tag for tag in tags]
+        values = self.client.mget(keys)
+        for i, value in enumerate(values):
+            if value is None:
+                self.client.set(keys[i], uuid.uuid4().hex, nx=True)
+                values[i] = self.client.get(keys[i])
+        return [value.decode() if isinstance(value, bytes) else value
+                for value in values]
+
+    def bump(self, tags):
+        for tag in tags:
+            self.client.set(self.prefix + 'tag:' + tag, uuid.uuid4().hex)
+
+
+'''
+LocalStore
+a stand-in for the shared store, providing the subset of the redis client
+used by SharedBackend inside a single process (tests, development)
+'''
+class LocalStore:
+    def __init__(self, maxsize=RESPONSE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.evicted_keys = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _live(self, key):
+        entry = self._data.get(key)
+        if entry is not None and entry[0] is not None \
+                and entry[0] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key)
+            return None if entry is None else entry[1]
+
+    def mget(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, ex=None, nx=False):
+        if isinstance(value, str):
+            value = value.encode('utf-8')
+        with self._lock:
+            if nx and self._live(key) is not None:
+                return None
+            expires = time.monotonic() + ex if ex else None
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evicted_keys += 1
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(self._data.pop(key, None) is not None for key in keys)
+
+    def info(self, section=None):
+        return {'evicted_keys': self.evicted_keys}
+
+
+'''
+ResponseCache
+serves the 200 responses of the read endpoints from a backend
+entries are pre-serialized bytes keyed by route, query parameters and the
+generations of the tags the response depends on, invalidate(tags) moves
+the generations forward so the entries keyed on the previous ones are
+never read again
+'''
+class ResponseCache:
+    def __init__(self, backend, ttl=RESPONSE_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, tags):
+        args = urlencode(sorted(request.args.items(multi=True)))
+        generations = '.'.join(str(generation) for generation
+                               in self.backend.generations(tags))
+        return f'{request.path}?{args}|{generations}'
+
+    def get(self, key):
+        value = self.backend.get(key)
+        observe_cache('response', value is not None)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value
+
+    def put(self, key, response):
+        headers = {name: response.headers[name] for name in CACHED_HEADERS
+                   if name in response.headers}
+        value = json.dumps(headers).encode('utf-8') + b'\n' + \
+            response.get_data()
+        self.backend.set(key, value, self.ttl)
+
+    '''
+    get_encoded(key, encoding) / put_encoded(key, encoding, data)
+        the body of the entry key compressed for a Content-Encoding, stored
+        next to the entry so a cached body is compressed once per encoding
+    '''
+    def get_encoded(self, key, encoding):
+        return self.backend.get(f'{key}|{encoding}')
+
+    def put_encoded(self, key, encoding, data):
+        self.backend.set(f'{key}|{encoding}', data, self.ttl)
+
+    def invalidate(self, tags):
+        self.backend.bump(tags)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hitRatio': self.hits / lookups if lookups else 0.0,
+            'evictions': self.backend.evictions,
+        }
+
+
+def make_backend(name, maxsize=RESPONSE_CACHE_SIZE, url=RESPONSE_CACHE_URL):
+    if name == 'lru':
+        return LRUBackend(maxsize)
+    if name == 'shared':
+        if not url:
+            return SharedBackend(LocalStore(maxsize))
+        import redis
+        return SharedBackend(redis.Redis.from_url(url))
+    raise ValueError(f'Unknown response cache backend: {name}')
+
+
+'''
+init_cache(app)
+    sets up the response cache of the application from its config
+    RESPONSE_CACHE: none (default), lru or shared
+    RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL (seconds), RESPONSE_CACHE_URL
+    (redis url of the shared store, a LocalStore is used when unset)
+'''
+def init_cache(app):
+    app.config.setdefault('RESPONSE_CACHE', RESPONSE_CACHE)
+    app.config.setdefault('RESPONSE_CACHE_SIZE', RESPONSE_CACHE_SIZE)
+    app.config.setdefault('RESPONSE_CACHE_TTL', RESPONSE_CACHE_TTL)
+    app.config.setdefault('RESPONSE_CACHE_URL', RESPONSE_CACHE_URL)
+
+    cache = None
+    if app.config['RESPONSE_CACHE'] != 'none':
+        backend = make_backend(app.config['RESPONSE_CACHE'],
+                               app.config['RESPONSE_CACHE_SIZE'],
+                               app.config['RESPONSE_CACHE_URL'])
+        cache = ResponseCache(backend, app.config['RESPONSE_CACHE_TTL'])
+    app.extensions['response_cache'] = cache
+
+
+def get_cache():
+    return current_app.extensions.get('response_cache')
+
+
+'''
+invalidate(*tags)
+    drops the cached responses depending on any of tags, call it after the
+    write is committed
+    inside deferred_invalidation() the tags are collected instead
+'''
+def invalidate(*tags):
+    cache = get_cache()
+    if cache is None or not tags:
+        return
+    deferred = g.get('cache_deferred_tags')
+    if deferred is not None:
+        deferred.update(tags)
+    else:
+        cache.invalidate(tags)
+
+
+'''
+deferred_invalidation()
+    context manager for the requests running several writes in one
+    transaction (POST /batch), commit it inside the block
+    the tags invalidated in the block are invalidated when it exits, once
+    the transaction is over, and the views bypass the cache meanwhile since
+    they may read rows not committed yet
+'''
+@contextmanager
+def deferred_invalidation():
+    g.cache_deferred_tags = set()
+    try:
+        yield
+    finally:
+        invalidate(*g.pop('cache_deferred_tags'))
+
+
+'''
+@cached(*tags) decorator method
+    @INPUTS
+        tags: what the response depends on, formatted with the view
+            arguments ('actor:{id}')
+
+    it should serve the response from the cache when an entry exists,
+        answering 304 when If-None-Match holds the cached ETag
+    it should store the 200 responses of the view
+    it should call the view alone inside deferred_invalidation()
+    it should serve the compressed form of the body stored with the entry
+        (see compression.py), compressing and storing it on first use
+    use it below @requires_auth so only authorized requests are answered
+'''
+def cached(*tags):
+    def cached_decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            cache = get_cache()
+            if cache is None or 'cache_deferred_tags' in g:
+                return f(*args, **kwargs)
+
+            # the key is taken before the view reads the database so a
+            # write committed meanwhile leaves the entry unreachable
+            key = cache.key([tag.format(**kwargs) for tag in tags])
+            value = cache.get(key)
+            if value is not None:
+                headers, body = value.split(b'\n', 1)
+                headers = json.loads(headers)
+                etag = headers.get('ETag', '').strip('"')
+                if etag and request.if_none_match.contains_weak(etag):
+                    response = make_response('', 304)
+                    headers.pop('Content-Type', None)
+                    response.headers.update(headers)
+                else:
+                    coder = negotiate(len(body))
+                    if coder is not None:
+                        encoded = cache.get_encoded(key, coder.name)
+                        if encoded is None:
+                            encoded = coder.compress(body)
+                            cache.put_encoded(key, coder.name, encoded)
+                        body = encoded
+                    response = make_response(body)
+                    response.headers.update(headers)
+                    if coder is not None:
+                        mark_encoded(response, coder)
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                cache.put(key, response)
+                response.headers['X-Cache'] = 'MISS'
+                data = response.get_data()
+                coder = negotiate(len(data))
+                if coder is not None:
+                    encoded = coder.compress(data)
+                    cache.put_encoded(key, coder.name, encoded)
+                    response.set_data(encoded)
+                    mark_encoded(response, coder)
+            return response
+
+        return wrapper
+    return cached_decorator
@@ -0,0 +1,188 @@
+import gzip
+import os
+import zlib
+from flask import current_app, request
+
+
+# the encodings offered, by order of preference, none disables compression
+COMPRESSION = os.environ.get('COMPRESSION', 'br,gzip')
+# smaller bodies are sent as they are, streamed bodies are always compressed
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get('COMPRESSION_GZIP_LEVEL', 6))
+COMPRESSION_BROTLI_QUALITY = int(
+    os.environ.get('COMPRESSION_BROTLI_QUALITY', 5))
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson',
+                      'text/csv', 'text/plain', 'text/html')
+
+
+'''
+Coders
+a coder compresses a body for one Content-Encoding
+
+    compress(data): the compressed bytes of data
+    stream(chunks): generator compressing an iterable of bytes chunk by
+        chunk, each chunk is flushed so the client receives it right away
+'''
+
+
+class GzipCoder:
+    name = 'gzip'
+
+    def __init__(self, level=COMPRESSION_GZIP_LEVEL):
+        self.level = level
+
+    def compress(self, data):
+        return gzip.compress(data, self.level)
+
+    def stream(self, chunks):
+        # wbits 31: gzip header and trailer around the deflate stream
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        for chunk in chunks:
+            data = compressor.compress(chunk) + \
+                compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+'''
+BrotliCoder
+requires the optional brotli dependency
+'''
+class BrotliCoder:
+    name = 'br'
+
+    def __init__(self, quality=COMPRESSION_BROTLI_QUALITY):
+        import brotli
+
+        self._brotli = brotli
+        self.quality = quality
+
+    def compress(self, data):
+        return self._brotli.compress(data, quality=self.quality)
+
+    def stream(self, chunks):
+        compressor = self._brotli.Compressor(quality=self.quality)
+        for chunk in chunks:
+            data = compressor.process(chunk) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+
+CODERS = {
+    GzipCoder.name: GzipCoder,
+    BrotliCoder.name: BrotliCoder,
+}
+
+
+'''
+get_coders(names)
+    the coders of a comma separated list of encodings, in the same order
+    the encodings whose dependency is not installed are left out
+    it should raise a ValueError for an unknown encoding
+'''
+def get_coders(names=COMPRESSION):
+    coders = []
+    for name in names.split(','):
+        name = name.strip()
+        if not name or name == 'none':
+            continue
+        if name not in CODERS:
+            raise ValueError(f'Unknown compression encoding: {name}')
+        try:
+            coders.append(CODERS[name]())
+        except ImportError:
+            continue
+    return coders
+
+
+def is_compressible(mimetype):
+    return mimetype in COMPRESSIBLE_TYPES
+
+
+'''
+negotiate(size=None)
+    the coder of the encoding the request accepts with the highest quality
+    (the first configured one on a tie), None when the request accepts
+    none of them or when size is under COMPRESSION_MIN_SIZE
+    size is None for a streamed body
+'''
+def negotiate(size=None):
+    coders = current_app.extensions.get('compression')
+    if not coders or (size is not None and
+                      size < current_app.config['COMPRESSION_MIN_SIZE']):
+        return None
+    accepted = request.accept_encodings
+    best, best_quality = None, 0
+    for coder in coders:
+        quality = accepted[coder.name]
+        if quality > best_quality:
+            best, best_quality = coder, quality
+    return best
+
+
+'''
+mark_encoded(response, coder)
+    the headers of a response whose body is compressed by coder
+    the etag becomes weak, the compressed bytes differ from the ones the
+    strong etag names (conditional requests compare etags weakly)
+'''
+def mark_encoded(response, coder):
+    response.headers['Content-Encoding'] = coder.name
+    response.vary.add('Accept-Encoding')
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+
+
+'''
+compress_response(response)
+    compresses the body of a 200 response with the encoding negotiated
+    with the request
+    streamed bodies (exports) are compressed chunk by chunk as they are
+    sent, whatever their size
+    responses already encoded (served from the cache) are left as they are
+'''
+def compress_response(response):
+    if response.status_code != 200 or request.method == 'HEAD' \
+            or response.direct_passthrough \
+            or not is_compressible(response.mimetype):
+        return response
+    response.vary.add('Accept-Encoding')
+    if 'Content-Encoding' in response.headers:
+        return response
+
+    if response.is_streamed:
+        coder = negotiate()
+        if coder is not None:
+            response.response = coder.stream(response.iter_encoded())
+            response.headers.pop('Content-Length', None)
+            mark_encoded(response, coder)
+        return response
+
+    data = response.get_data()
+    coder = negotiate(len(data))
+    if coder is not None:
+        response.set_data(coder.compress(data))
+        mark_encoded(response, coder)
+    return response
+
+
+'''
+init_compression(app)
+    compresses the responses of app according to its config
+    COMPRESSION: encodings by order of preference (default br,gzip, br
+        needs the brotli package), none disables compression
+    COMPRESSION_MIN_SIZE: bodies under this many bytes are not compressed
+    call it first, so the responses are compressed once every other
+    after_request function is done
+'''
+def init_compression(app):
+    app.config.setdefault('COMPRESSION', COMPRESSION)
+    app.config.setdefault('COMPRESSION_MIN_SIZE', COMPRESSION_MIN_SIZE)
+    app.extensions['compression'] = get_coders(app.config['COMPRESSION'])
+
+    @app.after_request
+    def compress(response):
+        return compress_response(response)
@@ -0,0 +1,53 @@
+import hashlib
+from functools import wraps
+from flask import make_response, request
+
+from .database.models import get_table_versions
+
+
+'''
+compute_etag(tables, full_path=None, session=None)
+    strong etag of a request, derived from its url (path and query string,
+    those of the current request by default) and the versions of the tables
+    the response is built from
+'''
+def compute_etag(tables, full_path=None, session=None):
+    if full_path is None:
+        full_path = request.full_path
+    versions = get_table_versions(tables, session)
+    key = ';'.join(f'{table}={versions[table]}' for table in tables)
+    key += '|' + full_path
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+'''
+@conditional(*tables) decorator method
+    @INPUTS
+        tables: names of the tables the response is built from
+
+    it should answer 304 Not Modified, without calling the view, when the
+        If-None-Match header of the request holds the current etag, compared
+        weakly since compressed responses carry the weak form of the etag
+        (see compression.py)
+    it should add the etag to the 200 responses of the view
+    use it below @requires_auth so only authorized requests are answered
+'''
+def conditional(*tables):
+    def conditional_decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            etag = compute_etag(tables)
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            # authorized content: browsers may keep it but must revalidate
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+
+        return wrapper
+    return conditional_decorator
@@ -0,0 +1,208 @@
+import os
+from datetime import date
+from email.utils import parsedate_to_datetime
+
+from .models import db, autocommit, bump_table_versions, \
+    in_unit_of_work, Actor, Movie
+
+
+BULK_MAX_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', 10000))
+# keeps IN (...) lists below the bound parameter limit of every backend
+LOOKUP_CHUNK_SIZE = 500
+
+'''
+BulkValidationError Exception
+carries the per item errors of a batch, as [{'index': i, 'message': m}]
+'''
+class BulkValidationError(Exception):
+    def __init__(self, errors):
+        self.errors = errors
+
+
+'''
+parse_date(value)
+    accepts a date, an ISO date string (1995-11-22) or the HTTP date format
+    the api emits (Wed, 22 Nov 1995 00:00:00 GMT)
+    it should raise a ValueError otherwise
+'''
+def parse_date(value):
+    if isinstance(value, date):
+        return value
+    if not isinstance(value, str) or not value:
+        raise ValueError('releaseDate must be a date string')
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value).date()
+    except (TypeError, ValueError):
+        raise ValueError(f'releaseDate is not a valid date: {value}')
+
+
+def _string(item, field, max_length):
+    value = item.get(field)
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f'{field} is required')
+    if len(value) > max_length:
+        raise ValueError(f'{field} is longer than {max_length} characters')
+    return value
+
+
+def _age(item, field):
+    age = item.get(field)
+    if isinstance(age, bool) or not isinstance(age, int) or age < 0:
+        raise ValueError(f'{field} must be a non-negative integer')
+    return age
+
+
+def _validate(item, fields, partial):
+    if not isinstance(item, dict):
+        raise ValueError('item must be an object')
+    values = {}
+    for field, column, validate in fields:
+        if not partial or item.get(field) is not None:
+            values[column] = validate(item, field)
+    return values
+
+
+'''
+validate_actor(item, partial=False) / validate_movie(item, partial=False)
+    turns one api item into a row of the model table
+    with partial (PATCH bodies) only the fields given and not null are
+    validated and returned
+    it should raise a ValueError describing the first invalid field
+'''
+def validate_actor(item, partial=False):
+    return _validate(item, [
+        ('age', 'age', _age),
+        ('name', 'name', lambda item, field: _string(item, field, 180)),
+        ('gender', 'gender', lambda item, field: _string(item, field, 50)),
+    ], partial)
+
+
+def validate_movie(item, partial=False):
+    return _validate(item, [
+        ('title', 'title', lambda item, field: _string(item, field, 180)),
+        ('releaseDate', 'release_date',
+         lambda item, field: parse_date(item.get(field))),
+    ], partial)
+
+
+'''
+BULK_MODELS
+    model -> (row validator, unique column)
+'''
+BULK_MODELS = {
+    Actor: (validate_actor, Actor.name),
+    Movie: (validate_movie, Movie.title),
+}
+
+
+'''
+existing_values(column, values, session=None)
+    returns the subset of values already stored in column
+'''
+def existing_values(column, values, session=None):
+    if session is None:
+        session = db.session
+    values = list(values)
+    found = set()
+    for start in range(0, len(values), LOOKUP_CHUNK_SIZE):
+        chunk = values[start:start + LOOKUP_CHUNK_SIZE]
+        found.update(value for (value,) in session.query(column)
+                     .filter(column.in_(chunk)))
+    return found
+
+
+'''
+validate_rows(model, items, session=None)
+    validates every item of a batch in one pass
+    returns (rows, errors) where rows is a list of (index, row)
+    duplicates of the unique column, inside the batch or already stored, are
+    reported as errors
+'''
+def validate_rows(model, items, session=None):
+    validate, unique = BULK_MODELS[model]
+    rows, errors, seen = [], [], set()
+
+    for index, item in enumerate(items):
+        try:
+            row = validate(item)
+        except ValueError as e:
+            errors.append({'index': index, 'message': str(e)})
+            continue
+        if row[unique.key] in seen:
+            errors.append({'index': index,
+                           'message': f'duplicate {unique.key} in batch'})
+            continue
+        seen.add(row[unique.key])
+        rows.append((index, row))
+
+    taken = existing_values(unique, seen, session)
+    if taken:
+        for index, row in rows:
+            if row[unique.key] in taken:
+                errors.append({'index': index,
+                               'message': f'{unique.key} already exists'})
+        rows = [(i, row) for i, row in rows if row[unique.key] not in taken]
+
+    errors.sort(key=lambda error: error['index'])
+    return rows, errors
+
+
+'''
+insert_rows(model, rows, session=None)
+    inserts plain row dicts with a single executemany (multi-row VALUES on
+    psycopg2), the caller owns the transaction
+'''
+def insert_rows(model, rows, session=None):
+    if session is None:
+        session = db.session
+    if rows:
+        session.execute(model.__table__.insert(), rows)
+        bump_table_versions(session, [model.__tablename__])
+
+
+'''
+bulk_create(model, items, atomic=False, session=None)
+    validates and inserts a batch of api items with one commit, or within
+    the open unit_of_work
+    @INPUTS
+        model: Actor or Movie
+        items: list of api items (the POST /actors or POST /movies bodies)
+        atomic: reject the whole batch if any item is invalid
+        session: the session the batch is committed with, db.session by
+            default
+
+    returns (created, errors), created being [{'index': i, 'id': id}]
+    it should raise a BulkValidationError when atomic and an item is invalid
+'''
+def bulk_create(model, items, atomic=False, session=None):
+    if session is None:
+        session = db.session
+    rows, errors = validate_rows(model, items, session)
+    if atomic and errors:
+        raise BulkValidationError(errors)
+
+    unique = BULK_MODELS[model][1]
+    try:
+        insert_rows(model, [row for _, row in rows], session)
+        ids = dict(_ids_by_unique(session, model, unique,
+                                  [row[unique.key] for _, row in rows]))
+        autocommit(session)
+    except Exception:
+        if not in_unit_of_work(session):
+            session.rollback()
+        raise
+
+    created = [{'index': index, 'id': ids[row[unique.key]]}
+               for index, row in rows]
+    return created, errors
+
+
+def _ids_by_unique(session, model, unique, values):
+    for start in range(0, len(values), LOOKUP_CHUNK_SIZE):
+        chunk = values[start:start + LOOKUP_CHUNK_SIZE]
+        yield from session.query(unique, model.id) \
+            .filter(unique.in_(chunk))
@@ -0,0 +1,77 @@
+import click
+
+from ..cache import invalidate
+from .data import dummy_actor_data, dummy_movie_data
+from .importer import (DEFAULT_BATCH_SIZE, FORMATS, MODELS, import_file,
+                       import_records)
+from .models import db
+
+
+'''
+register_commands(app)
+    adds the schema and data loading commands to the flask cli
+
+        flask bootstrap-db --seed
+        flask import-data actors actors.csv --batch-size 5000
+        flask seed
+'''
+def register_commands(app):
+
+    @app.cli.command('bootstrap-db')
+    @click.option('--create-all', is_flag=True,
+                  help='Create the tables from the models and stamp the '
+                       'latest migration instead of running the migrations.')
+    @click.option('--seed', 'with_seed', is_flag=True,
+                  help='Insert the dummy actors and movies afterwards.')
+    @click.pass_context
+    def bootstrap_db(ctx, create_all, with_seed):
+        '''Create or upgrade the schema of the database.'''
+        from flask_migrate import stamp, upgrade
+
+        if create_all:
+            db.create_all()
+            stamp()
+            click.echo('Created the tables')
+        else:
+            upgrade()
+            click.echo('Applied the migrations')
+        if with_seed:
+            ctx.invoke(seed)
+
+    @app.cli.command('import-data')
+    @click.argument('table', type=click.Choice(sorted(MODELS)))
+    @click.argument('path', type=click.Path(exists=True, dir_okay=False))
+    @click.option('--format', 'fmt', type=click.Choice(FORMATS),
+                  help='File format, guessed from the extension by default.')
+    @click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True,
+                  help='Records validated and committed together.')
+    @click.option('--resume/--restart', default=True, show_default=True,
+                  help='Skip the records committed by an interrupted run.')
+    def import_data(table, path, fmt, batch_size, resume):
+        '''Stream a csv or ndjson file into the actors or movies table.'''
+        def report(stats):
+            rate = stats['inserted'] / stats['elapsed'] \
+                if stats['elapsed'] else 0
+            click.echo(f"{stats['records']} records, {stats['inserted']} "
+                       f"inserted, {stats['rejected']} rejected "
+                       f"({rate:.0f} rows/s)")
+            for error in stats['errors'][:10]:
+                click.echo(f"  record {error['index']}: {error['message']}",
+                           err=True)
+
+        stats = import_file(table, path, fmt, batch_size, resume, report)
+        invalidate(table)
+        click.echo(f"Imported {stats['inserted']} {table} in "
+                   f"{stats['elapsed']:.1f}s")
+
+    @app.cli.command('seed')
+    def seed():
+        '''Insert the dummy actors and movies.'''
+        for table, data, fields in (
+                ('actors', dummy_actor_data, ('name', 'age', 'gender')),
+                ('movies', dummy_movie_data, ('title', 'releaseDate'))):
+            records = [dict(zip(fields, values)) for values in data]
+            stats = import_records(MODELS[table], records)
+            invalidate(table)
+            click.echo(f"Added {stats['inserted']} {table}, "
+                       f"{stats['rejected']} already present")
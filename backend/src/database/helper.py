@@ -1,22 +1,24 @@
-from .models import Actor, Movie 
+from .models import Actor, Movie
 from .data import dummy_actor_data, dummy_movie_data
+from .importer import import_records
   
 class DataHelper: 
     def add_dummy_actor_data(): 
         ''' 
         Function to add dummy actor data into Table 
+        in one batch, use `flask seed` or `flask import-data` instead
         '''
-        for data in dummy_actor_data: 
-            actor = Actor(*data) 
-            actor.insert() 
-            print(f"Successfully Added Actor: {actor.name}")
+        records = [dict(zip(('name', 'age', 'gender'), data))
+                   for data in dummy_actor_data]
+        stats = import_records(Actor, records)
+        print(f"Successfully Added {stats['inserted']} Actors")
   
     def add_dummy_movie_data(): 
         ''' 
         Function to add dummy movie data into Table 
+        in one batch, use `flask seed` or `flask import-data` instead
         '''
-        for data in dummy_movie_data: 
-            movie = Movie(*data) 
-            movie.insert() 
-            print(f"Successfully Added Movie: {movie.title}")
-  
\ No newline at end of file
+        records = [dict(zip(('title', 'releaseDate'), data))
+                   for data in dummy_movie_data]
+        stats = import_records(Movie, records)
+        print(f"Successfully Added {stats['inserted']} Movies")
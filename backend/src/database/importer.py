@@ -0,0 +1,180 @@
+import csv
+import io
+import json
+import os
+import time
+from itertools import islice
+
+from .bulk import insert_rows, validate_rows
+from .models import db, bump_table_versions, Actor, Movie
+
+
+FORMATS = ('csv', 'ndjson')
+MODELS = {'actors': Actor, 'movies': Movie}
+DEFAULT_BATCH_SIZE = 5000
+
+'''
+read_records(stream, fmt)
+    streams the records of a csv (with a header row) or ndjson file
+    csv fields keep the api names (name, age, gender / title, releaseDate)
+    the fields missing from a short csv row are None, they are rejected by
+    the validation of the record
+    an ndjson line that is not valid json is yielded as the raw string so it
+    is rejected by the validation like any other malformed record
+'''
+def read_records(stream, fmt):
+    if fmt == 'csv':
+        for record in csv.DictReader(stream):
+            if (record.get('age') or '').strip().isdigit():
+                record['age'] = int(record['age'])
+            yield record
+        return
+
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            yield line
+
+
+'''
+Checkpoint
+the number of records of a file already committed, kept next to the file
+in <file>.progress so an interrupted import can resume after them
+'''
+class Checkpoint:
+    def __init__(self, path):
+        self.path = path + '.progress'
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)['records']
+        except (OSError, ValueError, KeyError):
+            return 0
+
+    def save(self, records):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'records': records}, f)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+'''
+copy_rows(model, rows)
+    loads rows with PostgreSQL COPY ... FROM STDIN inside the current
+    transaction of the session
+'''
+def copy_rows(model, rows):
+    columns = list(rows[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([row[column] for column in columns])
+    buffer.seek(0)
+
+    cursor = db.session.connection().connection.cursor()
+    cursor.copy_expert(
+        f'COPY {model.__tablename__} ({", ".join(columns)}) '
+        'FROM STDIN WITH (FORMAT csv)', buffer)
+    bump_table_versions(db.session, [model.__tablename__])
+
+
+def supports_copy():
+    return db.session.bind.dialect.name == 'postgresql' and \
+        db.session.bind.dialect.driver == 'psycopg2'
+
+
+'''
+load_batch(model, items)
+    validates and stores one batch with a single commit
+    returns the list of per item errors, indexes relative to the batch
+'''
+def load_batch(model, items, use_copy=False):
+    rows, errors = validate_rows(model, items)
+    rows = [row for _, row in rows]
+    try:
+        if rows and use_copy:
+            copy_rows(model, rows)
+        else:
+            insert_rows(model, rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return len(rows), errors
+
+
+'''
+import_records(model, records, batch_size, skip, on_batch)
+    @INPUTS
+        model: Actor or Movie
+        records: iterable of api items, consumed batch_size at a time
+        batch_size: records validated and committed together
+        skip: number of leading records already imported
+        on_batch: callable(stats) called after every committed batch
+
+    memory stays bounded by batch_size whatever the number of records
+    returns the stats dict: records, inserted, rejected, errors, elapsed
+'''
+def import_records(model, records, batch_size=DEFAULT_BATCH_SIZE, skip=0,
+                   on_batch=None):
+    use_copy = supports_copy()
+    records = iter(records)
+    for _ in islice(records, skip):
+        pass
+
+    stats = {'records': skip, 'inserted': 0, 'rejected': 0, 'errors': []}
+    started = time.monotonic()
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            break
+        inserted, errors = load_batch(model, batch, use_copy)
+        for error in errors:
+            error['index'] += stats['records']
+        stats['records'] += len(batch)
+        stats['inserted'] += inserted
+        stats['rejected'] += len(errors)
+        stats['errors'] = errors
+        stats['elapsed'] = time.monotonic() - started
+        if on_batch:
+            on_batch(stats)
+
+    stats['elapsed'] = time.monotonic() - started
+    return stats
+
+
+'''
+import_file(table, path, fmt, batch_size, resume, on_batch)
+    imports a csv or ndjson file into the actors or movies table
+    the number of committed records is checkpointed after every batch,
+    resume=True skips the records committed by a previous run
+'''
+def import_file(table, path, fmt=None, batch_size=DEFAULT_BATCH_SIZE,
+                resume=True, on_batch=None):
+    model = MODELS[table]
+    fmt = fmt or ('csv' if path.endswith('.csv') else 'ndjson')
+    if fmt not in FORMATS:
+        raise ValueError(f'Unknown format: {fmt}')
+
+    checkpoint = Checkpoint(path)
+    skip = checkpoint.load() if resume else 0
+
+    def after_batch(stats):
+        checkpoint.save(stats['records'])
+        if on_batch:
+            on_batch(stats)
+
+    with open(path, newline='', encoding='utf-8') as stream:
+        stats = import_records(model, read_records(stream, fmt), batch_size,
+                               skip, after_batch)
+    checkpoint.clear()
+    return stats
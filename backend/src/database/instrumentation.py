@@ -0,0 +1,193 @@
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+logger = logging.getLogger(__name__)
+
+# off (default), log, or raise to fail the request on an N+1 pattern (tests)
+SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION', 'off')
+# statements slower than this many milliseconds are logged
+SQL_SLOW_QUERY_MS = float(os.environ.get('SQL_SLOW_QUERY_MS', 100))
+# a statement run more than this many times in one request is an N+1
+SQL_N_PLUS_ONE_THRESHOLD = int(os.environ.get('SQL_N_PLUS_ONE_THRESHOLD', 5))
+MODES = ('off', 'log', 'raise')
+
+
+'''
+NPlusOneError Exception
+raised after a request of an app in raise mode repeated a statement more
+than SQL_N_PLUS_ONE_THRESHOLD times
+'''
+class NPlusOneError(Exception):
+    def __init__(self, route, repeated):
+        self.route = route
+        self.repeated = repeated
+        super().__init__(f'N+1 queries in {route}: ' + '; '.join(
+            f'{count} x {shape}' for shape, count in repeated.items()))
+
+
+_whitespace = re.compile(r'\s+')
+_in_list = re.compile(r'\bIN \((?:[^()]|\([^()]*\))*\)', re.IGNORECASE)
+
+
+'''
+statement_shape(statement)
+    the statement with its whitespace collapsed and the values of IN lists
+    dropped, so the queries differing only by their bound values match
+'''
+def statement_shape(statement):
+    return _in_list.sub('IN (...)', _whitespace.sub(' ', statement).strip())
+
+
+def route_label():
+    rule = request.url_rule
+    path = rule.rule if rule is not None else request.path
+    return f'{request.method} {path}'
+
+
+'''
+RequestQueries
+the statements run by one request, by shape: [count, seconds]
+with shapes False (SQL_INSTRUMENTATION off) they all count under None, the
+totals are kept for the request metrics without shaping each statement
+nested holds the RequestQueries of the operations of a POST /batch, they
+count in the totals but are checked for N+1 patterns apart
+'''
+class RequestQueries:
+    def __init__(self, shapes=True):
+        self.shapes = shapes
+        self.statements = {}
+        self.nested = []
+
+    def record(self, statement, seconds):
+        shape = statement_shape(statement) if self.shapes else None
+        entry = self.statements.setdefault(shape, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+    @property
+    def count(self):
+        return sum(count for count, _ in self.statements.values()) + \
+            sum(queries.count for queries in self.nested)
+
+    @property
+    def seconds(self):
+        return sum(seconds for _, seconds in self.statements.values()) + \
+            sum(queries.seconds for queries in self.nested)
+
+    def repeated(self, threshold):
+        return {shape: count for shape, (count, _)
+                in self.statements.items() if count > threshold}
+
+
+def get_request_queries():
+    if has_request_context():
+        return g.get('sql_queries')
+    return None
+
+
+'''
+nested_request_queries()
+    context manager recording the statements of an operation of POST /batch
+    (run in the request context of the operation) apart from those of the
+    batch, the operation is checked for N+1 patterns like a request
+'''
+@contextmanager
+def nested_request_queries():
+    queries = get_request_queries()
+    if queries is None:
+        yield
+        return
+    g.sql_queries = RequestQueries(queries.shapes)
+    try:
+        yield
+    finally:
+        nested, g.sql_queries = g.sql_queries, queries
+        queries.nested.append(nested)
+    check_n_plus_one(current_app, nested)
+
+
+'''
+check_n_plus_one(app, queries)
+    logs the statements of queries repeated more than
+    SQL_N_PLUS_ONE_THRESHOLD times, or raises NPlusOneError in raise mode
+'''
+def check_n_plus_one(app, queries):
+    if app.config['SQL_INSTRUMENTATION'] == 'off':
+        return
+    repeated = queries.repeated(app.config['SQL_N_PLUS_ONE_THRESHOLD'])
+    if repeated:
+        error = NPlusOneError(route_label(), repeated)
+        if app.config['SQL_INSTRUMENTATION'] == 'raise':
+            raise error
+        logger.warning('%s', error)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_statement(conn, cursor, statement, parameters, context,
+                     executemany):
+    if get_request_queries() is not None:
+        context.sql_started = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _end_statement(conn, cursor, statement, parameters, context,
+                   executemany):
+    started = getattr(context, 'sql_started', None)
+    queries = get_request_queries()
+    if started is None or queries is None:
+        return
+    seconds = time.perf_counter() - started
+    queries.record(statement, seconds)
+    if g.sql_slow_query_ms is not None and \
+            seconds * 1000 >= g.sql_slow_query_ms:
+        logger.warning('Slow query (%.1f ms) in %s: %s', seconds * 1000,
+                       route_label(), statement_shape(statement))
+
+
+'''
+init_sql_instrumentation(app)
+    records the statements of each request of app, get_request_queries()
+    returns them for the whole request (the request metrics read their
+    count and time after it)
+    the checks below run when SQL_INSTRUMENTATION is log or raise
+    SQL_SLOW_QUERY_MS, SQL_N_PLUS_ONE_THRESHOLD
+    the statements over SQL_SLOW_QUERY_MS are logged with their route as
+    they run, after the request the statements repeated more than
+    SQL_N_PLUS_ONE_THRESHOLD times are logged, or raise NPlusOneError in
+    raise mode (the error reaches the test client when TESTING is set)
+    responses carry the query count and time in a Server-Timing header
+    the settings are read on each request, tests may change them
+'''
+def init_sql_instrumentation(app):
+    app.config.setdefault('SQL_INSTRUMENTATION', SQL_INSTRUMENTATION)
+    app.config.setdefault('SQL_SLOW_QUERY_MS', SQL_SLOW_QUERY_MS)
+    app.config.setdefault('SQL_N_PLUS_ONE_THRESHOLD',
+                          SQL_N_PLUS_ONE_THRESHOLD)
+    if app.config['SQL_INSTRUMENTATION'] not in MODES:
+        raise ValueError('Unknown SQL_INSTRUMENTATION mode: '
+                         f'{app.config["SQL_INSTRUMENTATION"]}')
+
+    @app.before_request
+    def start_sql_instrumentation():
+        enabled = app.config['SQL_INSTRUMENTATION'] != 'off'
+        g.sql_queries = RequestQueries(shapes=enabled)
+        g.sql_slow_query_ms = app.config['SQL_SLOW_QUERY_MS'] if enabled \
+            else None
+
+    @app.after_request
+    def check_sql_instrumentation(response):
+        queries = g.get('sql_queries')
+        if queries is None or app.config['SQL_INSTRUMENTATION'] == 'off':
+            return response
+        response.headers.add(
+            'Server-Timing', f'db;dur={queries.seconds * 1000:.1f};'
+                             f'desc="{queries.count} queries"')
+        check_n_plus_one(app, queries)
+        return response
@@ -1,15 +1,24 @@
 import os
-from sqlalchemy import Column, Date, Integer, String
-from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
+from contextlib import contextmanager
+from sqlalchemy import Column, Date, ForeignKey, Integer, String, event, \
+    select
+from sqlalchemy.orm import Session, attributes, selectinload
 import json
 
-db = SQLAlchemy()
-migrate = Migrate()
+from .pool import engine_options
+from .replicas import RoutingSQLAlchemy, setup_replicas
+
+db = RoutingSQLAlchemy()
 
 '''
 setup_db(app)
     binds a flask application and a SQLAlchemy service
+    the pool is configured by engine_options (see pool.py) unless
+    SQLALCHEMY_ENGINE_OPTIONS is set
+    the reads of read-only requests go to the DATABASE_REPLICAS, if any
+    (see replicas.py)
+    no table is created here: the schema comes from the migrations
+    (flask db upgrade, flask bootstrap-db)
 '''
 
 
@@ -19,11 +28,85 @@ def setup_db(app, database_path=None):
 
     app.config["SQLALCHEMY_DATABASE_URI"] = database_path
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS",
+                          engine_options(database_path))
+    setup_replicas(app)
     db.app = app
     db.init_app(app)
-    migrate.init_app(app, db)
-    db.create_all()
-    
+
+
+'''
+setup_migrations(app)
+    adds the flask db commands of Flask-Migrate for db to app
+    alembic is imported here, only the apps running cli commands need it
+'''
+def setup_migrations(app):
+    from flask_migrate import Migrate
+    Migrate(app, db)
+
+
+'''
+unit_of_work()
+    transactional scope on db.session, yields the session
+    inside the block insert(), update() and delete() of the models only
+    stage their change, the changes are flushed together (or when a query
+    needs them) and committed once when the block exits, rolled back if it
+    raises
+    a scope opened inside another one joins it
+    outside a scope the model methods commit right away
+    EXAMPLE
+        with unit_of_work():
+            for name in names:
+                Actor(name=name, age=30, gender='female').insert()
+    it decorates a view too, for one commit at the end of the request
+'''
+@contextmanager
+def unit_of_work():
+    session = db.session()
+    if in_unit_of_work(session):
+        yield session
+        return
+    session.info['unit_of_work'] = True
+    try:
+        yield session
+        session.commit()
+    except BaseException:
+        session.rollback()
+        raise
+    finally:
+        session.info.pop('unit_of_work', None)
+
+
+def in_unit_of_work(session=None):
+    if session is None:
+        session = db.session()
+    return session.info.get('unit_of_work', False)
+
+
+'''
+autocommit(session=None)
+    commits session (db.session by default) unless a unit_of_work is open
+    on it, the changes then wait for the end of the scope
+'''
+def autocommit(session=None):
+    if session is None:
+        session = db.session()
+    if not in_unit_of_work(session):
+        session.commit()
+
+'''
+castings
+association table between actors and the movies they are cast in
+'''
+castings = db.Table(
+    'castings',
+    Column('actor_id', Integer,
+           ForeignKey('actors.id', ondelete='CASCADE'), primary_key=True),
+    Column('movie_id', Integer,
+           ForeignKey('movies.id', ondelete='CASCADE'), primary_key=True,
+           index=True),
+)
+
 
 '''
 Actor
@@ -38,6 +121,8 @@ class Actor(db.Model):
     name = Column(String(180), unique=True, nullable=False)
     age = Column(Integer, nullable=False)
     gender = Column(String(50), nullable=False)
+    movies = db.relationship('Movie', secondary=castings,
+                             back_populates='actors', order_by='Movie.id')
 
     def __init__(self, name, age, gender):
         self.name = name
@@ -60,6 +145,7 @@ class Actor(db.Model):
     '''
     long()
         long form representation of the Actor model
+        load movies eagerly (with_movies()) to avoid one query per actor
     '''
 
     def long(self):
@@ -68,14 +154,28 @@ class Actor(db.Model):
             'name': self.name,
             'age': self.age,
             'gender': self.gender,
-            'movies': []
+            'movies': [movie.short() for movie in self.movies]
         }
 
+    '''
+    with_movies()
+        query option loading the movies of every selected actor in a
+        single extra SELECT ... WHERE actor_id IN (...)
+        EXAMPLE
+            actors = Actor.query.options(Actor.with_movies()).all()
+    '''
+
+    @staticmethod
+    def with_movies():
+        return selectinload(Actor.movies)
+
     '''
     insert()
         inserts a new model into a database
         the model must have a unique name
         the model must have a unique id or null id
+        inside a unit_of_work the insert is only staged, flush the
+        session to get the id
         EXAMPLE
             actor = Actor(name=req_name, age=req_age, gender=req_gender)
             actor.insert()
@@ -83,7 +183,7 @@ class Actor(db.Model):
 
     def insert(self):
         db.session.add(self)
-        db.session.commit()
+        autocommit()
 
     '''
     delete()
@@ -96,7 +196,7 @@ class Actor(db.Model):
 
     def delete(self):
         db.session.delete(self)
-        db.session.commit()
+        autocommit()
 
     '''
     update()
@@ -109,7 +209,7 @@ class Actor(db.Model):
     '''
 
     def update(self):
-        db.session.commit()
+        autocommit()
 
 
 '''
@@ -124,7 +224,9 @@ class Movie(db.Model):
     id = Column(Integer, primary_key=True)
     title = Column(String(180), unique=True)
     release_date = Column(Date, nullable=False)
-    
+    actors = db.relationship('Actor', secondary=castings,
+                             back_populates='movies', order_by='Actor.id')
+
     def __init__(self, title=None, release_date=None):
         self.title = title
         self.release_date = release_date
@@ -144,6 +246,7 @@ class Movie(db.Model):
     '''
     long()
         long form representation of the Movie model
+        load actors eagerly (with_actors()) to avoid one query per movie
     '''
 
     def long(self):
@@ -151,14 +254,28 @@ class Movie(db.Model):
             'id': self.id,
             'title': self.title,
             'releaseDate': self.release_date,
-            'actors': []
+            'actors': [actor.short() for actor in self.actors]
         }
 
+    '''
+    with_actors()
+        query option loading the actors of every selected movie in a
+        single extra SELECT ... WHERE movie_id IN (...)
+        EXAMPLE
+            movies = Movie.query.options(Movie.with_actors()).all()
+    '''
+
+    @staticmethod
+    def with_actors():
+        return selectinload(Movie.actors)
+
     '''
     insert()
         inserts a new model into a database
         the model must have a unique name
         the model must have a unique id or null id
+        inside a unit_of_work the insert is only staged, flush the
+        session to get the id
         EXAMPLE
             movie = Movie(title=req_title, release_date=req_release_date)
             movie.insert()
@@ -166,7 +283,7 @@ class Movie(db.Model):
 
     def insert(self):
         db.session.add(self)
-        db.session.commit()
+        autocommit()
 
     '''
     delete()
@@ -179,7 +296,7 @@ class Movie(db.Model):
 
     def delete(self):
         db.session.delete(self)
-        db.session.commit()
+        autocommit()
 
     '''
     update()
@@ -192,4 +309,113 @@ class Movie(db.Model):
     '''
 
     def update(self):
-        db.session.commit()
\ No newline at end of file
+        autocommit()
+
+
+'''
+TableVersion
+a counter per table, bumped in the transaction of every write to the table
+so readers can tell whether the content changed without selecting it
+'''
+
+
+class TableVersion(db.Model):
+    __tablename__ = 'table_versions'
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+'''
+bump_table_versions(session, names)
+    increments the version of every table in names within the current
+    transaction of session
+    call it after writes that bypass the ORM (Core inserts, COPY)
+'''
+
+
+def bump_table_versions(session, names):
+    names = sorted(set(names))
+    if not names:
+        return
+    table = TableVersion.__table__
+    connection = session.connection()
+    updated = connection.execute(
+        table.update()
+        .where(table.c.name.in_(names))
+        .values(version=table.c.version + 1)).rowcount
+    if updated < len(names):
+        known = {name for (name,) in connection.execute(
+            select(table.c.name).where(table.c.name.in_(names)))}
+        connection.execute(table.insert(), [
+            {'name': name, 'version': 1}
+            for name in names if name not in known])
+
+
+'''
+begin_transaction(session)
+    opens the transaction of session on the database before savepoints are
+    taken in it
+    pysqlite only opens a transaction before a write, a savepoint taken
+    before it would open one itself and commit on its release
+'''
+
+
+def begin_transaction(session):
+    connection = session.connection()
+    if connection.dialect.driver == 'pysqlite' \
+            and not connection.connection.dbapi_connection.in_transaction:
+        connection.exec_driver_sql('BEGIN')
+
+
+'''
+get_table_versions(names, session=None)
+    returns {name: version} for names, 0 for a table never written
+'''
+
+
+def get_table_versions(names, session=None):
+    if session is None:
+        session = db.session
+    versions = dict(session.query(TableVersion.name, TableVersion.version)
+                    .filter(TableVersion.name.in_(names)))
+    return {name: versions.get(name, 0) for name in names}
+
+
+def _changed_tables(session):
+    names = set()
+    for obj in session.new:
+        if isinstance(obj, (Actor, Movie)):
+            names.add(obj.__tablename__)
+    for obj in session.deleted:
+        if isinstance(obj, (Actor, Movie)):
+            # the castings of the deleted row go with it
+            names.update((Actor.__tablename__, Movie.__tablename__))
+    for obj in session.dirty:
+        if not isinstance(obj, (Actor, Movie)):
+            continue
+        if session.is_modified(obj, include_collections=False):
+            names.add(obj.__tablename__)
+        relation = 'movies' if isinstance(obj, Actor) else 'actors'
+        if attributes.get_history(obj, relation).has_changes():
+            names.update((Actor.__tablename__, Movie.__tablename__))
+    return names
+
+
+@event.listens_for(db.session, 'before_flush')
+def _bump_versions_before_flush(session, flush_context, instances):
+    bump_table_versions(session, _changed_tables(session))
+
+
+'''
+VersionedSession
+plain Session class bumping the table versions on flush like db.session,
+for the sessions opened outside of Flask-SQLAlchemy (the asgi entry point)
+'''
+
+
+class VersionedSession(Session):
+    pass
+
+
+event.listen(VersionedSession, 'before_flush', _bump_versions_before_flush)
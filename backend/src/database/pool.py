@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+# seconds a request waits for a free connection before failing
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+# connections older than this many seconds are replaced, -1 keeps them
+DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+# test each connection when it is checked out, so connections dropped by a
+# failover are replaced instead of failing the request
+DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() \
+    == 'true'
+# connections opened when a worker starts, at most DB_POOL_SIZE
+DB_POOL_WARM = int(os.environ.get('DB_POOL_WARM', DB_POOL_SIZE))
+
+
+'''
+PoolStats
+counters of the connections handed out by a pool
+    checkouts: number of connections handed out
+    timeouts: checkouts that gave up after pool_timeout seconds
+    wait: seconds spent getting the connections (waiting for a free one,
+        opening a new one, pre-ping)
+'''
+class PoolStats:
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, wait, timeout=False):
+        with self._lock:
+            if timeout:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+    def to_dict(self):
+        return {
+            'checkouts': self.checkouts,
+            'timeouts': self.timeouts,
+            'waitTotalMs': self.wait_total * 1000,
+            'waitMaxMs': self.wait_max * 1000,
+            'waitAvgMs': self.wait_total * 1000 / self.checkouts
+            if self.checkouts else 0.0,
+        }
+
+
+'''
+TimedPool
+mixin of a queue pool recording each checkout in self.stats
+'''
+class TimedPool:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.record(time.perf_counter() - started, timeout=True)
+            raise
+        self.stats.record(time.perf_counter() - started)
+        return connection
+
+
+class TimedQueuePool(TimedPool, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(TimedPool, AsyncAdaptedQueuePool):
+    pass
+
+
+'''
+engine_options(database_path, asyncio=False)
+    the pool settings of the engine of database_path, from the DB_POOL_*
+    and DB_MAX_OVERFLOW environment variables
+    SQLite databases keep the pool of their driver
+    asyncio selects the pool of create_async_engine
+'''
+def engine_options(database_path, asyncio=False):
+    if make_url(database_path).get_backend_name() == 'sqlite':
+        return {}
+    return {
+        'poolclass': TimedAsyncQueuePool if asyncio else TimedQueuePool,
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT,
+        'pool_recycle': DB_POOL_RECYCLE,
+        'pool_pre_ping': DB_POOL_PRE_PING,
+    }
+
+
+'''
+warm_pool(engine, count=DB_POOL_WARM)
+    opens up to count connections (at most the pool size) and returns them
+    to the pool, so the first requests of a worker do not pay for them
+    returns the number of connections warmed, 0 for a pool without queue
+'''
+def warm_pool(engine, count=DB_POOL_WARM):
+    if not isinstance(engine.pool, QueuePool):
+        return 0
+    connections = []
+    try:
+        for _ in range(min(count, engine.pool.size())):
+            connections.append(engine.raw_connection())
+    finally:
+        for connection in connections:
+            connection.close()
+    return len(connections)
+
+
+'''
+pool_stats(engine)
+    live statistics of the pool of engine
+    size, checkedOut, idle and overflow for queue pools, and the checkout
+    counters of PoolStats for the pools created by engine_options
+'''
+def pool_stats(engine):
+    pool = engine.pool
+    data = {'pool': type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        data.update({
+            'size': pool.size(),
+            'checkedOut': pool.checkedout(),
+            'idle': pool.checkedin(),
+            'overflow': max(pool.overflow(), 0),
+        })
+    if isinstance(pool, TimedPool):
+        data.update(pool.stats.to_dict())
+    return data
+
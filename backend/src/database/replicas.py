@@ -0,0 +1,91 @@
+import itertools
+import os
+import threading
+from flask import has_request_context, request
+from flask_sqlalchemy import SQLAlchemy, SignallingSession
+from sqlalchemy import create_engine, event, orm
+
+from .pool import engine_options
+
+
+# comma separated urls of the read replicas of DATABASE_PATH
+DATABASE_REPLICAS = os.environ.get('DATABASE_REPLICAS', '')
+# requests whose reads may be served by a replica
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+'''
+ReplicaSet
+the engines of the read replicas, handed out round-robin
+'''
+class ReplicaSet:
+    def __init__(self, engines):
+        self.engines = list(engines)
+        self._cycle = itertools.cycle(self.engines)
+        self._lock = threading.Lock()
+
+    def next_engine(self):
+        with self._lock:
+            return next(self._cycle)
+
+
+'''
+setup_replicas(app)
+    creates the engines of the DATABASE_REPLICAS of the app config (a list
+    or a comma separated string of urls, the environment variable by
+    default), with the pool settings of the primary
+'''
+def setup_replicas(app):
+    app.config.setdefault('DATABASE_REPLICAS', DATABASE_REPLICAS)
+    paths = app.config['DATABASE_REPLICAS']
+    if isinstance(paths, str):
+        paths = [path.strip() for path in paths.split(',') if path.strip()]
+
+    replicas = None
+    if paths:
+        replicas = ReplicaSet(create_engine(path, **engine_options(path))
+                              for path in paths)
+    app.extensions['db_replicas'] = replicas
+
+
+'''
+RoutingSession
+session of db, sends the reads of read-only requests to a replica
+    a session (one per request) reading on a replica sticks to it
+    everything else goes to the primary: writes (flushes and Core insert,
+        update and delete statements), the reads that follow a write in the
+        same request, the reads of other methods and the reads outside of
+        a request (cli, tests seeding the database)
+'''
+class RoutingSession(SignallingSession):
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if getattr(clause, 'is_dml', False):
+            self.info['primary'] = True
+        replica = self._replica()
+        if replica is not None:
+            return replica
+        return super().get_bind(mapper, clause)
+
+    def _replica(self):
+        if self.info.get('primary') or not has_request_context() \
+                or request.method not in READ_METHODS:
+            return None
+        if 'replica' not in self.info:
+            replicas = self.app.extensions.get('db_replicas')
+            self.info['replica'] = replicas.next_engine() \
+                if replicas else None
+        return self.info['replica']
+
+
+@event.listens_for(RoutingSession, 'before_flush')
+def _use_primary_before_flush(session, flush_context, instances):
+    session.info['primary'] = True
+
+
+'''
+RoutingSQLAlchemy
+the Flask-SQLAlchemy extension of the api, its sessions are RoutingSession
+'''
+class RoutingSQLAlchemy(SQLAlchemy):
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
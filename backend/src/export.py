@@ -0,0 +1,86 @@
+import csv
+import io
+import os
+from flask import Response, abort, request, stream_with_context
+
+from .database.models import db
+from .serialization import dumps
+
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+# rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+
+'''
+get_export_format(args=None)
+    reads ?format= from args, the query arguments of the current request by
+    default, ndjson by default
+    it should abort 400 on an unknown format
+'''
+def get_export_format(args=None):
+    if args is None:
+        args = request.args
+    fmt = args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        abort(400)
+    return fmt
+
+
+def _ndjson_chunk(rows, fields, encode):
+    return b''.join(encode(dict(zip(fields, row))) + b'\n' for row in rows)
+
+
+def _csv_chunk(rows, fields, encode):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+'''
+csv_header(fields) / write_chunk(rows, fields, fmt, encode=dumps)
+    the csv header line and the body chunk of a batch of rows, encode
+    turns an ndjson row into bytes
+'''
+def csv_header(fields):
+    return ','.join(fields) + '\r\n'
+
+
+def write_chunk(rows, fields, fmt, encode=dumps):
+    write = _csv_chunk if fmt == 'csv' else _ndjson_chunk
+    return write(rows, fields, encode)
+
+
+'''
+stream_rows(statement, fmt)
+    generator of the export body, one chunk per EXPORT_BATCH_SIZE rows
+    @INPUTS
+        statement: Core select, read through a server-side cursor, its
+            column labels are the exported fields (and the csv header)
+        fmt: 'ndjson' or 'csv'
+'''
+def stream_rows(statement, fmt):
+    result = db.session.execute(
+        statement, execution_options={'stream_results': True}) \
+        .yield_per(EXPORT_BATCH_SIZE)
+    fields = list(result.keys())
+    if fmt == 'csv':
+        yield csv_header(fields)
+
+    for rows in result.partitions():
+        yield write_chunk(rows, fields, fmt)
+
+
+'''
+export_response(statement, filename)
+    streams every row of statement as ndjson or csv (see ?format=)
+    worker memory is bounded by EXPORT_BATCH_SIZE whatever the table size
+'''
+def export_response(statement, filename):
+    fmt = get_export_format()
+    body = stream_rows(statement, fmt)
+    return Response(stream_with_context(body), mimetype=EXPORT_FORMATS[fmt],
+                    headers={'Content-Disposition':
+                             f'attachment; filename={filename}.{fmt}'})
@@ -0,0 +1,92 @@
+from flask import abort, request
+from sqlalchemy import select
+from sqlalchemy.orm import load_only, selectinload
+
+from .database.models import Actor, Movie
+
+
+'''
+FIELDS
+    model -> api field -> column, the fields ?fields= may ask for
+RELATIONS
+    model -> api field -> relationship, only on the detail routes
+'''
+FIELDS = {
+    Actor: {'id': Actor.id, 'name': Actor.name, 'age': Actor.age,
+            'gender': Actor.gender},
+    Movie: {'id': Movie.id, 'title': Movie.title,
+            'releaseDate': Movie.release_date},
+}
+RELATIONS = {
+    Actor: {'movies': Actor.movies},
+    Movie: {'actors': Movie.actors},
+}
+
+
+'''
+get_fields(model, detail=False, args=None)
+    reads ?fields= (comma separated api fields) from args, the query
+    arguments of the current request by default
+    returns None when absent, else the requested fields, id always first
+    it should abort 400 on an empty list or a field outside the allow-list
+'''
+def get_fields(model, detail=False, args=None):
+    if args is None:
+        args = request.args
+    value = args.get('fields')
+    if value is None:
+        return None
+
+    allowed = set(FIELDS[model])
+    if detail:
+        allowed |= set(RELATIONS[model])
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    if not names or any(name not in allowed for name in names):
+        abort(400)
+    return ['id'] + [name for name in dict.fromkeys(names) if name != 'id']
+
+
+'''
+select_fields(model, fields=None)
+    Core select of the columns of fields, every short() field by default,
+    labelled with the api names so row._asdict() is the short() dict
+'''
+def select_fields(model, fields=None):
+    columns = FIELDS[model]
+    return select(*(columns[name].label(name)
+                    for name in fields or columns))
+
+
+'''
+detail_options(model, fields)
+    ORM query options of the detail routes, loading only the columns of
+    fields and the relations only when they are requested
+    without fields every column and relation is loaded
+'''
+def detail_options(model, fields):
+    relations = RELATIONS[model]
+    if fields is None:
+        return [selectinload(relation) for relation in relations.values()]
+
+    columns = [FIELDS[model][name] for name in fields if name in FIELDS[model]]
+    return [load_only(*columns)] + \
+        [selectinload(relations[name]) for name in fields if name in relations]
+
+
+'''
+serialize_detail(row, fields)
+    the requested fields of row, nested relations in their short() form
+    without fields, row.long()
+'''
+def serialize_detail(row, fields):
+    if fields is None:
+        return row.long()
+
+    columns = FIELDS[type(row)]
+    data = {}
+    for name in fields:
+        if name in columns:
+            data[name] = getattr(row, columns[name].key)
+        else:
+            data[name] = [related.short() for related in getattr(row, name)]
+    return data
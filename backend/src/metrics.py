@@ -0,0 +1,116 @@
+import os
+import time
+from flask import Response, g, request
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, \
+    CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+
+from .database.instrumentation import get_request_queries
+
+
+'''
+Prometheus metrics
+collected in each process by the prometheus_client metrics below
+
+with gunicorn, PROMETHEUS_MULTIPROC_DIR (set by gunicorn.conf.py) makes
+every worker write its samples to files of that directory, GET /metrics
+adds up the files of all the workers so any worker answers for the whole
+server
+'''
+PROMETHEUS_MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+DB_QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, float('inf'))
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'Time spent handling the request, by route and status.',
+    ['method', 'route', 'status'])
+REQUEST_DB_QUERIES = Histogram(
+    'http_request_db_queries',
+    'Number of database queries run by the request.',
+    ['method', 'route'], buckets=DB_QUERY_BUCKETS)
+REQUEST_DB_DURATION = Histogram(
+    'http_request_db_duration_seconds',
+    'Time spent running the database queries of the request.',
+    ['method', 'route'])
+AUTH_DURATION = Histogram(
+    'auth_verification_duration_seconds',
+    'Time spent reading and verifying the bearer token of a request.',
+    ['outcome'])
+CACHE_LOOKUPS = Counter(
+    'cache_lookups_total',
+    'Lookups of the response cache and of the verified token cache.',
+    ['cache', 'result'])
+
+
+'''
+observe_auth(seconds, outcome)
+    records a token verification, outcome is ok or denied
+'''
+def observe_auth(seconds, outcome):
+    AUTH_DURATION.labels(outcome).observe(seconds)
+
+
+'''
+observe_cache(cache, hit)
+    records a lookup of cache (response or token), the hit ratio is
+        rate(cache_lookups_total{result="hit"}) /
+        rate(cache_lookups_total)
+'''
+def observe_cache(cache, hit):
+    CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def route_label():
+    rule = request.url_rule
+    return rule.rule if rule is not None else 'unmatched'
+
+
+'''
+collect(path=PROMETHEUS_MULTIPROC_DIR)
+    the metrics in the Prometheus text format, summed over the files of the
+    workers in path, or the metrics of this process when path is unset
+'''
+def collect(path=PROMETHEUS_MULTIPROC_DIR):
+    if not path:
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=path)
+    return generate_latest(registry)
+
+
+'''
+init_metrics(app)
+    times every request of app and adds GET /metrics (permission
+    get:internal)
+    the time of a streamed response (exports) stops when streaming starts
+    the database queries of a request are the ones the sql instrumentation
+    recorded (init_sql_instrumentation)
+'''
+def init_metrics(app):
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        route = route_label()
+        REQUEST_DURATION.labels(request.method, route,
+                                str(response.status_code)) \
+            .observe(time.perf_counter() - started)
+        queries = get_request_queries()
+        REQUEST_DB_QUERIES.labels(request.method, route) \
+            .observe(queries.count if queries else 0)
+        REQUEST_DB_DURATION.labels(request.method, route) \
+            .observe(queries.seconds if queries else 0.0)
+        return response
+
+    # imported here, auth imports this module for its own metrics
+    from .auth.auth import requires_auth
+
+    @app.route('/metrics', methods=['GET'])
+    @requires_auth('get:internal')
+    def metrics(payload):
+        return Response(collect(), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,125 @@
+import base64
+import binascii
+import json
+import os
+from flask import abort, request
+from sqlalchemy import func, text
+
+from .database.models import db
+
+
+DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE', 50))
+MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 200))
+# below this many rows an exact COUNT(*) is cheap enough to replace estimates
+EXACT_COUNT_THRESHOLD = 10000
+
+'''
+is_number(value)
+    whether value is made of ascii digits only, str.isdigit() accepts '²'
+    which int() rejects
+'''
+def is_number(value):
+    return value.isascii() and value.isdecimal()
+
+
+'''
+encode_cursor(last_id)
+    returns the opaque cursor of the row following last_id
+'''
+def encode_cursor(last_id):
+    raw = json.dumps({'after': last_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+'''
+decode_cursor(cursor)
+    returns the id encoded in cursor, a plain integer id is accepted as well
+    it should abort 400 if the cursor is malformed
+'''
+def decode_cursor(cursor):
+    if is_number(cursor):
+        return int(cursor)
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii'))
+        after = json.loads(raw)['after']
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        abort(400)
+    if not isinstance(after, int):
+        abort(400)
+    return after
+
+
+'''
+get_page_args(args=None)
+    reads ?limit=, ?after= and ?count= from args, the query arguments of the
+    current request by default
+    limit defaults to DEFAULT_PAGE_SIZE and is capped at MAX_PAGE_SIZE
+    count is None, 'estimate' or 'exact'
+    it should abort 400 on a non positive limit or an unknown count mode
+'''
+def get_page_args(args=None):
+    if args is None:
+        args = request.args
+    limit = args.get('limit', str(DEFAULT_PAGE_SIZE))
+    if not is_number(limit) or int(limit) < 1:
+        abort(400)
+    limit = int(limit)
+    limit = min(limit, MAX_PAGE_SIZE)
+
+    after = args.get('after')
+    after = decode_cursor(after) if after else None
+
+    count = args.get('count')
+    if count not in (None, 'estimate', 'exact'):
+        abort(400)
+    return limit, after, count
+
+
+'''
+paginate(statement, column, limit, after, session=None)
+    keyset pagination on the indexed column (the primary key)
+    @INPUTS
+        statement: Core select of the rows to page through, selecting column
+        column: the unique column the pages are ordered by
+        limit: maximum number of rows
+        after: column value of the last row of the previous page, or None
+        session: the session running the query, db.session by default
+
+    returns (row tuples, next cursor or None on the last page)
+'''
+def paginate(statement, column, limit, after=None, session=None):
+    if session is None:
+        session = db.session
+    if after is not None:
+        statement = statement.where(column > after)
+    rows = session.execute(
+        statement.order_by(column).limit(limit + 1)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(_row_value(rows[-1], column))
+    return rows, next_cursor
+
+
+def _row_value(row, column):
+    return getattr(row, column.key)
+
+
+'''
+count_rows(session, model, mode)
+    returns (row count, True if the count is an estimate)
+    on PostgreSQL the 'estimate' mode reads the planner statistics instead of
+    scanning the table, small or never analyzed tables are counted exactly
+'''
+def count_rows(session, model, mode='exact'):
+    if mode == 'estimate' and session.bind.dialect.name == 'postgresql':
+        estimate = session.execute(
+            text('SELECT reltuples::bigint FROM pg_class '
+                 'WHERE oid = to_regclass(:table)'),
+            {'table': model.__tablename__}).scalar()
+        if estimate is not None and estimate >= EXACT_COUNT_THRESHOLD:
+            return estimate, True
+
+    total = session.query(func.count(model.id)).scalar()
+    return total, False
@@ -0,0 +1,254 @@
+import math
+from itertools import combinations
+from flask import abort, request
+from sqlalchemy import DDL, bindparam, case, event, func, inspect, \
+    literal_column, select, text
+
+from .database.models import db, Actor, Movie
+from .fields import select_fields
+from .pagination import encode_cursor, get_page_args
+
+
+# longer queries are truncated, they only add trigrams to match
+MAX_QUERY_LENGTH = 100
+# share of the trigrams of the query a fuzzy match must contain (SQLite)
+MIN_TRIGRAM_RATIO = 0.5
+# SQLite ranks the fuzzy matches among at most this many candidates
+FUZZY_CANDIDATES = 1000
+
+'''
+SEARCH_COLUMNS
+    model -> the column searched by GET /<table>/search
+'''
+SEARCH_COLUMNS = {
+    Actor: Actor.name,
+    Movie: Movie.title,
+}
+
+
+'''
+search_index_ddl(tablename, column, dialect='sqlite')
+    statements creating the search index of a table, run after
+    db.create_all() (migration e2a8f5c3d914 keeps its own copy)
+    PostgreSQL: the pg_trgm extension and a GIN trigram index serving the
+        fuzzy matches
+    SQLite:
+        an index on lower(column) serving the prefix matches
+        an FTS5 shadow table with the trigram tokenizer, which matches
+            substrings of at least 3 characters, and the triggers keeping it
+            in sync
+        an fts5vocab table giving the number of rows of every trigram
+        the rows already in the table are indexed
+'''
+def search_index_ddl(tablename, column, dialect='sqlite'):
+    if dialect == 'postgresql':
+        return [
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+            f"CREATE INDEX IF NOT EXISTS ix_{tablename}_{column}_trgm "
+            f"ON {tablename} USING gin ({column} gin_trgm_ops)",
+        ]
+    if dialect != 'sqlite':
+        return []
+    fts = f'{tablename}_search'
+    return [
+        f"CREATE INDEX IF NOT EXISTS ix_{tablename}_{column}_lower "
+        f"ON {tablename} (lower({column}))",
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({column}, "
+        f"content='{tablename}', content_rowid='id', tokenize='trigram')",
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts}_vocab "
+        f"USING fts5vocab({fts}, 'row')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {tablename} "
+        f"BEGIN INSERT INTO {fts}(rowid, {column}) "
+        f"VALUES (new.id, new.{column}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {tablename} "
+        f"BEGIN INSERT INTO {fts}({fts}, rowid, {column}) "
+        f"VALUES ('delete', old.id, old.{column}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {column} "
+        f"ON {tablename} "
+        f"BEGIN INSERT INTO {fts}({fts}, rowid, {column}) "
+        f"VALUES ('delete', old.id, old.{column}); "
+        f"INSERT INTO {fts}(rowid, {column}) "
+        f"VALUES (new.id, new.{column}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+# tables created by db.create_all() (tests, fast local setup) get their
+# search index as well, the migrations create it on the other databases
+for _model, _column in SEARCH_COLUMNS.items():
+    for _dialect in ('sqlite', 'postgresql'):
+        for _statement in search_index_ddl(_model.__tablename__, _column.key,
+                                           _dialect):
+            event.listen(_model.__table__, 'after_create',
+                         DDL(_statement).execute_if(dialect=_dialect))
+
+
+_fts_tables = {}
+
+
+def has_fts_table(model, session=None):
+    if session is None:
+        session = db.session
+    bind = session.bind
+    key = (str(bind.url), model.__tablename__)
+    if key not in _fts_tables:
+        _fts_tables[key] = inspect(bind).has_table(
+            f'{model.__tablename__}_search')
+    return _fts_tables[key]
+
+
+def _like_escape(q):
+    return q.replace('\\', '\\\\').replace('%', '\\%') \
+        .replace('_', '\\_')
+
+
+def _trigrams(q):
+    q = q.lower()
+    return list(dict.fromkeys(q[i:i + 3] for i in range(len(q) - 2)))
+
+
+def _fts_string(gram):
+    return '"' + gram.replace('"', '""') + '"'
+
+
+'''
+search_ids(model, q, offset, count, session=None)
+    the ids of the rows of model matching q, best matches first
+    @INPUTS
+        model: Actor or Movie
+        q: the text searched, at least one character
+        offset: number of leading matches to skip
+        count: maximum number of ids returned
+        session: the session running the queries, db.session by default
+
+    on PostgreSQL: the rows starting with q, then the rows whose word
+        similarity with q reaches the pg_trgm threshold, by decreasing
+        similarity (GIN trigram index)
+    on SQLite, see _sqlite_search_ids
+    otherwise: the rows starting with q, then the rows containing q
+'''
+def search_ids(model, q, offset, count, session=None):
+    if session is None:
+        session = db.session
+    column = SEARCH_COLUMNS[model]
+    prefix = _like_escape(q) + '%'
+    dialect = session.bind.dialect.name
+
+    if dialect == 'sqlite' and has_fts_table(model, session):
+        return _sqlite_search_ids(session, model, column, q,
+                                  offset + count)[offset:]
+
+    if dialect == 'postgresql':
+        is_prefix = column.ilike(prefix, escape='\\')
+        query = session.query(model.id) \
+            .filter(is_prefix | column.op('%>')(q)) \
+            .order_by(is_prefix.desc(),
+                      func.word_similarity(q, column).desc(), model.id)
+    else:
+        is_prefix = column.like(prefix, escape='\\')
+        query = session.query(model.id) \
+            .filter(column.like('%' + prefix, escape='\\')) \
+            .order_by(case((is_prefix, 0), else_=1), model.id)
+    return [id for (id,) in query.offset(offset).limit(count)]
+
+
+'''
+_sqlite_search_ids(session, model, column, q, count)
+    the first count matches, gathered tier by tier until count is reached
+        1. the rows starting with q, alphabetically (lower(column) index)
+        2. the rows containing q, by id (FTS5 phrase query)
+        3. for queries of 5 characters or more, the rows containing at
+            least MIN_TRIGRAM_RATIO of the trigrams of q, by number of
+            shared trigrams
+    a fuzzy match contains at least 2 of the rarest n - k + 2 trigrams of q
+    (n trigrams, k required), so the FTS5 query only asks for those pairs
+'''
+def _sqlite_search_ids(session, model, column, q, count):
+    fts = f'{model.__tablename__}_search'
+    lowered = func.lower(column)
+    low = func.lower(q)
+    ids = [id for (id,) in session.query(model.id)
+           .filter(lowered >= low, lowered < low.op('||')('\U0010ffff'))
+           .order_by(lowered, model.id).limit(count)]
+    if len(ids) >= count or len(q) < 3:
+        return ids
+
+    seen = set(ids)
+    contains = session.execute(
+        text(f'SELECT rowid FROM {fts} WHERE {fts} MATCH :match '
+             'ORDER BY rowid LIMIT :count'),
+        {'match': _fts_string(q), 'count': count}).scalars()
+    ids += [id for id in contains if id not in seen][:count - len(ids)]
+    if len(ids) >= count or len(q) < 5:
+        return ids
+
+    grams = _trigrams(q)
+    required = max(2, math.ceil(MIN_TRIGRAM_RATIO * len(grams)))
+    rows = dict(session.execute(
+        text(f'SELECT term, doc FROM {fts}_vocab WHERE term IN :grams')
+        .bindparams(bindparam('grams', expanding=True)),
+        {'grams': grams}).all())
+    rarest = sorted(grams, key=lambda gram: rows.get(gram, 0))
+    rarest = rarest[:len(grams) - required + 2]
+    match = ' OR '.join(f'({_fts_string(a)} AND {_fts_string(b)})'
+                        for a, b in combinations(rarest, 2))
+    candidates = select(literal_column('rowid')) \
+        .select_from(text(fts)) \
+        .where(literal_column(fts).op('MATCH')(match)) \
+        .limit(FUZZY_CANDIDATES)
+    shared = sum(case((func.instr(lowered, gram) > 0, 1), else_=0)
+                 for gram in grams)
+    ids += [id for (id,) in session.query(model.id)
+            .filter(model.id.in_(candidates),
+                    func.instr(lowered, low) == 0,
+                    shared >= required)
+            .order_by(shared.desc(), model.id)
+            .limit(count - len(ids))]
+    return ids
+
+
+'''
+get_search_args(args=None)
+    reads ?q=, ?limit= and ?after= from args, the query arguments of the
+    current request by default
+    returns (q, limit, offset), the cursor holds the rank of the last row
+    as ranked results have no keyset
+    it should abort 400 if q is missing or blank
+'''
+def get_search_args(args=None):
+    if args is None:
+        args = request.args
+    q = args.get('q', '').strip()[:MAX_QUERY_LENGTH]
+    if not q:
+        abort(400)
+    limit, offset, _ = get_page_args(args)
+    return q, limit, max(offset or 0, 0)
+
+
+'''
+search_rows(model, q, limit, offset, fields=None, session=None)
+    the page of the matches of q starting at rank offset
+    the rows are Core row tuples of fields (see select_fields)
+    returns (rows, next cursor or None on the last page)
+'''
+def search_rows(model, q, limit, offset, fields=None, session=None):
+    if session is None:
+        session = db.session
+    ids = search_ids(model, q, offset, limit + 1, session)
+    next_cursor = None
+    if len(ids) > limit:
+        ids = ids[:limit]
+        next_cursor = encode_cursor(offset + limit)
+    rows = {row.id: row for row in session.execute(
+        select_fields(model, fields).where(model.id.in_(ids)))}
+    return [rows[id] for id in ids], next_cursor
+
+
+'''
+search_page(model, fields=None)
+    search_rows of the query arguments of the current request
+    it should abort 400 if q is missing or blank
+'''
+def search_page(model, fields=None):
+    q, limit, offset = get_search_args()
+    return search_rows(model, q, limit, offset, fields)
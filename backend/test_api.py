@@ -23,6 +23,7 @@ class ApiTestCase(unittest.TestCase):
 
         self.app = create_app(self.database_path)
         self.client = self.app.test_client
+        db.create_all()
 
         self.seedData(self)
 
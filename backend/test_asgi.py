@@ -0,0 +1,180 @@
+import json
+import unittest
+
+from api_testcase import AsgiApiTestCase
+from src.asgi.database import async_database_url
+import test_bulk
+import test_casting
+import test_conditional
+import test_export
+import test_fields
+import test_pagination
+import test_search
+
+
+'''
+The api test cases of the wsgi app, run again against the asgi app
+'''
+
+
+class AsgiPaginationTestCase(AsgiApiTestCase,
+                             test_pagination.PaginationTestCase):
+    pass
+
+
+class AsgiFieldsTestCase(AsgiApiTestCase, test_fields.SparseFieldsTestCase):
+    pass
+
+
+class AsgiCastingTestCase(AsgiApiTestCase, test_casting.CastingTestCase):
+    pass
+
+
+class AsgiConditionalTestCase(AsgiApiTestCase,
+                              test_conditional.ConditionalGetTestCase):
+    pass
+
+
+class AsgiBulkTestCase(AsgiApiTestCase, test_bulk.BulkCreateTestCase):
+    pass
+
+
+class AsgiSearchTestCase(AsgiApiTestCase, test_search.SearchTestCase):
+    pass
+
+
+class AsgiExportTestCase(AsgiApiTestCase, test_export.ExportTestCase):
+    pass
+
+
+class AsgiAppTestCase(AsgiApiTestCase):
+    """This class represents the asgi specific test case"""
+
+    def request(self, method, path, role='assistant', body=None):
+        res = self.client().open(path, method=method, json=body,
+                                 headers=self.getUserTokenHeaders(role))
+        return res, json.loads(res.data)
+
+    def test_async_database_url(self):
+        self.assertEqual(
+            str(async_database_url('postgresql://user@localhost/casting')),
+            'postgresql+asyncpg://user@localhost/casting')
+        self.assertEqual(str(async_database_url('sqlite:////tmp/test.db')),
+                         'sqlite+aiosqlite:////tmp/test.db')
+        with self.assertRaises(ValueError):
+            async_database_url('mysql://localhost/casting')
+
+    def test_create_update_delete(self):
+        res, data = self.request('POST', '/movies', 'producer', {
+            'title': 'Async Movie', 'releaseDate': '2020-02-02'})
+        self.assertEqual(res.status_code, 200)
+        movie_id = data['data'][0]['id']
+        self.assertEqual(data['data'][0]['releaseDate'],
+                         'Sun, 02 Feb 2020 00:00:00 GMT')
+
+        res, data = self.request('POST', '/actors', 'director', {
+            'name': 'Async Actor', 'age': 40, 'gender': 'female'})
+        actor_id = data['data'][0]['id']
+        res, data = self.request('PATCH', f'/actors/{actor_id}', 'director',
+                                 {'age': 41, 'gender': 'male'})
+        self.assertEqual((data['data'][0]['age'], data['data'][0]['gender']),
+                         (41, 'male'))
+
+        res, data = self.request('DELETE', f'/movies/{movie_id}', 'producer')
+        self.assertEqual(data, {'success': True, 'deleted': movie_id})
+        res, data = self.request('GET', f'/movies/{movie_id}')
+        self.assertEqual(res.status_code, 404)
+        self.assertEqual(data['message'], 'resource not found')
+        self.request('DELETE', f'/actors/{actor_id}', 'director')
+
+    def test_create_invalid_body(self):
+        res, data = self.request('POST', '/actors', 'director',
+                                 {'name': 'No Age'})
+
+        self.assertEqual(res.status_code, 422)
+        self.assertEqual(data, {'success': False, 'error': 422,
+                                'message': 'unprocessable'})
+
+    def test_create_validation_matches_wsgi(self):
+        wsgi = self.app.test_client()
+        headers = self.getUserTokenHeaders('producer')
+        invalid = [
+            ('/actors', {'name': 'Negative Age', 'age': -1,
+                         'gender': 'male'}),
+            ('/actors', {'name': 'Text Age', 'age': '40', 'gender': 'male'}),
+            ('/actors', {'name': 'Bool Age', 'age': True, 'gender': 'male'}),
+            ('/actors', {'name': ' ', 'age': 40, 'gender': 'male'}),
+            ('/actors', {'name': 'A' * 181, 'age': 40, 'gender': 'male'}),
+            ('/actors', ['not', 'an', 'object']),
+            ('/movies', {'title': 'Bad Date', 'releaseDate': 'tomorrow'}),
+            ('/movies', {'title': 42, 'releaseDate': '2020-02-02'}),
+        ]
+
+        for path, body in invalid:
+            with self.subTest(path=path, body=body):
+                res = self.client().post(path, json=body, headers=headers)
+                wsgi_res = wsgi.post(path, json=body, headers=headers)
+
+                self.assertEqual(res.status_code, 422)
+                self.assertEqual(wsgi_res.status_code, res.status_code)
+                self.assertEqual(json.loads(wsgi_res.data),
+                                 json.loads(res.data))
+
+    def test_update_validation_matches_wsgi(self):
+        wsgi = self.app.test_client()
+        headers = self.getUserTokenHeaders('producer')
+        res, data = self.request('POST', '/actors', 'producer', {
+            'name': 'Patched Actor', 'age': 40, 'gender': 'female'})
+        path = f"/actors/{data['data'][0]['id']}"
+        invalid = [
+            (path, {'age': -3}, 422),
+            (path, {'age': '41'}, 422),
+            (path, {'age': 41.5}, 422),
+            (path, {'name': 'A' * 181}, 422),
+            (path, {'name': ''}, 422),
+            ('/movies/1000', {'title': 'Missing Movie'}, 404),
+        ]
+
+        for path_, body, status in invalid:
+            with self.subTest(path=path_, body=body):
+                res = self.client().patch(path_, json=body, headers=headers)
+                wsgi_res = wsgi.patch(path_, json=body, headers=headers)
+
+                self.assertEqual(res.status_code, status)
+                self.assertEqual(wsgi_res.status_code, res.status_code)
+                self.assertEqual(json.loads(wsgi_res.data),
+                                 json.loads(res.data))
+
+        for client in (self.client(), wsgi):
+            res = client.patch(path, json={'age': 0}, headers=headers)
+            self.assertEqual(res.status_code, 200)
+            self.assertEqual(json.loads(res.data)['data'][0]['age'], 0)
+            client.patch(path, json={'age': 40}, headers=headers)
+
+        res, data = self.request('GET', path)
+        self.assertEqual((data['data']['name'], data['data']['age']),
+                         ('Patched Actor', 40))
+
+    def test_pool_stats(self):
+        res, data = self.request('GET', '/_internal/pool', 'operator')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn('pool', data['data'])
+
+        res, data = self.request('GET', '/_internal/pool', 'producer')
+        self.assertEqual(res.status_code, 403)
+
+    def test_auth_errors(self):
+        res = self.client().get('/actors')
+        self.assertEqual(res.status_code, 401)
+        self.assertEqual(json.loads(res.data)['error'],
+                         'authorization_header_missing')
+
+        res, data = self.request('DELETE', '/movies/1')
+        self.assertEqual(res.status_code, 403)
+        self.assertEqual(data['error'], 'no_permission')
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
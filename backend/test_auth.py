@@ -0,0 +1,222 @@
+import time
+import unittest
+from unittest import mock
+
+from flask import Flask
+
+from src.auth import auth
+from src.auth.auth import AuthError, TokenCache, requires_auth, \
+    set_verify_backend, verify_decode_jwt
+from src.auth.backends import available_backends
+from src.auth.jwks import JWKSKeyStore
+from src.auth.stub import LocalIssuer, LocalJWKSServer
+
+
+class JWKSKeyStoreTestCase(unittest.TestCase):
+    """This class represents the jwks key store test case"""
+
+    @classmethod
+    def setUpClass(self):
+        self.issuer = LocalIssuer()
+        self.server = LocalJWKSServer(self.issuer).start()
+        self.default_store = auth.jwks_store
+
+    @classmethod
+    def tearDownClass(self):
+        self.server.stop()
+        auth.jwks_store = self.default_store
+
+    def setUp(self):
+        self.issuer.rotate('local-key-1')
+        self.server.requests = 0
+        self.store = JWKSKeyStore(self.server.url, ttl=60,
+                                  min_refresh_interval=0,
+                                  loader=auth.verify_backend.load_key)
+        auth.jwks_store = self.store
+        auth.token_cache.invalidate()
+
+    def test_keys_fetched_once(self):
+        token = self.issuer.mint('assistant')
+        for _ in range(5):
+            payload = verify_decode_jwt(token)
+
+        self.assertIn('get:actors', payload['permissions'])
+        self.assertEqual(self.server.requests, 1)
+
+    def test_unknown_kid_forces_single_refresh(self):
+        verify_decode_jwt(self.issuer.mint('assistant'))
+        self.issuer.rotate('local-key-2')
+        payload = verify_decode_jwt(self.issuer.mint('director'))
+
+        self.assertIn('post:actors', payload['permissions'])
+        self.assertEqual(self.server.requests, 2)
+
+    def test_unknown_kid_refresh_is_rate_limited(self):
+        self.store.min_refresh_interval = 60
+        verify_decode_jwt(self.issuer.mint('assistant'))
+        token = LocalIssuer('unknown').mint('assistant')
+
+        for _ in range(3):
+            with self.assertRaises(AuthError) as context:
+                verify_decode_jwt(token)
+            self.assertEqual(context.exception.status_code, 403)
+        self.assertEqual(self.server.requests, 1)
+
+    def test_stale_keys_refreshed_in_background(self):
+        token = self.issuer.mint('assistant')
+        verify_decode_jwt(token)
+        self.store.ttl = 0
+        auth.token_cache.invalidate()
+
+        verify_decode_jwt(token)
+        for _ in range(50):
+            if self.server.requests == 2:
+                break
+            time.sleep(0.01)
+
+        self.assertEqual(self.server.requests, 2)
+
+    def test_stale_keys_served_when_fetch_fails(self):
+        token = self.issuer.mint('assistant')
+        verify_decode_jwt(token)
+        self.store.url = 'http://127.0.0.1:1/.well-known/jwks.json'
+        self.store.ttl = 0
+        auth.token_cache.invalidate()
+
+        self.assertFalse(self.store.refresh())
+        payload = verify_decode_jwt(token)
+        self.assertIn('get:movies', payload['permissions'])
+
+    def test_unavailable_jwks(self):
+        self.store.url = 'http://127.0.0.1:1/.well-known/jwks.json'
+
+        with self.assertRaises(AuthError) as context:
+            verify_decode_jwt(self.issuer.mint('assistant'))
+        self.assertEqual(context.exception.status_code, 503)
+
+
+class TokenCacheTestCase(unittest.TestCase):
+    """This class represents the verified token cache test case"""
+
+    @classmethod
+    def setUpClass(self):
+        self.issuer = LocalIssuer()
+        self.server = LocalJWKSServer(self.issuer).start()
+        self.default_store = auth.jwks_store
+        self.default_cache = auth.token_cache
+        auth.jwks_store = JWKSKeyStore(self.server.url,
+                                       loader=auth.verify_backend.load_key)
+
+    @classmethod
+    def tearDownClass(self):
+        self.server.stop()
+        auth.jwks_store = self.default_store
+        auth.token_cache = self.default_cache
+
+    def setUp(self):
+        self.cache = TokenCache(maxsize=2)
+        auth.token_cache = self.cache
+
+    def test_repeat_calls_skip_decode(self):
+        token = self.issuer.mint('assistant')
+        with mock.patch.object(auth.jwt, 'decode',
+                               wraps=auth.jwt.decode) as decode:
+            for _ in range(3):
+                payload = verify_decode_jwt(token)
+
+        self.assertEqual(decode.call_count, 1)
+        self.assertEqual(self.cache.hits, 2)
+        self.assertEqual(self.cache.misses, 1)
+        self.assertIn('get:actors', payload['permissions'])
+
+    def test_size_cap_evicts_least_recently_used(self):
+        tokens = [self.issuer.mint('assistant', jti=str(i)) for i in range(3)]
+        verify_decode_jwt(tokens[0])
+        verify_decode_jwt(tokens[1])
+        verify_decode_jwt(tokens[0])
+        verify_decode_jwt(tokens[2])
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertIsNotNone(self.cache.get(tokens[0]))
+        self.assertIsNone(self.cache.get(tokens[1]))
+
+    def test_expired_entry_not_served(self):
+        token = self.issuer.mint('assistant', expires_in=60)
+        verify_decode_jwt(token)
+
+        with mock.patch.object(auth.time, 'time',
+                               return_value=time.time() + 60):
+            self.assertIsNone(self.cache.get(token))
+        self.assertEqual(self.cache.hits, 0)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_invalidate(self):
+        token = self.issuer.mint('assistant')
+        verify_decode_jwt(token)
+        self.cache.invalidate(token)
+
+        self.assertIsNone(self.cache.get(token))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_permissions_checked_on_cached_token(self):
+        app = Flask(__name__)
+        view = requires_auth('post:actors')(lambda payload: 'created')
+        headers = {'Authorization': 'Bearer ' + self.issuer.mint('assistant')}
+
+        for _ in range(2):
+            with app.test_request_context('/actors', headers=headers):
+                with self.assertRaises(AuthError) as context:
+                    view()
+                self.assertEqual(context.exception.status_code, 403)
+        self.assertEqual(self.cache.hits, 1)
+
+
+class VerifyBackendTestCase(unittest.TestCase):
+    """This class represents the jwt verification backends test case"""
+
+    @classmethod
+    def setUpClass(self):
+        self.issuer = LocalIssuer()
+        self.server = LocalJWKSServer(self.issuer).start()
+        self.default_store = auth.jwks_store
+        self.default_backend = auth.verify_backend
+        auth.jwks_store = JWKSKeyStore(self.server.url)
+
+    @classmethod
+    def tearDownClass(self):
+        self.server.stop()
+        auth.jwks_store = self.default_store
+        auth.verify_backend = self.default_backend
+
+    def test_backends_verify_token(self):
+        for name in available_backends():
+            with self.subTest(backend=name):
+                set_verify_backend(name)
+                token = self.issuer.mint('producer')
+
+                payload = verify_decode_jwt(token)
+                self.assertIn('delete:movies', payload['permissions'])
+
+    def test_backends_reject_tampered_signature(self):
+        for name in available_backends():
+            with self.subTest(backend=name):
+                set_verify_backend(name)
+                token = LocalIssuer(self.issuer.kid).mint('producer')
+
+                with self.assertRaises(AuthError) as context:
+                    verify_decode_jwt(token)
+                self.assertEqual(context.exception.status_code, 400)
+
+    def test_key_parsed_once_per_kid(self):
+        set_verify_backend('jose')
+        with mock.patch.object(auth.jwks_store, 'loader',
+                               wraps=auth.jwks_store.loader) as loader:
+            verify_decode_jwt(self.issuer.mint('assistant', jti='1'))
+            verify_decode_jwt(self.issuer.mint('assistant', jti='2'))
+
+        self.assertEqual(loader.call_count, 1)
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
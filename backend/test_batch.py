@@ -0,0 +1,222 @@
+import json
+import unittest
+from datetime import date
+from unittest import mock
+
+from api_testcase import LocalApiTestCase
+from src.api import create_app
+from src.auth import auth
+from src.database.models import db, Actor, Movie
+
+
+class BatchTestCase(LocalApiTestCase):
+    """This class represents the batch endpoint test case"""
+
+    def seedData(self):
+        for i in range(1, 11):
+            Actor(name=f"Batch Actor {i}", age=30 + i, gender="female") \
+                .insert()
+        Movie(title="Batch Movie", release_date=date(2000, 1, 1)).insert()
+
+    def batch(self, operations, role='producer', atomic=False):
+        path = '/batch?atomic=true' if atomic else '/batch'
+        res = self.client().post(path, json=operations,
+                                 headers=self.getUserTokenHeaders(role))
+        return res, json.loads(res.data)
+
+    def tearDown(self):
+        db.session.remove()
+
+    def test_batch_runs_operations_in_one_commit(self):
+        with self.count_commits() as commits:
+            res, data = self.batch([
+                {"method": "POST", "path": "/actors",
+                 "body": {"name": "Batched Actor", "age": 25,
+                          "gender": "male"}},
+                {"method": "PATCH", "path": "/actors/1",
+                 "body": {"name": "Renamed Batch Actor"}},
+                {"method": "DELETE", "path": "/actors/2"},
+                {"method": "GET", "path": "/actors/1?fields=name"},
+            ])
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(data["success"])
+        self.assertEqual([result["status"] for result in data["data"]],
+                         [200, 200, 200, 200])
+        self.assertEqual(len(commits), 1)
+        created = data["data"][0]["body"]["data"][0]
+        self.assertEqual(Actor.query.get(created["id"]).name, "Batched Actor")
+        self.assertEqual(data["data"][3]["body"]["data"]["name"],
+                         "Renamed Batch Actor")
+        self.assertIsNone(Actor.query.get(2))
+
+    def test_token_verified_once(self):
+        verify = mock.Mock(wraps=auth.verify_decode_jwt)
+        with mock.patch('src.auth.auth.verify_decode_jwt', verify):
+            res, data = self.batch([{"method": "GET", "path": "/actors/3"}
+                                    for _ in range(5)])
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(verify.call_count, 1)
+
+    def test_permissions_checked_per_operation(self):
+        res, data = self.batch([
+            {"method": "PATCH", "path": "/actors/3",
+             "body": {"age": 60}},
+            {"method": "DELETE", "path": "/movies/1"},
+        ], role='director')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data["data"][0]["status"], 200)
+        self.assertEqual(data["data"][1]["status"], 403)
+        self.assertEqual(data["data"][1]["body"]["message"],
+                         "Permission denied")
+        self.assertEqual(Actor.query.get(3).age, 60)
+        self.assertIsNotNone(Movie.query.get(1))
+
+    def test_failed_operation_does_not_stop_batch(self):
+        res, data = self.batch([
+            {"method": "DELETE", "path": "/actors/1000"},
+            {"method": "POST", "path": "/movies",
+             "body": {"title": "Batched Movie"}},
+            {"method": "PATCH", "path": "/actors/4",
+             "body": {"gender": "male"}},
+            {"method": "GET", "path": "/unknown"},
+        ])
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([result["status"] for result in data["data"]],
+                         [404, 422, 200, 404])
+        self.assertEqual(Actor.query.get(4).gender, "male")
+
+    def test_patch_validated(self):
+        res, data = self.batch([
+            {"method": "PATCH", "path": "/actors/9", "body": {"age": -3}},
+            {"method": "PATCH", "path": "/actors/9", "body": {"age": 0}},
+        ])
+
+        self.assertEqual([result["status"] for result in data["data"]],
+                         [422, 200])
+        self.assertEqual(Actor.query.get(9).age, 0)
+
+    def test_failed_flush_rolled_back_alone(self):
+        res, data = self.batch([
+            {"method": "PATCH", "path": "/actors/8",
+             "body": {"name": "Batch Actor 9"}},
+            {"method": "POST", "path": "/actors",
+             "body": {"name": "Batch Actor 10", "age": 25,
+                      "gender": "male"}},
+            {"method": "PATCH", "path": "/actors/8",
+             "body": {"age": 70}},
+        ])
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([result["status"] for result in data["data"]],
+                         [422, 422, 200])
+        actor = Actor.query.get(8)
+        self.assertEqual((actor.name, actor.age), ("Batch Actor 8", 70))
+
+    def test_atomic_batch_rolled_back(self):
+        with self.count_commits() as commits:
+            res, data = self.batch([
+                {"method": "POST", "path": "/actors",
+                 "body": {"name": "Atomic Actor", "age": 25,
+                          "gender": "male"}},
+                {"method": "DELETE", "path": "/actors/5"},
+                {"method": "DELETE", "path": "/actors/1000"},
+                {"method": "DELETE", "path": "/actors/6"},
+            ], atomic=True)
+
+        self.assertEqual(res.status_code, 422)
+        self.assertFalse(data["success"])
+        self.assertEqual([result["status"] for result in data["data"]],
+                         [200, 200, 404])
+        self.assertEqual(commits, [])
+        self.assertIsNone(Actor.query.filter_by(name="Atomic Actor").first())
+        self.assertIsNotNone(Actor.query.get(5))
+        self.assertIsNotNone(Actor.query.get(6))
+
+    def test_bulk_operation_rolled_back_with_atomic_batch(self):
+        res, data = self.batch([
+            {"method": "POST", "path": "/actors/bulk",
+             "body": [{"name": "Bulk Batch Actor 1", "age": 25,
+                       "gender": "male"},
+                      {"name": "Bulk Batch Actor 2", "age": 26,
+                       "gender": "female"}]},
+            {"method": "DELETE", "path": "/actors/1000"},
+        ], atomic=True)
+
+        self.assertEqual(res.status_code, 422)
+        self.assertEqual([result["status"] for result in data["data"]],
+                         [200, 404])
+        self.assertIsNone(
+            Actor.query.filter(Actor.name.like("Bulk Batch Actor%")).first())
+
+    def test_repeated_operations_are_not_n_plus_one(self):
+        # the instrumentation runs in raise mode, each operation is checked
+        # apart from the others
+        res, data = self.batch([
+            {"method": "PATCH", "path": f"/actors/{id}", "body": {"age": 50}}
+            for id in range(3, 11)] + [
+            {"method": "GET", "path": f"/actors/{id}"}
+            for id in range(7, 11)])
+
+        self.assertEqual(res.status_code, 200)
+        self.assertRegex(res.headers["Server-Timing"],
+                         r'desc="[0-9]{2,} queries"')
+
+    def test_invalid_operations(self):
+        res, data = self.batch([
+            {"method": "GET", "path": "/actors"},
+            {"method": "TRACE", "path": "/actors"},
+            {"method": "POST", "path": "/batch", "body": []},
+            {"method": "GET", "path": "actors"},
+            "GET /actors",
+        ])
+
+        self.assertEqual(res.status_code, 422)
+        self.assertEqual([error["index"] for error in data["errors"]],
+                         [1, 2, 3, 4])
+
+        res, data = self.batch([])
+        self.assertEqual(res.status_code, 422)
+
+    def test_batch_requires_token(self):
+        res = self.client().post('/batch', json=[
+            {"method": "GET", "path": "/actors"}])
+
+        self.assertEqual(res.status_code, 401)
+
+
+class CachedBatchTestCase(LocalApiTestCase):
+    """This class represents the batch endpoint with a response cache"""
+
+    @classmethod
+    def create_app(self):
+        return create_app(self.database_path, {'RESPONSE_CACHE': 'lru'})
+
+    def seedData(self):
+        Actor(name="Cached Batch Actor", age=30, gender="female").insert()
+
+    def test_cache_bypassed_and_invalidated_after_commit(self):
+        headers = self.getUserTokenHeaders('producer')
+        self.client().get('/actors/1', headers=headers)
+
+        res = self.client().post('/batch', headers=headers, json=[
+            {"method": "PATCH", "path": "/actors/1",
+             "body": {"name": "Updated Batch Actor"}},
+            {"method": "GET", "path": "/actors/1"},
+        ])
+        data = json.loads(res.data)
+
+        self.assertEqual(data["data"][1]["body"]["data"]["name"],
+                         "Updated Batch Actor")
+        res = self.client().get('/actors/1', headers=headers)
+        self.assertEqual(res.headers["X-Cache"], "MISS")
+        self.assertEqual(json.loads(res.data)["data"]["name"],
+                         "Updated Batch Actor")
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
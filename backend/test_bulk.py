@@ -0,0 +1,117 @@
+import json
+import unittest
+from datetime import date
+
+from api_testcase import LocalApiTestCase
+from src.database.models import Actor, Movie
+
+
+class BulkCreateTestCase(LocalApiTestCase):
+    """This class represents the bulk create endpoints test case"""
+
+    def seedData(self):
+        Actor(name="Existing Actor", age=40, gender="female").insert()
+        Movie(title="Existing Movie", release_date=date(2000, 1, 1)).insert()
+
+    def post(self, path, body, role='producer'):
+        res = self.client().post(path, json=body,
+                                 headers=self.getUserTokenHeaders(role))
+        return res, json.loads(res.data)
+
+    def test_bulk_create_actors_single_commit(self):
+        actors = [{"name": f"Bulk Actor {i}", "age": 20 + i % 50,
+                   "gender": "male"} for i in range(1000)]
+
+        with self.count_commits() as commits:
+            res, data = self.post("/actors/bulk", actors)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(data["success"])
+        self.assertEqual(len(data["data"]), 1000)
+        self.assertEqual(data["errors"], [])
+        self.assertEqual(len(commits), 1)
+        created = Actor.query.get(data["data"][0]["id"])
+        self.assertEqual(created.name, "Bulk Actor 0")
+
+    def test_bulk_create_reports_item_errors(self):
+        res, data = self.post("/actors/bulk", [
+            {"name": "Partial Actor 1", "age": 30, "gender": "female"},
+            {"name": "Existing Actor", "age": 30, "gender": "female"},
+            {"name": "Partial Actor 1", "age": 31, "gender": "female"},
+            {"name": "Partial Actor 2", "age": "old", "gender": "male"},
+            {"name": "Partial Actor 3", "age": 32, "gender": "male"},
+        ])
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([c["index"] for c in data["data"]], [0, 4])
+        self.assertEqual([e["index"] for e in data["errors"]], [1, 2, 3])
+        self.assertEqual(
+            Actor.query.filter(Actor.name.like("Partial Actor%")).count(), 2)
+
+    def test_bulk_create_accepts_age_zero(self):
+        res, data = self.post("/actors/bulk", [
+            {"name": "Newborn Actor", "age": 0, "gender": "female"},
+            {"name": "Unborn Actor", "age": -1, "gender": "male"},
+        ])
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([c["index"] for c in data["data"]], [0])
+        self.assertEqual(data["errors"], [
+            {"index": 1, "message": "age must be a non-negative integer"}])
+
+    def test_bulk_create_atomic_rejects_batch(self):
+        res, data = self.post("/movies/bulk?atomic=true", [
+            {"title": "Atomic Movie 1", "releaseDate": "1995-11-22"},
+            {"title": "Atomic Movie 2", "releaseDate": "not a date"},
+        ])
+
+        self.assertEqual(res.status_code, 422)
+        self.assertFalse(data["success"])
+        self.assertEqual([e["index"] for e in data["errors"]], [1])
+        self.assertEqual(
+            Movie.query.filter(Movie.title.like("Atomic Movie%")).count(), 0)
+
+    def test_bulk_create_movies_date_formats(self):
+        res, data = self.post("/movies/bulk", [
+            {"title": "Dated Movie 1", "releaseDate": "1995-11-22"},
+            {"title": "Dated Movie 2",
+             "releaseDate": "Wed, 22 Nov 1995 00:00:00 GMT"},
+        ])
+
+        self.assertEqual(res.status_code, 200)
+        for created in data["data"]:
+            movie = Movie.query.get(created["id"])
+            self.assertEqual(movie.release_date, date(1995, 11, 22))
+
+    def test_create_and_update_movie_date_formats(self):
+        res, data = self.post("/movies", {
+            "title": "Single Dated Movie", "releaseDate": "1995-11-22"})
+
+        self.assertEqual(res.status_code, 200)
+        id = data["data"][0]["id"]
+        res = self.client().patch(
+            f"/movies/{id}",
+            json={"releaseDate": "Fri, 29 Jul 2011 00:00:00 GMT"},
+            headers=self.getUserTokenHeaders('producer'))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(Movie.query.get(id).release_date, date(2011, 7, 29))
+
+    def test_bulk_create_requires_array(self):
+        res, data = self.post("/movies/bulk", {"title": "Not a list"})
+
+        self.assertEqual(res.status_code, 422)
+        self.assertFalse(data["success"])
+
+    def test_bulk_create_unauthorized(self):
+        res, data = self.post("/movies/bulk", [
+            {"title": "Director Movie", "releaseDate": "1995-11-22"},
+        ], role='director')
+
+        self.assertEqual(res.status_code, 403)
+        self.assertEqual(data["message"], 'Permission denied')
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,223 @@
+import json
+import unittest
+from datetime import date
+
+from api_testcase import LocalApiTestCase
+from src.api import create_app
+from src.cache import LocalStore, LRUBackend, SharedBackend
+from src.database.models import db, Actor, Movie
+
+
+class LRUResponseCacheTestCase(LocalApiTestCase):
+    """This class represents the response cache test case"""
+
+    cache_config = {'RESPONSE_CACHE': 'lru', 'RESPONSE_CACHE_SIZE': 64}
+
+    @classmethod
+    def create_app(self):
+        return create_app(self.database_path, self.cache_config)
+
+    def seedData(self):
+        for i in range(1, 4):
+            Actor(name=f"Cached Actor {i}", age=30 + i, gender="male").insert()
+        Movie(title="Cached Movie 1", release_date=date(2001, 1, 1)).insert()
+        Movie(title="Cached Movie 2", release_date=date(2002, 1, 1)).insert()
+        movie = Movie.query.get(1)
+        movie.actors.append(Actor.query.get(1))
+        db.session.commit()
+
+    def request(self, method, path, role='producer', etag=None, body=None):
+        headers = self.getUserTokenHeaders(role)
+        if etag:
+            headers['If-None-Match'] = etag
+        return self.client().open(path, method=method, headers=headers,
+                                  json=body)
+
+    def assertCached(self, path, cached=True):
+        self.assertEqual(self.request('GET', path).headers['X-Cache'],
+                         'HIT' if cached else 'MISS')
+
+    def test_hit_skips_database(self):
+        for path in ('/actors?limit=2', '/actors/2', '/movies', '/movies/2'):
+            with self.subTest(path=path):
+                first = self.request('GET', path)
+                with self.count_queries() as statements:
+                    second = self.request('GET', path)
+
+                self.assertEqual(second.status_code, 200)
+                self.assertEqual(second.headers['X-Cache'], 'HIT')
+                self.assertEqual(second.data, first.data)
+                self.assertEqual(second.headers['ETag'], first.headers['ETag'])
+                self.assertEqual(second.content_type, 'application/json')
+                self.assertEqual(statements, [])
+
+    def test_hit_answers_not_modified(self):
+        etag = self.request('GET', '/movies?limit=1').headers['ETag']
+
+        with self.count_queries() as statements:
+            res = self.request('GET', '/movies?limit=1', etag=etag)
+
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.headers['X-Cache'], 'HIT')
+        self.assertEqual(statements, [])
+
+    def test_key_depends_on_query(self):
+        self.request('GET', '/actors?limit=1&count=exact')
+
+        self.assertCached('/actors?count=exact&limit=1')
+        self.assertCached('/actors?limit=1', cached=False)
+
+    def test_errors_are_not_cached(self):
+        self.request('GET', '/actors/100')
+
+        res = self.request('GET', '/actors/100')
+        self.assertEqual(res.status_code, 404)
+        self.assertNotIn('X-Cache', res.headers)
+
+    def test_patch_invalidates_related_responses(self):
+        for path in ('/actors', '/actors/1', '/actors/3', '/movies',
+                     '/movies/1', '/movies/2'):
+            self.request('GET', path)
+
+        res = self.request('PATCH', '/actors/1', body={
+            'name': 'Cached Actor 1', 'age': 40, 'gender': 'male'})
+        self.assertEqual(res.status_code, 200)
+
+        self.assertCached('/actors', cached=False)
+        self.assertCached('/actors/1', cached=False)
+        self.assertCached('/movies/1', cached=False)
+        self.assertCached('/actors/3')
+        self.assertCached('/movies')
+        self.assertCached('/movies/2')
+        self.assertEqual(
+            json.loads(self.request('GET', '/movies/1').data)
+            ['data']['actors'][0]['age'], 40)
+
+    def test_bulk_create_and_delete_invalidate_list(self):
+        self.request('GET', '/movies?limit=10')
+        self.request('GET', '/actors?limit=10')
+
+        res = self.request('POST', '/movies/bulk', body=[
+            {'title': 'Cached Movie 3', 'releaseDate': '2003-01-01'}])
+        movie_id = json.loads(res.data)['data'][0]['id']
+
+        self.assertCached('/movies?limit=10', cached=False)
+        self.assertCached('/actors?limit=10')
+
+        self.request('GET', f'/movies/{movie_id}')
+        self.request('DELETE', f'/movies/{movie_id}')
+
+        self.assertCached('/movies?limit=10', cached=False)
+        self.assertEqual(
+            self.request('GET', f'/movies/{movie_id}').status_code, 404)
+
+    def test_create_invalidates_list(self):
+        self.request('GET', '/actors?limit=5')
+
+        self.request('POST', '/actors', body={
+            'name': 'Cached Actor 4', 'age': 44, 'gender': 'female'})
+
+        self.assertCached('/actors?limit=5', cached=False)
+
+    def test_casting_invalidates_details(self):
+        self.request('GET', '/movies/2')
+        self.request('GET', '/actors/2')
+        self.request('GET', '/movies?limit=3')
+
+        self.request('PUT', '/movies/2/actors/2')
+
+        self.assertCached('/movies/2', cached=False)
+        self.assertCached('/actors/2', cached=False)
+        self.assertCached('/movies?limit=3')
+        data = json.loads(self.request('GET', '/actors/2').data)
+        self.assertEqual([m['id'] for m in data['data']['movies']], [2])
+
+    def test_stats(self):
+        self.request('GET', '/actors?limit=3')
+        self.request('GET', '/actors?limit=3')
+
+        res = self.client().get('/_internal/cache',
+                                headers=self.getUserTokenHeaders('operator'))
+        data = json.loads(res.data)
+
+        self.assertTrue(data['enabled'])
+        self.assertGreaterEqual(data['data']['hits'], 1)
+        self.assertGreater(data['data']['hitRatio'], 0)
+        self.assertIn('evictions', data['data'])
+
+    def test_stats_require_internal_permission(self):
+        res = self.client().get('/_internal/cache',
+                                headers=self.getUserTokenHeaders('producer'))
+
+        self.assertEqual(res.status_code, 403)
+
+
+class SharedResponseCacheTestCase(LRUResponseCacheTestCase):
+    """This class runs the response cache test case on the shared backend"""
+
+    cache_config = {'RESPONSE_CACHE': 'shared', 'RESPONSE_CACHE_SIZE': 64}
+
+
+class CacheBackendTestCase(unittest.TestCase):
+    """This class represents the cache backends test case"""
+
+    def test_lru_evicts_least_recently_used(self):
+        backend = LRUBackend(maxsize=2)
+        backend.set('a', b'1', 60)
+        backend.set('b', b'2', 60)
+        backend.get('a')
+        backend.set('c', b'3', 60)
+
+        self.assertEqual(backend.get('a'), b'1')
+        self.assertIsNone(backend.get('b'))
+        self.assertEqual(backend.evictions, 1)
+
+    def test_lru_generations_survive_eviction(self):
+        backend = LRUBackend(maxsize=1)
+        backend.bump(['actors'])
+        backend.set('a', b'1', 60)
+        backend.set('b', b'2', 60)
+
+        self.assertEqual(backend.generations(['actors', 'movies']), [1, 0])
+
+    def test_lru_generations_bounded(self):
+        backend = LRUBackend(maxsize=2)
+        backend.bump(['actor:1'])
+        before = backend.generations(['actor:1'])
+        backend.bump([f'movie:{id}' for id in range(1, 101)])
+
+        self.assertEqual(len(backend._generations), 2)
+        self.assertGreater(backend.generations(['actor:1']), before)
+        self.assertGreater(backend.generations(['actor:2']), [0])
+
+    def test_lru_expiry(self):
+        backend = LRUBackend()
+        backend.set('a', b'1', 0)
+
+        self.assertIsNone(backend.get('a'))
+
+    def test_shared_generation_evicted(self):
+        store = LocalStore(maxsize=2)
+        backend = SharedBackend(store)
+        before = backend.generations(['actors'])
+
+        backend.set('a', b'1', 60)
+        backend.set('b', b'2', 60)
+        after = backend.generations(['actors'])
+
+        self.assertGreaterEqual(backend.evictions, 1)
+        self.assertNotEqual(before, after)
+
+    def test_shared_bump(self):
+        backend = SharedBackend(LocalStore())
+        before = backend.generations(['actors', 'movies'])
+        backend.bump(['actors'])
+        after = backend.generations(['actors', 'movies'])
+
+        self.assertNotEqual(before[0], after[0])
+        self.assertEqual(before[1], after[1])
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
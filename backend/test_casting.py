@@ -0,0 +1,95 @@
+import json
+import unittest
+from datetime import date
+
+from api_testcase import LocalApiTestCase
+from src.database.models import db, Actor, Movie
+
+
+class CastingTestCase(LocalApiTestCase):
+    """This class represents the casting relation test case"""
+
+    def seedData(self):
+        for i in range(1, 7):
+            Actor(name=f"Actor {i}", age=30 + i, gender="male").insert()
+        for i in range(1, 4):
+            Movie(title=f"Movie {i}", release_date=date(2010 + i, 5, 1)) \
+                .insert()
+
+        small, large = Movie.query.get(1), Movie.query.get(2)
+        small.actors.append(Actor.query.get(1))
+        large.actors.extend(Actor.query.filter(Actor.id <= 5).all())
+        db.session.commit()
+
+    def request(self, method, path, role='assistant'):
+        res = self.client().open(path, method=method,
+                                 headers=self.getUserTokenHeaders(role))
+        return res, json.loads(res.data)
+
+    def test_movie_detail_lists_cast(self):
+        res, data = self.request('GET', '/movies/2')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([a['id'] for a in data['data']['actors']],
+                         [1, 2, 3, 4, 5])
+
+    def test_actor_detail_lists_movies(self):
+        res, data = self.request('GET', '/actors/1')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([m['title'] for m in data['data']['movies']],
+                         ['Movie 1', 'Movie 2'])
+
+    def test_detail_query_count_independent_of_cast_size(self):
+        counts = []
+        for path in ('/movies/1', '/movies/2', '/actors/1', '/actors/6'):
+            with self.count_queries() as statements:
+                res, data = self.request('GET', path)
+            self.assertEqual(res.status_code, 200)
+            counts.append(len(statements))
+
+        # table versions (etag), the row, its relations
+        self.assertEqual(counts, [3, 3, 3, 3])
+
+    def test_list_query_count_independent_of_rows(self):
+        with self.count_queries() as statements:
+            res, data = self.request('GET', '/actors')
+
+        self.assertEqual(len(data['data']), 6)
+        # table versions (etag), the rows
+        self.assertEqual(len(statements), 2)
+
+    def test_add_and_remove_cast_member(self):
+        res, data = self.request('PUT', '/movies/3/actors/6', 'director')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([a['id'] for a in data['data'][0]['actors']], [6])
+
+        res, data = self.request('PUT', '/movies/3/actors/6', 'director')
+        self.assertEqual(len(data['data'][0]['actors']), 1)
+
+        res, data = self.request('DELETE', '/movies/3/actors/6', 'director')
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['data'][0]['actors'], [])
+
+    def test_remove_cast_member_not_found(self):
+        res, data = self.request('DELETE', '/movies/3/actors/1', 'director')
+
+        self.assertEqual(res.status_code, 404)
+        self.assertFalse(data['success'])
+
+    def test_add_cast_member_unknown_actor(self):
+        res, data = self.request('PUT', '/movies/3/actors/100', 'director')
+
+        self.assertEqual(res.status_code, 404)
+        self.assertFalse(data['success'])
+
+    def test_add_cast_member_unauthorized(self):
+        res, data = self.request('PUT', '/movies/3/actors/1', 'assistant')
+
+        self.assertEqual(res.status_code, 403)
+        self.assertEqual(data['message'], 'Permission denied')
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import gzip
+import json
+import unittest
+import zlib
+from unittest import mock
+
+from api_testcase import LocalApiTestCase
+from src.api import create_app
+from src.compression import BrotliCoder, GzipCoder, get_coders, negotiate
+from src.database.models import Actor
+
+
+class CompressionTestCase(LocalApiTestCase):
+    """This class represents the response compression test case"""
+
+    @classmethod
+    def create_app(self):
+        return create_app(self.database_path, {'COMPRESSION': 'gzip'})
+
+    def seedData(self):
+        for i in range(1, 101):
+            Actor(name=f"Compressed Actor {i}", age=30, gender="female") \
+                .insert()
+
+    def get(self, path, encoding=None, **headers):
+        headers.update(self.getUserTokenHeaders())
+        if encoding:
+            headers['Accept-Encoding'] = encoding
+        return self.client().get(path, headers=headers)
+
+    def test_gzip_list(self):
+        plain = self.get('/actors?limit=100')
+        res = self.get('/actors?limit=100', 'gzip, deflate')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', res.headers['Vary'])
+        self.assertEqual(int(res.headers['Content-Length']), len(res.data))
+        self.assertLess(len(res.data), len(plain.data))
+        self.assertEqual(gzip.decompress(res.data), plain.data)
+
+    def test_identity_without_accept_encoding(self):
+        res = self.get('/actors?limit=100')
+
+        self.assertNotIn('Content-Encoding', res.headers)
+        self.assertIn('Accept-Encoding', res.headers['Vary'])
+        self.assertEqual(len(json.loads(res.data)['data']), 100)
+
+    def test_small_body_not_compressed(self):
+        res = self.get('/actors/1', 'gzip')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertLess(len(res.data), self.app.config['COMPRESSION_MIN_SIZE'])
+        self.assertNotIn('Content-Encoding', res.headers)
+
+    def test_refused_encoding(self):
+        res = self.get('/actors?limit=100', 'gzip;q=0, identity')
+
+        self.assertNotIn('Content-Encoding', res.headers)
+
+    def test_streamed_export(self):
+        plain = self.get('/actors/export?format=csv')
+        res = self.get('/actors/export?format=csv', 'gzip')
+
+        self.assertTrue(res.is_streamed)
+        self.assertEqual(res.headers['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Length', res.headers)
+        self.assertEqual(zlib.decompress(res.data, 31), plain.data)
+
+    def test_weak_etag_revalidates(self):
+        res = self.get('/actors?limit=100', 'gzip')
+        etag = res.headers['ETag']
+
+        self.assertTrue(etag.startswith('W/"'))
+        res = self.get('/actors?limit=100', 'gzip', **{'If-None-Match': etag})
+        self.assertEqual(res.status_code, 304)
+
+    def test_errors_not_compressed(self):
+        res = self.get('/actors/1000', 'gzip')
+
+        self.assertEqual(res.status_code, 404)
+        self.assertNotIn('Content-Encoding', res.headers)
+
+
+class CachedCompressionTestCase(CompressionTestCase):
+    """This class represents the compression of cached responses test case"""
+
+    @classmethod
+    def create_app(self):
+        return create_app(self.database_path, {
+            'COMPRESSION': 'gzip', 'RESPONSE_CACHE': 'lru'})
+
+    def test_cached_body_compressed_once(self):
+        compress = mock.Mock(wraps=gzip.compress)
+        with mock.patch('src.compression.gzip.compress', compress):
+            miss = self.get('/actors?limit=99', 'gzip')
+            hit = self.get('/actors?limit=99', 'gzip')
+            plain = self.get('/actors?limit=99')
+
+        self.assertEqual(compress.call_count, 1)
+        self.assertEqual(miss.headers['X-Cache'], 'MISS')
+        self.assertEqual(hit.headers['X-Cache'], 'HIT')
+        self.assertEqual(hit.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(hit.data, miss.data)
+        self.assertEqual(plain.headers['X-Cache'], 'HIT')
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertEqual(gzip.decompress(hit.data), plain.data)
+
+    def test_cached_variant_added_on_hit(self):
+        compress = mock.Mock(wraps=gzip.compress)
+        with mock.patch('src.compression.gzip.compress', compress):
+            self.get('/actors?limit=98')
+            first = self.get('/actors?limit=98', 'gzip')
+            second = self.get('/actors?limit=98', 'gzip')
+
+        self.assertEqual(compress.call_count, 1)
+        self.assertEqual(first.headers['Content-Encoding'], 'gzip')
+        self.assertEqual(second.data, first.data)
+
+
+class CodersTestCase(unittest.TestCase):
+    """This class represents the compression coders test case"""
+
+    def test_get_coders(self):
+        self.assertEqual([coder.name for coder in get_coders('gzip')],
+                         ['gzip'])
+        self.assertEqual(get_coders('none'), [])
+        with self.assertRaises(ValueError):
+            get_coders('zstd')
+
+    def test_gzip_stream(self):
+        chunks = [b'first chunk\n', b'', b'second chunk\n']
+
+        data = b''.join(GzipCoder().stream(chunks))
+
+        self.assertEqual(gzip.decompress(data), b''.join(chunks))
+
+    def test_brotli_stream(self):
+        try:
+            coder = BrotliCoder()
+        except ImportError:
+            self.skipTest('brotli is not installed')
+        chunks = [b'first chunk\n', b'second chunk\n']
+
+        data = b''.join(coder.stream(chunks))
+
+        self.assertEqual(coder._brotli.decompress(data), b''.join(chunks))
+
+    def test_brotli_preferred(self):
+        if 'br' not in [coder.name for coder in get_coders('br,gzip')]:
+            self.skipTest('brotli is not installed')
+        app = create_app('sqlite://', {'COMPRESSION': 'br,gzip'})
+
+        with app.test_request_context(headers={
+                'Accept-Encoding': 'gzip, br'}):
+            self.assertEqual(negotiate(4096).name, 'br')
+        with app.test_request_context(headers={
+                'Accept-Encoding': 'gzip;q=1, br;q=0.5'}):
+            self.assertEqual(negotiate(4096).name, 'gzip')
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
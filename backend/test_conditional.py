@@ -0,0 +1,90 @@
+import unittest
+from datetime import date
+
+from api_testcase import LocalApiTestCase
+from src.database.models import Actor, Movie
+
+
+class ConditionalGetTestCase(LocalApiTestCase):
+    """This class represents the ETag / If-None-Match test case"""
+
+    def seedData(self):
+        Actor(name="Etag Actor 1", age=30, gender="male").insert()
+        Actor(name="Etag Actor 2", age=31, gender="female").insert()
+        Movie(title="Etag Movie", release_date=date(2001, 1, 1)).insert()
+
+    def request(self, method, path, role='producer', etag=None, body=None):
+        headers = self.getUserTokenHeaders(role)
+        if etag:
+            headers['If-None-Match'] = etag
+        return self.client().open(path, method=method, headers=headers,
+                                  json=body)
+
+    def test_etag_and_not_modified(self):
+        for path in ('/actors', '/actors/1', '/movies', '/movies/1'):
+            with self.subTest(path=path):
+                res = self.request('GET', path)
+                etag = res.headers['ETag']
+
+                self.assertEqual(res.status_code, 200)
+                self.assertEqual(res.headers['Cache-Control'],
+                                 'private, no-cache')
+
+                with self.count_queries() as statements:
+                    res = self.request('GET', path, etag=etag)
+
+                self.assertEqual(res.status_code, 304)
+                self.assertEqual(res.data, b'')
+                self.assertEqual(res.headers['ETag'], etag)
+                self.assertEqual(len(statements), 1)
+                self.assertIn('table_versions', statements[0])
+
+    def test_etag_depends_on_query(self):
+        first = self.request('GET', '/actors?limit=1').headers['ETag']
+        second = self.request('GET', '/actors?limit=2').headers['ETag']
+
+        self.assertNotEqual(first, second)
+
+    def test_write_changes_etag(self):
+        etag = self.request('GET', '/actors').headers['ETag']
+        movies_etag = self.request('GET', '/movies').headers['ETag']
+
+        self.request('PATCH', '/actors/2', body={
+            'name': 'Etag Actor 2', 'age': 32, 'gender': 'female'})
+        res = self.request('GET', '/actors', etag=etag)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertNotEqual(res.headers['ETag'], etag)
+        res = self.request('GET', '/movies', etag=movies_etag)
+        self.assertEqual(res.status_code, 304)
+
+    def test_casting_changes_detail_etags(self):
+        actor_etag = self.request('GET', '/actors/1').headers['ETag']
+        movie_etag = self.request('GET', '/movies/1').headers['ETag']
+
+        self.request('PUT', '/movies/1/actors/1')
+
+        self.assertEqual(
+            self.request('GET', '/actors/1', etag=actor_etag).status_code, 200)
+        self.assertEqual(
+            self.request('GET', '/movies/1', etag=movie_etag).status_code, 200)
+
+    def test_bulk_create_changes_etag(self):
+        etag = self.request('GET', '/movies').headers['ETag']
+
+        self.request('POST', '/movies/bulk', body=[
+            {'title': 'Etag Bulk Movie', 'releaseDate': '2002-02-02'}])
+
+        self.assertEqual(
+            self.request('GET', '/movies', etag=etag).status_code, 200)
+
+    def test_no_etag_on_error(self):
+        res = self.request('GET', '/actors/100')
+
+        self.assertEqual(res.status_code, 404)
+        self.assertNotIn('ETag', res.headers)
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
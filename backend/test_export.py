@@ -0,0 +1,76 @@
+import csv
+import io
+import json
+import unittest
+from datetime import date
+from unittest import mock
+
+from api_testcase import LocalApiTestCase
+from src import export
+from src.fields import select_fields
+from src.database.models import Actor, Movie
+
+
+class ExportTestCase(LocalApiTestCase):
+    """This class represents the streaming export test case"""
+
+    def seedData(self):
+        for i in range(1, 8):
+            Actor(name=f"Export Actor {i}", age=20 + i, gender="male") \
+                .insert()
+        Movie(title="Export, The Movie", release_date=date(2011, 7, 29)) \
+            .insert()
+
+    def get(self, path, role='assistant'):
+        return self.client().get(path, headers=self.getUserTokenHeaders(role))
+
+    def test_export_ndjson(self):
+        res = self.get("/actors/export")
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.is_streamed)
+        self.assertEqual(res.mimetype, 'application/x-ndjson')
+        rows = [json.loads(line) for line in res.data.splitlines()]
+        self.assertEqual([row['id'] for row in rows], list(range(1, 8)))
+        self.assertEqual(rows[0], {'id': 1, 'name': 'Export Actor 1',
+                                   'age': 21, 'gender': 'male'})
+
+    def test_export_yields_one_chunk_per_batch(self):
+        with mock.patch.object(export, 'EXPORT_BATCH_SIZE', 3):
+            with self.app.test_request_context():
+                chunks = list(export.stream_rows(
+                    select_fields(Actor).order_by(Actor.id), 'ndjson'))
+
+        self.assertEqual([chunk.count(b'\n') for chunk in chunks], [3, 3, 1])
+
+    def test_export_csv(self):
+        res = self.get("/movies/export?format=csv")
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.mimetype, 'text/csv')
+        rows = list(csv.reader(io.StringIO(res.data.decode('utf-8'))))
+        self.assertEqual(rows, [
+            ['id', 'title', 'releaseDate'],
+            ['1', 'Export, The Movie', '2011-07-29'],
+        ])
+
+    def test_export_fields(self):
+        res = self.get("/actors/export?format=csv&fields=name")
+
+        rows = list(csv.reader(io.StringIO(res.data.decode('utf-8'))))
+        self.assertEqual(rows[:2], [['id', 'name'], ['1', 'Export Actor 1']])
+
+    def test_export_unknown_format(self):
+        res = self.get("/actors/export?format=xml")
+
+        self.assertEqual(res.status_code, 400)
+
+    def test_export_unauthorized(self):
+        res = self.client().get("/actors/export")
+
+        self.assertEqual(res.status_code, 401)
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import json
+import unittest
+from datetime import date
+
+from api_testcase import LocalApiTestCase
+from src.database.models import db, Actor, Movie
+
+
+class SparseFieldsTestCase(LocalApiTestCase):
+    """This class represents the ?fields= test case"""
+
+    def seedData(self):
+        for i in range(1, 4):
+            Actor(name=f"Fields Actor {i}", age=40 + i, gender="female") \
+                .insert()
+        Movie(title="Fields Movie", release_date=date(2005, 6, 1)).insert()
+        movie = Movie.query.get(1)
+        movie.actors.append(Actor.query.get(2))
+        db.session.commit()
+
+    def request(self, path):
+        res = self.client().get(path, headers=self.getUserTokenHeaders())
+        return res, json.loads(res.data)
+
+    def rows_select(self, statements, table):
+        return [statement for statement in statements
+                if statement.startswith('SELECT') and f'FROM {table}' in
+                statement and 'table_versions' not in statement]
+
+    def test_list_fields(self):
+        with self.count_queries() as statements:
+            res, data = self.request('/actors?fields=name')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['data'][0], {'id': 1, 'name': 'Fields Actor 1'})
+        select, = self.rows_select(statements, 'actors')
+        self.assertIn('actors.name', select)
+        self.assertNotIn('actors.age', select)
+        self.assertNotIn('actors.gender', select)
+
+    def test_list_without_fields(self):
+        res, data = self.request('/movies')
+
+        self.assertEqual(set(data['data'][0]), {'id', 'title', 'releaseDate'})
+
+    def test_detail_fields_skip_relation(self):
+        with self.count_queries() as statements:
+            res, data = self.request('/movies/1?fields=title')
+
+        self.assertEqual(data['data'], {'id': 1, 'title': 'Fields Movie'})
+        self.assertEqual(self.rows_select(statements, 'actors'), [])
+        self.assertNotIn('movies.release_date',
+                         ''.join(self.rows_select(statements, 'movies')))
+
+    def test_detail_fields_with_relation(self):
+        res, data = self.request('/movies/1?fields=actors,title')
+
+        self.assertEqual(list(data['data']), ['id', 'actors', 'title'])
+        self.assertEqual([actor['id'] for actor in data['data']['actors']],
+                         [2])
+
+    def test_search_fields(self):
+        res, data = self.request('/actors/search?q=fields&fields=age')
+
+        self.assertEqual(data['data'][0], {'id': 1, 'age': 41})
+
+    def test_unknown_field(self):
+        for path in ('/actors?fields=name,password', '/actors?fields=',
+                     '/actors?fields=movies', '/movies/1?fields=release_date'):
+            with self.subTest(path=path):
+                res, data = self.request(path)
+
+                self.assertEqual(res.status_code, 400)
+                self.assertFalse(data['success'])
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
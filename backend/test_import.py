@@ -0,0 +1,114 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from api_testcase import LocalApiTestCase
+from src.database import importer
+from src.database.importer import Checkpoint, import_file
+from src.database.models import db, Actor, Movie
+
+
+class ImportTestCase(LocalApiTestCase):
+    """This class represents the bulk import command test case"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        Actor.query.delete()
+        Movie.query.delete()
+        db.session.commit()
+
+    def write(self, name, lines):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as f:
+            f.write('\n'.join(lines) + '\n')
+        return path
+
+    def actors_file(self, count):
+        return self.write('actors.ndjson', [
+            json.dumps({'name': f'Import Actor {i}', 'age': 30,
+                        'gender': 'female'}) for i in range(count)])
+
+    def test_import_ndjson_in_batches(self):
+        batches = []
+        path = self.actors_file(25)
+
+        stats = import_file('actors', path, batch_size=10,
+                            on_batch=lambda s: batches.append(s['records']))
+
+        self.assertEqual(batches, [10, 20, 25])
+        self.assertEqual(stats['inserted'], 25)
+        self.assertEqual(Actor.query.count(), 25)
+        self.assertFalse(os.path.exists(Checkpoint(path).path))
+
+    def test_import_csv(self):
+        path = self.write('movies.csv', [
+            'title,releaseDate',
+            '"Import Movie, The",1995-11-22',
+            'Import Movie 2,not a date',
+        ])
+
+        stats = import_file('movies', path)
+
+        self.assertEqual(stats['inserted'], 1)
+        self.assertEqual(stats['rejected'], 1)
+        self.assertEqual(Movie.query.one().title, 'Import Movie, The')
+
+    def test_import_csv_coerces_age(self):
+        path = self.write('actors.csv', [
+            'name,age,gender', 'Import Actor,41,male'])
+
+        import_file('actors', path)
+
+        self.assertEqual(Actor.query.one().age, 41)
+
+    def test_import_csv_short_rows(self):
+        path = self.write('actors.csv', [
+            'name,age,gender',
+            'Import Actor',
+            'Import Actor 2,42',
+            'Import Actor 3,43,female',
+        ])
+
+        stats = import_file('actors', path)
+
+        self.assertEqual(stats['inserted'], 1)
+        self.assertEqual([(error['index'], error['message'])
+                          for error in stats['errors']],
+                         [(0, 'age must be a non-negative integer'),
+                          (1, 'gender is required')])
+        self.assertEqual(Actor.query.one().name, 'Import Actor 3')
+
+    def test_resume_after_failure(self):
+        path = self.actors_file(30)
+        load_batch = importer.load_batch
+        calls = []
+
+        def failing_load_batch(*args):
+            calls.append(1)
+            if len(calls) == 2:
+                raise RuntimeError('connection lost')
+            return load_batch(*args)
+
+        with mock.patch.object(importer, 'load_batch', failing_load_batch):
+            with self.assertRaises(RuntimeError):
+                import_file('actors', path, batch_size=10)
+
+        self.assertEqual(Checkpoint(path).load(), 10)
+        self.assertEqual(Actor.query.count(), 10)
+
+        stats = import_file('actors', path, batch_size=10)
+
+        self.assertEqual(stats['inserted'], 20)
+        self.assertEqual(stats['rejected'], 0)
+        self.assertEqual(Actor.query.count(), 30)
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+
+from flask import request
+
+from api_testcase import LocalApiTestCase
+from src.api import create_app
+from src.database.instrumentation import NPlusOneError, statement_shape
+from src.database.models import Actor
+from src.serialization import jsonify
+
+
+LOGGER = 'src.database.instrumentation'
+
+
+class SQLInstrumentationTestCase(LocalApiTestCase):
+    """This class represents the slow query log and N+1 detector test case"""
+
+    @classmethod
+    def create_app(self):
+        app = create_app(self.database_path)
+
+        @app.route('/_test/actors', methods=['GET'])
+        def one_query_per_actor():
+            # loads n actors one by one, the N+1 pattern
+            return jsonify([Actor.query.get(id).short() for id
+                            in range(1, int(request.args['n']) + 1)])
+
+        return app
+
+    def seedData(self):
+        for i in range(1, 8):
+            Actor(name=f"Instrumented Actor {i}", age=30,
+                  gender="female").insert()
+
+    def setUp(self):
+        self.app.config.update(SQL_INSTRUMENTATION='raise',
+                               SQL_SLOW_QUERY_MS=100,
+                               SQL_N_PLUS_ONE_THRESHOLD=5)
+
+    def test_n_plus_one_fails_in_raise_mode(self):
+        with self.assertRaises(NPlusOneError) as context:
+            self.client().get('/_test/actors?n=6')
+
+        self.assertEqual(context.exception.route, 'GET /_test/actors')
+        self.assertEqual(list(context.exception.repeated.values()), [6])
+
+    def test_repeats_up_to_threshold_pass(self):
+        res = self.client().get('/_test/actors?n=5')
+
+        self.assertEqual(res.status_code, 200)
+
+    def test_n_plus_one_logged_in_log_mode(self):
+        self.app.config['SQL_INSTRUMENTATION'] = 'log'
+
+        with self.assertLogs(LOGGER, 'WARNING') as logs:
+            res = self.client().get('/_test/actors?n=7')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn('N+1 queries in GET /_test/actors: 7 x SELECT',
+                      logs.output[0])
+
+    def test_slow_queries_logged_with_route(self):
+        self.app.config['SQL_SLOW_QUERY_MS'] = 0
+
+        with self.assertLogs(LOGGER, 'WARNING') as logs:
+            self.client().get('/actors/1',
+                              headers=self.getUserTokenHeaders())
+
+        self.assertTrue(logs.output)
+        self.assertTrue(all('in GET /actors/<int:id>: SELECT' in line
+                            for line in logs.output))
+
+    def test_server_timing_header(self):
+        res = self.client().get('/actors', headers=self.getUserTokenHeaders())
+
+        self.assertRegex(res.headers['Server-Timing'],
+                         r'^db;dur=[0-9.]+;desc="[0-9]+ queries"$')
+
+    def test_off_mode(self):
+        self.app.config['SQL_INSTRUMENTATION'] = 'off'
+
+        res = self.client().get('/_test/actors?n=7')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertNotIn('Server-Timing', res.headers)
+
+    def test_statement_shape(self):
+        self.assertEqual(
+            statement_shape('SELECT id\n FROM actors\n WHERE id IN (?, ?, ?)'),
+            'SELECT id FROM actors WHERE id IN (...)')
+        self.assertEqual(
+            statement_shape('SELECT id FROM actors WHERE id IN (?)'),
+            statement_shape('SELECT id FROM actors WHERE id IN (?, ?)'))
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
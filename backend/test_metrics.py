@@ -0,0 +1,153 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from prometheus_client import REGISTRY
+from prometheus_client.parser import text_string_to_metric_families
+
+from api_testcase import LocalApiTestCase
+from src.api import create_app
+from src.database.models import Actor
+from src.metrics import collect
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTestCase(LocalApiTestCase):
+    """This class represents the /metrics endpoint test case"""
+
+    @classmethod
+    def create_app(self):
+        return create_app(self.database_path, {'RESPONSE_CACHE': 'lru'})
+
+    def seedData(self):
+        Actor(name="Measured Actor", age=30, gender="female").insert()
+
+    def test_request_duration_by_route_and_status(self):
+        labels = {'method': 'GET', 'route': '/actors/<int:id>'}
+        ok = sample('http_request_duration_seconds_count', status='200',
+                    **labels)
+        missing = sample('http_request_duration_seconds_count',
+                         status='404', **labels)
+
+        self.client().get('/actors/1', headers=self.getUserTokenHeaders())
+        self.client().get('/actors/100', headers=self.getUserTokenHeaders())
+
+        self.assertEqual(sample('http_request_duration_seconds_count',
+                                status='200', **labels), ok + 1)
+        self.assertEqual(sample('http_request_duration_seconds_count',
+                                status='404', **labels), missing + 1)
+
+    def test_database_queries_per_request(self):
+        labels = {'method': 'GET', 'route': '/actors/<int:id>'}
+        count = sample('http_request_db_queries_count', **labels)
+        queries = sample('http_request_db_queries_sum', **labels)
+
+        res = self.client().get('/actors/1',
+                                headers=self.getUserTokenHeaders())
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(sample('http_request_db_queries_count', **labels),
+                         count + 1)
+        self.assertGreater(sample('http_request_db_queries_sum', **labels),
+                           queries)
+
+    def test_database_queries_with_instrumentation_off(self):
+        labels = {'method': 'GET', 'route': '/actors/<int:id>'}
+        queries = sample('http_request_db_queries_sum', **labels)
+        self.app.config['SQL_INSTRUMENTATION'] = 'off'
+        try:
+            res = self.client().get('/actors/1?fields=name',
+                                    headers=self.getUserTokenHeaders())
+        finally:
+            self.app.config['SQL_INSTRUMENTATION'] = 'raise'
+
+        self.assertEqual(res.status_code, 200)
+        self.assertNotIn('Server-Timing', res.headers)
+        self.assertGreater(sample('http_request_db_queries_sum', **labels),
+                           queries)
+
+    def test_auth_verification(self):
+        ok = sample('auth_verification_duration_seconds_count', outcome='ok')
+        denied = sample('auth_verification_duration_seconds_count',
+                        outcome='denied')
+
+        self.client().get('/actors', headers=self.getUserTokenHeaders())
+        self.client().get('/actors')
+
+        self.assertEqual(sample('auth_verification_duration_seconds_count',
+                                outcome='ok'), ok + 1)
+        self.assertEqual(sample('auth_verification_duration_seconds_count',
+                                outcome='denied'), denied + 1)
+
+    def test_cache_lookups(self):
+        hits = sample('cache_lookups_total', cache='response', result='hit')
+
+        for _ in range(2):
+            self.client().get('/actors?limit=1',
+                              headers=self.getUserTokenHeaders())
+
+        self.assertEqual(sample('cache_lookups_total', cache='response',
+                                result='hit'), hits + 1)
+        self.assertGreater(sample('cache_lookups_total', cache='token',
+                                  result='hit'), 0)
+
+    def test_metrics_endpoint(self):
+        self.client().get('/actors', headers=self.getUserTokenHeaders())
+
+        res = self.client().get('/metrics',
+                                headers=self.getUserTokenHeaders('operator'))
+        names = {family.name for family in
+                 text_string_to_metric_families(res.data.decode())}
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.content_type.startswith('text/plain'))
+        self.assertTrue({'http_request_duration_seconds',
+                         'http_request_db_queries',
+                         'http_request_db_duration_seconds',
+                         'auth_verification_duration_seconds',
+                         'cache_lookups'} <= names)
+
+    def test_metrics_endpoint_requires_internal_permission(self):
+        res = self.client().get('/metrics')
+        self.assertEqual(res.status_code, 401)
+
+        res = self.client().get('/metrics',
+                                headers=self.getUserTokenHeaders('producer'))
+        self.assertEqual(res.status_code, 403)
+
+
+class MultiProcessMetricsTestCase(unittest.TestCase):
+    """This class represents the metrics of several workers test case"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_workers_are_added_up(self):
+        for _ in range(2):
+            subprocess.check_call([
+                sys.executable, '-c',
+                'from src.metrics import observe_cache; '
+                'observe_cache("response", True)'],
+                env=dict(os.environ, PROMETHEUS_MULTIPROC_DIR=self.directory),
+                cwd=os.path.dirname(os.path.abspath(__file__)))
+
+        samples = {(s.name, s.labels.get('result')): s.value
+                   for family in text_string_to_metric_families(
+                       collect(self.directory).decode())
+                   for s in family.samples}
+
+        self.assertEqual(samples[('cache_lookups_total', 'hit')], 2)
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
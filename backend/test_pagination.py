@@ -0,0 +1,74 @@
+import json
+import unittest
+from datetime import date
+
+from api_testcase import LocalApiTestCase
+from src.database.models import Actor, Movie
+from src.pagination import MAX_PAGE_SIZE, encode_cursor
+
+
+class PaginationTestCase(LocalApiTestCase):
+    """This class represents the list pagination test case"""
+
+    def seedData(self):
+        for i in range(1, 8):
+            Actor(name=f"Actor {i}", age=20 + i, gender="female").insert()
+            Movie(title=f"Movie {i}", release_date=date(2000 + i, 1, 1)) \
+                .insert()
+
+    def get(self, path):
+        res = self.client().get(path, headers=self.getUserTokenHeaders())
+        return res, json.loads(res.data)
+
+    def test_first_page(self):
+        res, data = self.get("/actors?limit=3")
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([a['id'] for a in data["data"]], [1, 2, 3])
+        self.assertEqual(data["next"], encode_cursor(3))
+
+    def test_follow_cursor_to_last_page(self):
+        ids = []
+        path = "/movies?limit=3"
+        while path:
+            res, data = self.get(path)
+            self.assertEqual(res.status_code, 200)
+            ids += [m['id'] for m in data["data"]]
+            path = data["next"] and "/movies?limit=3&after=" + data["next"]
+
+        self.assertEqual(ids, list(range(1, 8)))
+
+    def test_after_plain_id(self):
+        res, data = self.get("/actors?after=5")
+
+        self.assertEqual([a['id'] for a in data["data"]], [6, 7])
+        self.assertIsNone(data["next"])
+
+    def test_limit_capped(self):
+        res, data = self.get(f"/actors?limit={MAX_PAGE_SIZE + 1}")
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(data["data"]), 7)
+
+    def test_invalid_page_args(self):
+        for query in ("limit=0", "limit=abc", "limit=²", "limit=١",
+                      "after=not-a-cursor", "after=²", "after=١",
+                      "count=all"):
+            with self.subTest(query=query):
+                res, data = self.get("/actors?" + query)
+
+                self.assertEqual(res.status_code, 400)
+                self.assertFalse(data["success"])
+
+    def test_count(self):
+        for mode in ("exact", "estimate"):
+            with self.subTest(mode=mode):
+                res, data = self.get("/movies?limit=2&count=" + mode)
+
+                self.assertEqual(data["total"], 7)
+                self.assertFalse(data["totalIsEstimate"])
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine, exc
+
+from api_testcase import LocalApiTestCase
+from src.api import create_app
+from src.database import pool
+from src.database.pool import TimedQueuePool, engine_options, pool_stats, \
+    warm_pool
+
+
+class PoolTestCase(unittest.TestCase):
+    """This class represents the connection pool test case"""
+
+    def setUp(self):
+        fd, self.database_file = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.engine = create_engine(
+            'sqlite:///' + self.database_file, poolclass=TimedQueuePool,
+            pool_size=2, max_overflow=1, pool_timeout=0.05)
+
+    def tearDown(self):
+        self.engine.dispose()
+        os.remove(self.database_file)
+
+    def test_engine_options(self):
+        options = engine_options('postgresql://localhost/casting')
+
+        self.assertEqual(options['poolclass'], TimedQueuePool)
+        self.assertEqual(options['pool_size'], pool.DB_POOL_SIZE)
+        self.assertEqual(options['max_overflow'], pool.DB_MAX_OVERFLOW)
+        self.assertEqual(options['pool_recycle'], pool.DB_POOL_RECYCLE)
+        self.assertEqual(options['pool_pre_ping'], pool.DB_POOL_PRE_PING)
+        self.assertEqual(engine_options('sqlite:///casting.db'), {})
+
+    def test_warm_pool(self):
+        self.assertEqual(warm_pool(self.engine, count=5), 2)
+
+        stats = pool_stats(self.engine)
+        self.assertEqual((stats['idle'], stats['checkedOut']), (2, 0))
+        self.assertEqual(stats['checkouts'], 2)
+
+    def test_checked_out_overflow_and_timeouts(self):
+        connections = [self.engine.connect() for _ in range(3)]
+        stats = pool_stats(self.engine)
+        self.assertEqual((stats['checkedOut'], stats['overflow']), (3, 1))
+
+        with self.assertRaises(exc.TimeoutError):
+            self.engine.connect()
+        for connection in connections:
+            connection.close()
+
+        stats = pool_stats(self.engine)
+        self.assertEqual((stats['checkedOut'], stats['timeouts']), (0, 1))
+        self.assertEqual(stats['checkouts'], 3)
+        self.assertGreaterEqual(stats['waitMaxMs'], stats['waitAvgMs'])
+
+    def test_models_do_not_import_auth(self):
+        output = subprocess.check_output([
+            sys.executable, '-c',
+            'import sys; import src.database.models; '
+            'print("src.auth.auth" in sys.modules)'],
+            cwd=os.path.dirname(os.path.abspath(__file__)))
+
+        self.assertEqual(output.split()[-1], b'False')
+
+
+class PoolStatsRouteTestCase(LocalApiTestCase):
+    """This class represents the pool statistics endpoint test case"""
+
+    @classmethod
+    def create_app(self):
+        return create_app(self.database_path, test_config={
+            'SQLALCHEMY_ENGINE_OPTIONS': {'poolclass': TimedQueuePool,
+                                          'pool_size': 3},
+        })
+
+    def test_pool_stats(self):
+        self.client().get('/actors', headers=self.getUserTokenHeaders())
+        res = self.client().get('/_internal/pool',
+                                headers=self.getUserTokenHeaders('operator'))
+        data = json.loads(res.data)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['data']['pool'], 'TimedQueuePool')
+        self.assertEqual(data['data']['size'], 3)
+        self.assertEqual(data['data']['checkedOut'], 0)
+        self.assertGreater(data['data']['checkouts'], 0)
+
+    def test_pool_stats_require_token(self):
+        res = self.client().get('/_internal/pool')
+
+        self.assertEqual(res.status_code, 401)
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import create_engine
+
+from api_testcase import LocalApiTestCase
+from src.api import create_app
+from src.database.bulk import insert_rows
+from src.database.models import db, Actor
+
+
+class ReplicaRoutingTestCase(LocalApiTestCase):
+    """This class represents the read replica routing test case
+
+    The primary and the two replicas are separate SQLite databases holding
+    different actors, so each response tells which database served it.
+    """
+
+    @classmethod
+    def create_app(self):
+        self.replica_files, self.replica_engines = [], []
+        for name in ('Replica One', 'Replica Two'):
+            fd, path = tempfile.mkstemp(suffix='.db')
+            os.close(fd)
+            engine = create_engine('sqlite:///' + path)
+            db.Model.metadata.create_all(engine)
+            with engine.begin() as connection:
+                connection.execute(Actor.__table__.insert(),
+                                   {'name': name, 'age': 30,
+                                    'gender': 'female'})
+            self.replica_files.append(path)
+            self.replica_engines.append(engine)
+
+        return create_app(self.database_path, test_config={
+            'DATABASE_REPLICAS': ','.join(
+                'sqlite:///' + path for path in self.replica_files),
+        })
+
+    @classmethod
+    def tearDownClass(self):
+        super().tearDownClass()
+        for engine in self.app.extensions['db_replicas'].engines + \
+                self.replica_engines:
+            engine.dispose()
+        for path in self.replica_files:
+            os.remove(path)
+
+    def seedData(self):
+        insert_rows(Actor, [{'name': 'Primary', 'age': 40,
+                             'gender': 'male'}])
+        db.session.commit()
+        db.session.remove()
+
+    def request(self, method, path, role='director', body=None):
+        res = self.client().open(path, method=method, json=body,
+                                 headers=self.getUserTokenHeaders(role))
+        return res, json.loads(res.data)
+
+    def names(self):
+        res, data = self.request('GET', '/actors')
+        return [actor['name'] for actor in data['data']]
+
+    def test_reads_round_robin_over_replicas(self):
+        names = [self.names()[0] for _ in range(4)]
+
+        self.assertEqual(sorted(names), ['Replica One', 'Replica One',
+                                         'Replica Two', 'Replica Two'])
+        self.assertNotEqual(names[0], names[1])
+
+    def test_writes_and_following_reads_use_primary(self):
+        with self.count_queries(self.engine) as primary:
+            res, data = self.request('POST', '/actors', body={
+                'name': 'Written', 'age': 50, 'gender': 'male'})
+
+        # the row is read back after the commit, from the primary only
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(data['data'][0]['name'], 'Written')
+        self.assertTrue(any(statement.startswith('INSERT')
+                            for statement in primary))
+        self.assertEqual(
+            [name for (name,) in db.session.query(Actor.name)
+             .order_by(Actor.id)], ['Primary', 'Written'])
+        self.assertNotIn('Written', self.names())
+
+        res, data = self.request('DELETE', f'/actors/{data["data"][0]["id"]}')
+        self.assertEqual(res.status_code, 200)
+
+    def test_reads_of_write_requests_use_primary(self):
+        res, data = self.request('PATCH', '/actors/1', body={'age': 41})
+
+        self.assertEqual(data['data'][0]['name'], 'Primary')
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(db.session.query(Actor.name).first(), ('Primary',))
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
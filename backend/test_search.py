@@ -0,0 +1,112 @@
+import json
+import unittest
+from datetime import date
+
+from api_testcase import LocalApiTestCase
+from src.database.models import Actor, Movie
+from src.search import has_fts_table
+
+
+class SearchTestCase(LocalApiTestCase):
+    """This class represents the search endpoints test case"""
+
+    def seedData(self):
+        for name in ("Tom Hanks", "Tom Cruise", "Hank Azaria",
+                     "Anne Hathaway", "Thomas Mann", "Meryl Streep"):
+            Actor(name=name, age=50, gender="male").insert()
+        for title in ("The Matrix", "The Matrix Reloaded", "Mad Max",
+                      "100% Love_Story"):
+            Movie(title=title, release_date=date(1999, 3, 31)).insert()
+
+    def search(self, path, status=200):
+        res = self.client().get(path, headers=self.getUserTokenHeaders())
+        self.assertEqual(res.status_code, status)
+        return json.loads(res.data)
+
+    def names(self, data, field='name'):
+        return [row[field] for row in data['data']]
+
+    def test_fts_table_created(self):
+        with self.app.app_context():
+            self.assertTrue(has_fts_table(Actor))
+            self.assertTrue(has_fts_table(Movie))
+
+    def test_prefix_matches_first(self):
+        data = self.search('/actors/search?q=tom')
+
+        self.assertTrue(data['success'])
+        self.assertEqual(self.names(data), ['Tom Cruise', 'Tom Hanks'])
+
+    def test_prefix_before_fuzzy_match(self):
+        data = self.search('/actors/search?q=hank')
+
+        self.assertEqual(self.names(data), ['Hank Azaria', 'Tom Hanks'])
+
+    def test_fuzzy_match(self):
+        data = self.search('/actors/search?q=hathawya')
+
+        self.assertEqual(self.names(data)[0], 'Anne Hathaway')
+
+    def test_substring_match_ranked(self):
+        data = self.search('/movies/search?q=matrix')
+        self.assertEqual(self.names(data, 'title'),
+                         ['The Matrix', 'The Matrix Reloaded'])
+
+        data = self.search('/movies/search?q=matrix reloadde')
+        self.assertEqual(self.names(data, 'title'), ['The Matrix Reloaded'])
+
+    def test_short_query(self):
+        data = self.search('/movies/search?q=ma')
+
+        self.assertEqual(self.names(data, 'title'), ['Mad Max'])
+
+    def test_like_wildcards_are_literal(self):
+        data = self.search('/movies/search?q=0%25 love_')
+
+        self.assertEqual(self.names(data, 'title'), ['100% Love_Story'])
+
+    def test_paginated(self):
+        first = self.search('/actors/search?q=han&limit=1')
+        second = self.search(
+            f"/actors/search?q=han&limit=1&after={first['next']}")
+
+        self.assertEqual(len(first['data']), 1)
+        self.assertEqual(len(second['data']), 1)
+        self.assertNotEqual(first['data'][0]['id'], second['data'][0]['id'])
+
+    def test_index_follows_writes(self):
+        headers = self.getUserTokenHeaders('producer')
+        res = self.client().post('/actors', headers=headers, json={
+            'name': 'Searchable Newcomer', 'age': 20, 'gender': 'female'})
+        actor_id = json.loads(res.data)['data'][0]['id']
+        data = self.search('/actors/search?q=newcomer')
+        self.assertEqual(self.names(data), ['Searchable Newcomer'])
+
+        res = self.client().patch(f'/actors/{actor_id}', headers=headers,
+                                  json={'name': 'Renamed Newbie', 'age': 20,
+                                        'gender': 'female'})
+        self.assertEqual(res.status_code, 200)
+        data = self.search('/actors/search?q=newcomer')
+        self.assertEqual(data['data'], [])
+        data = self.search('/actors/search?q=newbie')
+        self.assertEqual(self.names(data), ['Renamed Newbie'])
+
+        res = self.client().delete(f'/actors/{actor_id}', headers=headers)
+        self.assertEqual(res.status_code, 200)
+        data = self.search('/actors/search?q=newbie')
+        self.assertEqual(data['data'], [])
+
+    def test_missing_query(self):
+        data = self.search('/actors/search?q=%20', 400)
+
+        self.assertFalse(data['success'])
+
+    def test_search_unauthorized(self):
+        res = self.client().get('/movies/search?q=max')
+
+        self.assertEqual(res.status_code, 401)
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
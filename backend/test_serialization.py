@@ -0,0 +1,85 @@
+import json
+import unittest
+from datetime import date
+
+from api_testcase import LocalApiTestCase
+from src.api import create_app
+from src.database.models import Movie
+from src.serialization import (StdlibProvider, available_providers,
+                               get_provider)
+
+
+class JSONProviderTestCase(unittest.TestCase):
+    """This class represents the json providers test case"""
+
+    data = {
+        'success': True,
+        'data': [{'id': 1, 'title': 'Amélie', 'releaseDate': date(2001, 4, 25),
+                  'actors': []}],
+        'next': None,
+    }
+
+    def test_providers_agree(self):
+        for date_format in ('http', 'iso'):
+            encoded = [get_provider(name, date_format).dumps(self.data)
+                       for name in available_providers()]
+            with self.subTest(date_format=date_format):
+                self.assertTrue(all(isinstance(body, bytes)
+                                    for body in encoded))
+                self.assertEqual(len(set(encoded)), 1)
+
+    def test_http_dates(self):
+        body = json.loads(StdlibProvider('http').dumps(self.data))
+
+        self.assertEqual(body['data'][0]['releaseDate'],
+                         'Wed, 25 Apr 2001 00:00:00 GMT')
+        self.assertEqual(body['data'][0]['title'], 'Amélie')
+
+    def test_iso_dates(self):
+        body = json.loads(get_provider('auto', 'iso').dumps(self.data))
+
+        self.assertEqual(body['data'][0]['releaseDate'], '2001-04-25')
+
+    def test_unknown_provider(self):
+        with self.assertRaises(ValueError):
+            get_provider('simplejson')
+        with self.assertRaises(ValueError):
+            get_provider('stdlib', 'rfc3339')
+
+    def test_unserializable(self):
+        for name in available_providers():
+            with self.subTest(provider=name):
+                with self.assertRaises(TypeError):
+                    get_provider(name).dumps({'value': object()})
+
+
+class JSONResponseTestCase(LocalApiTestCase):
+    """This class represents the api responses encoding test case"""
+
+    def seedData(self):
+        Movie(title="Encoded Movie", release_date=date(1995, 11, 22)) \
+            .insert()
+
+    def test_response_dates_unchanged(self):
+        for name in available_providers():
+            with self.subTest(provider=name):
+                app = create_app(self.database_path, {'JSON_PROVIDER': name})
+                res = app.test_client().get(
+                    '/movies/1', headers=self.getUserTokenHeaders())
+                data = json.loads(res.data)
+
+                self.assertEqual(res.content_type, 'application/json')
+                self.assertEqual(data['data']['releaseDate'],
+                                 'Wed, 22 Nov 1995 00:00:00 GMT')
+
+    def test_error_responses(self):
+        res = self.client().get('/movies/100',
+                                headers=self.getUserTokenHeaders())
+
+        self.assertEqual(json.loads(res.data), {
+            'success': False, 'error': 404, 'message': 'resource not found'})
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from sqlalchemy import inspect
+
+from src.api import create_app
+from src.database.models import db, Actor, Movie
+
+
+class StartupTestCase(unittest.TestCase):
+    """This class represents the app startup and bootstrap-db test case"""
+
+    def setUp(self):
+        fd, self.database_file = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.database_path = 'sqlite:///' + self.database_file
+
+    def tearDown(self):
+        db.session.remove()
+        os.remove(self.database_file)
+
+    def table_names(self, app):
+        with app.app_context():
+            return set(inspect(db.get_engine(app)).get_table_names())
+
+    def test_create_app_creates_no_table(self):
+        app = create_app(self.database_path)
+
+        self.assertEqual(self.table_names(app), set())
+
+    def test_fast_boot_skips_cli_setup(self):
+        full = create_app(self.database_path)
+        fast = create_app(self.database_path, {'FAST_BOOT': True})
+
+        self.assertIn('migrate', full.extensions)
+        self.assertIn('bootstrap-db', full.cli.commands)
+        self.assertNotIn('migrate', fast.extensions)
+        self.assertNotIn('bootstrap-db', fast.cli.commands)
+
+    def test_fast_boot_does_not_import_alembic(self):
+        output = subprocess.check_output([
+            sys.executable, '-c',
+            'import sys; from src.api import create_app; '
+            f'create_app({self.database_path!r}); '
+            'print("alembic" in sys.modules)'],
+            env=dict(os.environ, FAST_BOOT='true'),
+            cwd=os.path.dirname(os.path.abspath(__file__)))
+
+        self.assertEqual(output.split()[-1], b'False')
+
+    def test_bootstrap_db_runs_migrations(self):
+        app = create_app(self.database_path)
+
+        result = app.test_cli_runner().invoke(args=['bootstrap-db', '--seed'])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertTrue({'actors', 'movies', 'castings', 'alembic_version',
+                         'actors_search'} <= self.table_names(app))
+        with app.app_context():
+            self.assertGreater(Actor.query.count(), 0)
+            self.assertGreater(Movie.query.count(), 0)
+
+    def test_upgrade_adopts_tables_created_before_migrations(self):
+        app = create_app(self.database_path)
+        with app.app_context():
+            # the tables db.create_all() made before the migrations
+            engine = db.get_engine(app)
+            engine.execute('CREATE TABLE actors (id INTEGER PRIMARY KEY, '
+                           'name VARCHAR(180) NOT NULL UNIQUE, '
+                           'age INTEGER NOT NULL, '
+                           'gender VARCHAR(50) NOT NULL)')
+            engine.execute('CREATE TABLE movies (id INTEGER PRIMARY KEY, '
+                           'title VARCHAR(180) UNIQUE, '
+                           'release_date DATE NOT NULL)')
+            engine.execute("INSERT INTO actors (name, age, gender) "
+                           "VALUES ('Unmigrated Actor', 30, 'female')")
+
+        result = app.test_cli_runner().invoke(args=['db', 'upgrade'])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertTrue({'castings', 'alembic_version'}
+                        <= self.table_names(app))
+        with app.app_context():
+            self.assertEqual(Actor.query.one().name, "Unmigrated Actor")
+
+    def test_bootstrap_db_create_all(self):
+        app = create_app(self.database_path)
+
+        result = app.test_cli_runner().invoke(
+            args=['bootstrap-db', '--create-all'])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertTrue({'actors', 'movies', 'alembic_version'}
+                        <= self.table_names(app))
+        with app.app_context():
+            version = db.session.execute(
+                'SELECT version_num FROM alembic_version').scalar()
+        self.assertIsNotNone(version)
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+from datetime import date
+
+from api_testcase import LocalApiTestCase
+from src.database.bulk import bulk_create
+from src.database.models import db, in_unit_of_work, unit_of_work, \
+    Actor, Movie
+
+
+class UnitOfWorkTestCase(LocalApiTestCase):
+    """This class represents the unit of work session scope test case"""
+
+    def seedData(self):
+        Actor(name="Scoped Actor", age=40, gender="female").insert()
+
+    def tearDown(self):
+        db.session.remove()
+
+    def test_writes_commit_once(self):
+        with self.count_commits() as commits:
+            with unit_of_work():
+                for i in range(20):
+                    Actor(name=f"Unit Actor {i}", age=30,
+                          gender="male").insert()
+                actor = Actor.query.get(1)
+                actor.age = 41
+                actor.update()
+                self.assertEqual(commits, [])
+
+        self.assertEqual(len(commits), 1)
+        db.session.remove()
+        self.assertEqual(Actor.query.filter(
+            Actor.name.like('Unit Actor %')).count(), 20)
+        self.assertEqual(Actor.query.get(1).age, 41)
+
+    def test_methods_commit_outside_a_scope(self):
+        with self.count_commits() as commits:
+            actor = Actor(name="Unscoped Actor", age=30, gender="male")
+            actor.insert()
+            actor.delete()
+
+        self.assertEqual(len(commits), 2)
+        self.assertFalse(in_unit_of_work())
+
+    def test_error_rolls_back_the_scope(self):
+        with self.assertRaises(RuntimeError):
+            with unit_of_work():
+                Movie(title="Rolled Back Movie",
+                      release_date=date(2000, 1, 1)).insert()
+                Actor.query.get(1).delete()
+                raise RuntimeError
+
+        self.assertIsNone(Movie.query.filter_by(
+            title="Rolled Back Movie").first())
+        self.assertIsNotNone(Actor.query.get(1))
+        self.assertFalse(in_unit_of_work())
+
+    def test_nested_scope_joins_the_outer_one(self):
+        with self.count_commits() as commits:
+            with unit_of_work() as outer:
+                with unit_of_work() as inner:
+                    self.assertIs(inner, outer)
+                    Actor(name="Nested Actor", age=30, gender="male") \
+                        .insert()
+                self.assertEqual(commits, [])
+                self.assertTrue(in_unit_of_work())
+
+        self.assertEqual(len(commits), 1)
+
+    def test_bulk_create_joins_the_scope(self):
+        with self.count_commits() as commits:
+            with unit_of_work():
+                created, errors = bulk_create(Actor, [
+                    {"name": "Bulk Scoped Actor", "age": 30,
+                     "gender": "female"}])
+                Actor.query.get(created[0]["id"]).update()
+                self.assertEqual(commits, [])
+
+        self.assertEqual(len(commits), 1)
+        self.assertEqual(errors, [])
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
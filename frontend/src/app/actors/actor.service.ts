@@ -1,5 +1,15 @@
 import { Injectable } from '@angular/core';
-import { Observable, catchError, of, switchMap, tap } from 'rxjs';
+import {
+  EMPTY,
+  Observable,
+  catchError,
+  expand,
+  map,
+  of,
+  reduce,
+  switchMap,
+  tap,
+} from 'rxjs';
 import { Actor } from './actor';
 import { MiddlewareService } from '../services/middleware.service';
 import { HandleErrorService } from '../services/handleError.service';
@@ -10,19 +20,23 @@ export class ActorService extends HandleErrorService {
     super();
   }
 
-  /** GET actors from the server */
+  /** GET actors from the server, following the cursor of every page */
   getActors(): Observable<Actor[]> {
     return this.middlewareService.get$<Actor[]>('actors').pipe(
-      switchMap((response) => {
+      expand((response) =>
+        response?.next
+          ? this.middlewareService.get$<Actor[]>(
+              `actors?after=${encodeURIComponent(response.next)}`
+            )
+          : EMPTY
+      ),
+      reduce((result: Actor[], response) => {
         const data = response?.data;
-        let result;
         if (Array.isArray(data)) {
-          result = data;
-        } else {
-          result = data ? [data] : [];
+          return result.concat(data);
         }
-        return of(result);
-      }),
+        return data ? result.concat([data]) : result;
+      }, []),
       tap((actors) => {
         console.log('fetched actors ', actors);
       }),
@@ -67,6 +81,26 @@ export class ActorService extends HandleErrorService {
       );
   }
 
+  /** DELETE many actors in one batch, emits the ids deleted */
+  deleteActors(ids: number[]): Observable<number[]> {
+    return this.middlewareService
+      .batch$<number>(
+        ids.map((id) => ({
+          method: 'DELETE' as const,
+          path: `/actors/${id}`,
+        }))
+      )
+      .pipe(
+        map((results) =>
+          results
+            .filter((result) => result.status === 200)
+            .map((result) => ids[result.index])
+        ),
+        tap((deleted) => console.log(`deleted actors ids=${deleted}`)),
+        catchError(this.handleError<number[]>('deleteActors', []))
+      );
+  }
+
   /** PUT: update the actor on the server */
   updateActor(actor: Actor): Observable<unknown> {
     const url = `actors/${actor.id}`;
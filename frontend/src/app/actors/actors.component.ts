@@ -3,9 +3,20 @@ import { Actor } from './actor';
 import { ActorService } from './actor.service';
 import { NgFor, NgIf } from '@angular/common';
 import { RouterLink, RouterModule } from '@angular/router';
-import { ReplaySubject, takeUntil, tap } from 'rxjs';
+import {
+  ReplaySubject,
+  Subject,
+  bufferTime,
+  filter,
+  mergeMap,
+  takeUntil,
+  tap,
+} from 'rxjs';
 import { AuthService } from '../user/auth.service';
 
+/** deletions clicked within this many ms are sent in one batch */
+const DELETE_BATCH_MS = 300;
+
 @Component({
   selector: 'app-actors',
   standalone: true,
@@ -16,6 +27,7 @@ import { AuthService } from '../user/auth.service';
 export class ActorsComponent implements OnDestroy {
   actors: Actor[] = [];
   private destroy: ReplaySubject<any> = new ReplaySubject<any>(1);
+  private deletions = new Subject<number>();
 
   constructor(private actorService: ActorService, public auth: AuthService) {}
 
@@ -26,6 +38,15 @@ export class ActorsComponent implements OnDestroy {
 
   ngOnInit(): void {
     this.getActors();
+    this.deletions
+      .pipe(
+        // completing flushes the deletions still buffered
+        takeUntil(this.destroy),
+        bufferTime(DELETE_BATCH_MS),
+        filter((ids) => ids.length > 0),
+        mergeMap((ids) => this.actorService.deleteActors(ids))
+      )
+      .subscribe();
   }
 
   getActors(): void {
@@ -40,9 +61,6 @@ export class ActorsComponent implements OnDestroy {
 
   delete(actor: Actor): void {
     this.actors = this.actors.filter((h) => h !== actor);
-    this.actorService
-      .deleteActor(actor.id)
-      .pipe(takeUntil(this.destroy))
-      .subscribe();
+    this.deletions.next(actor.id);
   }
 }
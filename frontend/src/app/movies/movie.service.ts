@@ -1,5 +1,15 @@
 import { Injectable } from '@angular/core';
-import { Observable, catchError, of, switchMap, tap } from 'rxjs';
+import {
+  EMPTY,
+  Observable,
+  catchError,
+  expand,
+  map,
+  of,
+  reduce,
+  switchMap,
+  tap,
+} from 'rxjs';
 import { Movie } from './movie';
 import { HandleErrorService } from '../services/handleError.service';
 import { MiddlewareService } from '../services/middleware.service';
@@ -10,19 +20,23 @@ export class MovieService extends HandleErrorService {
     super();
   }
 
-  /** GET movies from the server */
+  /** GET movies from the server, following the cursor of every page */
   getMovies(): Observable<Movie[]> {
     return this.middlewareService.get$<Movie[]>('movies').pipe(
-      switchMap((response) => {
+      expand((response) =>
+        response?.next
+          ? this.middlewareService.get$<Movie[]>(
+              `movies?after=${encodeURIComponent(response.next)}`
+            )
+          : EMPTY
+      ),
+      reduce((result: Movie[], response) => {
         const data = response?.data;
-        let result;
         if (Array.isArray(data)) {
-          result = data;
-        } else {
-          result = data ? [data] : [];
+          return result.concat(data);
         }
-        return of(result);
-      }),
+        return data ? result.concat([data]) : result;
+      }, []),
       tap((_) => console.log('fetched movie')),
       catchError(this.handleError<Movie[]>('getMovies', []))
     );
@@ -62,6 +76,26 @@ export class MovieService extends HandleErrorService {
       );
   }
 
+  /** DELETE many movies in one batch, emits the ids deleted */
+  deleteMovies(ids: number[]): Observable<number[]> {
+    return this.middlewareService
+      .batch$<number>(
+        ids.map((id) => ({
+          method: 'DELETE' as const,
+          path: `/movies/${id}`,
+        }))
+      )
+      .pipe(
+        map((results) =>
+          results
+            .filter((result) => result.status === 200)
+            .map((result) => ids[result.index])
+        ),
+        tap((deleted) => console.log(`deleted movies ids=${deleted}`)),
+        catchError(this.handleError<number[]>('deleteMovies', []))
+      );
+  }
+
   /** PUT: update the movie on the server */
   updateMovie(movie: Movie): Observable<unknown> {
     const url = `movies/${movie.id}`;
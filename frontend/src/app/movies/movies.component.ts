@@ -3,9 +3,20 @@ import { Component, OnDestroy } from '@angular/core';
 import { RouterLink, RouterModule } from '@angular/router';
 import { Movie } from './movie';
 import { MovieService } from './movie.service';
-import { ReplaySubject, takeUntil, tap } from 'rxjs';
+import {
+  ReplaySubject,
+  Subject,
+  bufferTime,
+  filter,
+  mergeMap,
+  takeUntil,
+  tap,
+} from 'rxjs';
 import { AuthService } from '../user/auth.service';
 
+/** deletions clicked within this many ms are sent in one batch */
+const DELETE_BATCH_MS = 300;
+
 @Component({
   selector: 'app-movies',
   standalone: true,
@@ -16,6 +27,7 @@ import { AuthService } from '../user/auth.service';
 export class MoviesComponent implements OnDestroy {
   movies: Movie[] = [];
   private destroy: ReplaySubject<any> = new ReplaySubject<any>(1);
+  private deletions = new Subject<number>();
 
   constructor(private movieService: MovieService, public auth: AuthService) {}
   ngOnDestroy(): void {
@@ -25,6 +37,15 @@ export class MoviesComponent implements OnDestroy {
 
   ngOnInit(): void {
     this.getMovies();
+    this.deletions
+      .pipe(
+        // completing flushes the deletions still buffered
+        takeUntil(this.destroy),
+        bufferTime(DELETE_BATCH_MS),
+        filter((ids) => ids.length > 0),
+        mergeMap((ids) => this.movieService.deleteMovies(ids))
+      )
+      .subscribe();
   }
 
   getMovies(): void {
@@ -39,9 +60,6 @@ export class MoviesComponent implements OnDestroy {
 
   delete(movie: Movie): void {
     this.movies = this.movies.filter((m) => m !== movie);
-    this.movieService
-      .deleteMovie(movie.id)
-      .pipe(takeUntil(this.destroy))
-      .subscribe();
+    this.deletions.next(movie.id);
   }
 }
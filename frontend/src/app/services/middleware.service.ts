@@ -12,6 +12,20 @@ export interface RequestDataModel<TData> {
 export interface ResponseDataModel<TData> {
   success: TData;
   data?: TData;
+  next?: string | null;
+}
+
+/** One request of a POST /batch, path is relative to the api root */
+export interface BatchOperation {
+  method: 'GET' | 'POST' | 'PUT' | 'PATCH' | 'DELETE';
+  path: string;
+  body?: unknown;
+}
+
+export interface BatchResult<TData> {
+  index: number;
+  status: number;
+  body: ResponseDataModel<TData>;
 }
 
 @Injectable({
@@ -85,6 +99,26 @@ export class MiddlewareService {
       );
   }
 
+  /**
+   * POST /batch: runs the operations in one round trip and one transaction,
+   * atomic rolls them all back when one fails
+   */
+  batch$<TResponse>(
+    operations: BatchOperation[],
+    atomic = false
+  ): Observable<BatchResult<TResponse>[]> {
+    const url = `${this.apiServerUrl}batch${atomic ? '?atomic=true' : ''}`;
+    return this.httpClient
+      .post<ResponseDataModel<BatchResult<TResponse>[]>>(url, operations, {
+        observe: 'response',
+        headers: this.createHeader(),
+      })
+      .pipe(
+        take(1),
+        map((r) => r.body?.data ?? [])
+      );
+  }
+
   delete$<TRequest, TResponse>(
     path: string,
   ): Observable<ResponseDataModel<TResponse>> {